@@ -0,0 +1,188 @@
+# meu_xadrez/chess_game/bench.py (BENCHMARK DETERMINÍSTICO DA BUSCA: NÓS, TEMPO E NÓS/S)
+import argparse
+import datetime
+import json
+import platform
+import sys
+import time
+
+import chess
+from chess_game.engine import DEFAULT_NNUE_PATH, ChessEngine
+from chess_game.profiler import EvalProfiler, format_eval_stats
+
+DEFAULT_BENCH_DEPTH = 3
+DEFAULT_BENCH_SEED = 0
+DEFAULT_EVAL_REPEAT = 20  # passadas sobre as posições na medição de avaliações/s
+BENCH_FENS = [
+    # Aberturas
+    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+    "r1bqkbnr/1ppp1ppp/p1n5/1B2p3/4P3/5N2/PPPP1PPP/RNBQK2R w KQkq - 0 4",
+    "rnbqkbnr/pp2pppp/3p4/8/3pP3/5N2/PPP2PPP/RNBQKB1R w KQkq - 0 4",
+    "rnbqkb1r/ppp2ppp/4pn2/3p4/2PP4/2N5/PP2PPPP/R1BQKBNR w KQkq - 2 4",
+    "rnbqk2r/ppppppbp/5np1/8/2PP4/2N5/PP2PPPP/R1BQKBNR w KQkq - 2 4",
+    # Meio-jogo: bench do Stockfish, Bratko-Kopec e posições clássicas de perft
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 10",
+    "4rrk1/pp1n3p/3q2pQ/2p1pb2/2PP4/2P3N1/P2B2PP/4RRK1 b - - 7 19",
+    "rq3rk1/ppp2ppp/1bnpb3/3N2B1/3NP3/7P/PPPQ1PP1/2KR3R w - - 7 14",
+    "r1bq1r1k/1pp1n1pp/1p1p4/4p2Q/4Pp2/1BNP4/PPP2PPP/3R1RK1 w - - 2 14",
+    "r3r1k1/2p2ppp/p1p1bn2/8/1q2P3/2NPQN2/PPP3PP/R4RK1 b - - 2 15",
+    "r1bbk1nr/pp3p1p/2n5/1N4p1/2Np1B2/8/PPP2PPP/2KR1B1R w kq - 0 13",
+    "r1bq1rk1/ppp1nppp/4n3/3p3Q/3P4/1BP1B3/PP1N2PP/R4RK1 w - - 1 16",
+    "4r1k1/r1q2ppp/ppp2n2/4P3/5Rb1/1N1BQ3/PPP3PP/R5K1 w - - 1 17",
+    "2rqkb1r/ppp2p2/2npb1p1/1N1Nn2p/2P1PP2/8/PP2B1PP/R1BQK2R b KQ - 0 11",
+    "r1bq1r1k/b1p1npp1/p2p3p/1p6/3PP3/1B2NN2/PP3PPP/R2Q1RK1 w - - 1 16",
+    "3r1rk1/p5pp/bpp1pp2/8/q1PP1P2/b3P3/P2NQRPP/1R2B1K1 b - - 6 22",
+    "r1q2rk1/2p1bppp/2Pp4/p6b/Q1PNp3/4B3/PP1R1PPP/2K4R w - - 2 18",
+    "4k2r/1pb2ppp/1p2p3/1R1p4/3P4/2r1PN2/P4PPP/1R4K1 b - - 3 22",
+    "3q2k1/pb3p1p/4pbp1/2r5/PpN2N2/1P2P2P/5PP1/Q2R2K1 b - - 4 26",
+    "6k1/6p1/6Pp/ppp5/3pn2P/1P3K2/1PP2P2/8 b - - 0 1",
+    "6k1/3b3r/1p1p4/p1n2p2/1PPNpP1q/P3Q1p1/1R1RB1P1/5K2 b - - 0 1",
+    "r2r1n2/pp2bk2/2p1p2p/3q4/3PN1QP/2P3R1/P4PP1/5RK1 w - - 0 1",
+    "r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1",
+    "rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8",
+    "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10",
+    "1k1r4/pp1b1R2/3q2pp/4p3/2B5/4Q3/PPP2B2/2K5 b - - 0 1",
+    "3r1k2/4npp1/1ppr3p/p6P/P2PPPP1/1NR5/5K2/2R5 w - - 0 1",
+    "2q1rr1k/3bbnnp/p2p1pp1/2pPp3/PpP1P1P1/1P2BNNP/2BQ1PRK/7R b - - 0 1",
+    "rnbqkb1r/p3pppp/1p6/2ppP3/3N4/2P5/PPP1QPPP/R1B1KB1R w KQkq - 0 1",
+    "r1b2rk1/2q1b1pp/p2ppn2/1p6/3QP3/1BN1B3/PPP3PP/R4RK1 w - - 0 1",
+    "2r3k1/pppR1pp1/4p3/4P1P1/5P2/1P4K1/P1P5/8 w - - 0 1",
+    "1nk1r1r1/pp2n1pp/4p3/q2pPp1N/b1pP1P2/B1P2R2/2P1B1PP/R2Q2K1 w - - 0 1",
+    "4b3/p3kp2/6p1/3pP2p/2pP1P2/4K1P1/P3N2P/8 w - - 0 1",
+    "2kr1bnr/pbpq4/2n1pp2/3p3p/3P1P1B/2N2N1Q/PPP3PP/2KR1B1R w - - 0 1",
+    "3rr1k1/pp3pp1/1qn2np1/8/3p4/PP1R1P2/2P1NQPP/R1B3K1 b - - 0 1",
+    "2r1nrk1/p2q1ppp/bp1p4/n1pPp3/P1P1P3/2PBB1N1/4QPPP/R4RK1 w - - 0 1",
+    "r3r1k1/ppqb1ppp/8/4p1NQ/8/2P5/PP3PPP/R3R1K1 b - - 0 1",
+    "r2q1rk1/4bppp/p2p4/2pP4/3pP3/3Q4/PP1B1PPP/R3R1K1 w - - 0 1",
+    "rnb2r1k/pp2p2p/2pp2p1/q2P1p2/8/1Pb2NP1/PB2PPBP/R2Q1RK1 w - - 0 1",
+    # Finais
+    "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 11",
+    "8/8/8/8/5kp1/P7/8/1K1N4 w - - 0 1",
+    "8/8/8/5N2/8/p7/8/2NK3k w - - 0 1",
+    "8/8/1P6/5pr1/8/4R3/7k/2K5 w - - 0 1",
+    "8/2p4P/8/kr6/6R1/8/8/1K6 w - - 0 1",
+    "8/8/3P3k/8/1p6/8/1P6/1K3n2 b - - 0 1",
+    "8/R7/2q5/8/6k1/8/1P5p/K6R w - - 0 124",
+    "8/k7/3p4/p2P1p2/P2P1P2/8/8/K7 w - - 0 1",
+    "8/5pk1/6p1/8/5P2/6P1/5K2/8 w - - 0 1",
+    "4k3/8/8/8/8/8/4P3/4K3 w - - 0 1",
+    "8/8/8/4k3/8/8/2R5/4K3 w - - 0 1",
+    "6k1/5ppp/8/8/8/8/5PPP/3R2K1 w - - 0 1",
+    "8/p4pk1/1p4p1/8/2P5/1P3KP1/P7/8 w - - 0 1",
+    "3k4/8/3K4/3P4/8/8/8/8 w - - 0 1",
+    "8/8/8/3k4/8/8/1Q6/4K3 w - - 0 1",
+]
+
+
+def bench_position(engine, fen, depth, seed=DEFAULT_BENCH_SEED):
+    # TT vazia e semente fixa a cada posição: os nós de cada uma não dependem da ordem nem das anteriores
+    engine.tt.clear()
+    engine.rng.seed(seed)
+    board = chess.Board(fen)
+    start = time.perf_counter()
+    result = engine.search(board, depth=depth)
+    elapsed = time.perf_counter() - start
+    return {'fen': fen, 'bestmove': result.move.uci(), 'nodes': result.nodes, 'time_ms': round(elapsed * 1000, 1)}
+
+
+def run_bench(depth=DEFAULT_BENCH_DEPTH, fens=BENCH_FENS, seed=DEFAULT_BENCH_SEED, progress=None,
+              eval_profile=False, nnue=None):
+    # Engine sem livro, tablebases nem bitbases: o total de nós depende só da busca e da avaliação.
+    # eval_profile cronometra a avaliação: 'kernel' (ou True) mede o caminho da busca; 'terms' mede cada termo pelo
+    # caminho lento por termo. Os tempos totais ficam maiores; os nós não mudam.
+    # nnue troca a avaliação pela rede do arquivo: outra assinatura, para comparar nós/s com a clássica.
+    engine = ChessEngine(seed=seed)
+    if nnue and not engine.load_nnue(nnue): raise FileNotFoundError(f"rede NNUE não encontrada: {nnue}")
+    if eval_profile: engine.eval_profiler = EvalProfiler(terms=eval_profile == 'terms')
+    positions, start = [], time.perf_counter()
+    for index, fen in enumerate(fens):
+        positions.append(bench_position(engine, fen, depth, seed))
+        if progress: progress(f"Posição {index + 1}/{len(fens)}: {positions[-1]['nodes']} nós")
+    elapsed = time.perf_counter() - start
+    nodes = sum(position['nodes'] for position in positions)
+    return {'date': datetime.datetime.now().isoformat(timespec='seconds'), 'python': platform.python_version(),
+            'depth': depth, 'seed': seed, 'nnue': nnue, 'positions': len(positions), 'nodes': nodes,
+            'time_s': round(elapsed, 3), 'nps': int(nodes / elapsed) if elapsed > 0 else 0, 'results': positions,
+            **({'eval_profile': engine.eval_profiler.stats()} if eval_profile else {})}
+
+
+def run_eval_bench(fens=BENCH_FENS, repeat=DEFAULT_EVAL_REPEAT, nnue=None):
+    # Avaliações/s de evaluate_board fora da busca: as posições do conjunto e todas as filhas delas
+    engine = ChessEngine()
+    if nnue and not engine.load_nnue(nnue): raise FileNotFoundError(f"rede NNUE não encontrada: {nnue}")
+    boards = []
+    for fen in fens:
+        board = chess.Board(fen)
+        boards.append(board)
+        for move in board.legal_moves:
+            child = board.copy(stack=False)
+            child.push(move)
+            boards.append(child)
+    engine.evaluate_board(boards[0])
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for board in boards:
+            engine.evaluate_board(board)
+    elapsed = time.perf_counter() - start
+    evals = len(boards) * repeat
+    return {'positions': len(boards), 'evals': evals, 'time_s': round(elapsed, 3),
+            'evals_per_s': int(evals / elapsed) if elapsed > 0 else 0}
+
+
+def format_bench(report):
+    return (f"Nós: {report['nodes']}\nTempo: {report['time_s'] * 1000:.0f} ms\nNós/s: {report['nps']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da engine: busca de profundidade fixa num conjunto fixo "
+                                                 "de posições; o total de nós é a assinatura da busca.")
+    parser.add_argument('--depth', type=int, default=DEFAULT_BENCH_DEPTH, help="profundidade por posição")
+    parser.add_argument('--seed', type=int, default=DEFAULT_BENCH_SEED, help="semente da ordem das jogadas na raiz")
+    parser.add_argument('--fens', help="arquivo com uma FEN por linha no lugar do conjunto padrão")
+    parser.add_argument('--json', metavar='ARQUIVO', help="acrescenta o resultado (uma linha JSON) a este arquivo; "
+                                                         "'-' imprime o JSON em vez do resumo")
+    parser.add_argument('--eval-profile', nargs='?', const='kernel', choices=('kernel', 'terms'),
+                        help="mede tempo e chamadas da avaliação: 'kernel' (padrão) o caminho usado na busca, "
+                             "'terms' cada termo pelo caminho lento termo a termo")
+    parser.add_argument('--nnue', nargs='?', const=DEFAULT_NNUE_PATH, metavar='REDE',
+                        help="avalia com a rede NNUE (padrão do arquivo: a rede da engine)")
+    parser.add_argument('--evals', action='store_true',
+                        help="mede avaliações/s (evaluate_board nas posições e filhas) em vez da busca")
+    parser.add_argument('-q', '--quiet', action='store_true', help="não mostra o progresso por posição")
+    args = parser.parse_args()
+
+    fens = BENCH_FENS
+    if args.fens:
+        with open(args.fens, encoding='utf-8') as f:
+            fens = [line.strip() for line in f if line.strip() and not line.startswith('#')]
+    if args.evals:
+        try:
+            report = run_eval_bench(fens, nnue=args.nnue)
+        except FileNotFoundError as e:
+            parser.error(str(e))
+        if args.json == '-': print(json.dumps(report))
+        else: print(f"{report['evals']} avaliações ({report['positions']} posições) em "
+                    f"{report['time_s'] * 1000:.0f} ms: {report['evals_per_s']} avaliações/s")
+        return
+    progress = None if args.quiet else lambda message: print(message, file=sys.stderr, flush=True)
+    try:
+        report = run_bench(args.depth, fens, args.seed, progress, args.eval_profile, args.nnue)
+    except FileNotFoundError as e:
+        parser.error(str(e))
+    if args.json == '-':
+        print(json.dumps(report))
+        return
+    if args.json:
+        with open(args.json, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(report) + '\n')
+    print(format_bench(report))
+    if args.eval_profile:
+        terms = args.eval_profile == 'terms'
+        print("\nTermos da avaliação (caminho termo a termo, mais lento que o kernel):" if terms
+              else "\nAvaliação (caminho da busca):")
+        for line in format_eval_stats(report['eval_profile']):
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,366 @@
+# meu_xadrez/chess_game/bitbase.py (BITBASES DE FINAIS GERADAS POR ANÁLISE RETRÓGRADA)
+import argparse
+import os
+import time
+
+import chess
+import numpy as np
+
+DEFAULT_BITBASE_PATH = os.environ.get('MEU_XADREZ_BITBASES') or os.path.join(os.path.expanduser('~'), '.meu_xadrez',
+                                                                             'bitbases.npz')
+# Peças do lado forte além do rei; o lado fraco tem só o rei
+ENDGAMES = {'KQK': 'Q', 'KRK': 'R', 'KPK': 'P', 'KBNK': 'BN'}
+DEPENDENCIES = {'KPK': ('KQK', 'KRK')}  # promoções consultam estes finais
+SMALL_ENDGAMES = ('KQK', 'KRK', 'KPK')  # geradas em segundos; o KBNK (4 peças) leva bem mais
+BITBASE_WIN_SCORE = 25000  # vitória conhecida, abaixo da tablebase e de mate
+MATERIAL = {'P': 100, 'N': 320, 'B': 330, 'R': 500, 'Q': 900}  # mesmos valores da engine: promover sempre compensa
+CHUNK_SIZE = 1 << 18
+
+_SQ = np.arange(64)
+_FILE, _RANK = _SQ & 7, _SQ >> 3
+_DF = np.abs(_FILE[:, None] - _FILE[None, :])
+_DR = np.abs(_RANK[:, None] - _RANK[None, :])
+BIT = np.uint64(1) << _SQ.astype(np.uint64)
+KING_ADJ = np.maximum(_DF, _DR) == 1
+KNIGHT_ATK = ((_DF == 1) & (_DR == 2)) | ((_DF == 2) & (_DR == 1))
+PAWN_ATK = (_RANK[None, :] == _RANK[:, None] + 1) & (_DF == 1)
+ORTH = ((_DF == 0) | (_DR == 0)) & ~np.eye(64, dtype=bool)
+DIAG = (_DF == _DR) & ~np.eye(64, dtype=bool)
+ORTH_DIRS, DIAG_DIRS = [(0, 1), (0, -1), (1, 0), (-1, 0)], [(1, 1), (1, -1), (-1, 1), (-1, -1)]
+SLIDER_DIRS = {'R': ORTH_DIRS, 'B': DIAG_DIRS, 'Q': ORTH_DIRS + DIAG_DIRS}
+
+
+def _step_table(deltas, max_steps):
+    # table[casa, direção, passo] = casa de destino ou -1 fora do tabuleiro
+    table = np.full((64, len(deltas), max_steps), -1, dtype=np.int64)
+    for sq in range(64):
+        for d, (df, dr) in enumerate(deltas):
+            for k in range(1, max_steps + 1):
+                f, r = sq % 8 + df * k, sq // 8 + dr * k
+                if not (0 <= f < 8 and 0 <= r < 8): break
+                table[sq, d, k - 1] = r * 8 + f
+    return table
+
+
+KING_MOVES = _step_table(ORTH_DIRS + DIAG_DIRS, 1)[:, :, 0]
+KNIGHT_MOVES = _step_table([(1, 2), (2, 1), (2, -1), (1, -2), (-1, -2), (-2, -1), (-2, 1), (-1, 2)], 1)[:, :, 0]
+RAYS = {name: _step_table(dirs, 7) for name, dirs in SLIDER_DIRS.items()}
+
+BETWEEN = np.zeros((64, 64), dtype=np.uint64)
+for _a in range(64):
+    for _d, (_df, _dr) in enumerate(ORTH_DIRS + DIAG_DIRS):
+        _mask = np.uint64(0)
+        for _b in RAYS['Q'][_a, _d]:
+            if _b < 0: break
+            BETWEEN[_a, _b] = _mask
+            _mask |= BIT[_b]
+
+
+def piece_attacks(piece, src, target, occ):
+    if piece == 'N': return KNIGHT_ATK[src, target]
+    if piece == 'P': return PAWN_ATK[src, target]
+    lines = ORTH[src, target] if piece == 'R' else DIAG[src, target] if piece == 'B' else ORTH[src, target] | DIAG[
+        src, target]
+    return lines & ((BETWEEN[src, target] & occ) == 0)
+
+
+class Layout:
+    """Índice de posições do lado forte como brancas: ((rei forte * 64 + rei fraco) * 64 + peça1) * 64 + ..."""
+
+    def __init__(self, name):
+        self.name, self.pieces = name, ENDGAMES[name]
+        self.size = 64 ** (2 + len(self.pieces))
+
+    def index(self, wk, bk, pieces):
+        idx = wk * 64 + bk
+        for sq in pieces:
+            idx = idx * 64 + sq
+        return idx
+
+    def coords(self, idx):
+        j = np.asarray(idx, dtype=np.int64)
+        squares = []
+        for _ in range(2 + len(self.pieces)):
+            squares.append(j & 63)
+            j = j >> 6
+        squares.reverse()
+        return squares[0], squares[1], squares[2:]
+
+
+def _valid(layout, wk, bk, ps, white_to_move):
+    valid = (wk != bk) & ~KING_ADJ[wk, bk]
+    for i, p in enumerate(ps):
+        valid &= (p != wk) & (p != bk)
+        for q in ps[i + 1:]:
+            valid &= p != q
+        if layout.pieces[i] == 'P': valid &= (_RANK[p] != 0) & (_RANK[p] != 7)
+    if white_to_move:
+        valid &= ~_in_check(layout, bk, ps, _occupancy(wk, bk, ps))
+    return valid
+
+
+def _occupancy(wk, bk, ps):
+    occ = BIT[wk] | BIT[bk]
+    for p in ps:
+        occ = occ | BIT[p]
+    return occ
+
+
+def _in_check(layout, bk, ps, occ):
+    check = np.zeros(bk.shape, dtype=bool)
+    for piece, p in zip(layout.pieces, ps):
+        check |= piece_attacks(piece, p, bk, occ)
+    return check
+
+
+def _is_set(bb, squares):
+    return ((bb >> squares.astype(np.uint64)) & np.uint64(1)).astype(bool)
+
+
+def _black_moves(layout, idx):
+    # Pretas a jogar: número de jogadas legais sem captura e máscara das posições que podem ser vencidas.
+    # Capturar qualquer peça deixa material insuficiente ou uma peça menor (empate); afogamento também é empate.
+    wk, bk, ps = layout.coords(idx)
+    occ = _occupancy(wk, bk, ps)
+    xray_occ = occ & ~BIT[bk]
+    quiet_moves = np.zeros(len(idx), dtype=np.uint8)
+    escapes = np.zeros(len(idx), dtype=bool)
+    any_legal = np.zeros(len(idx), dtype=bool)
+    for slot in range(KING_MOVES.shape[1]):
+        t = KING_MOVES[bk, slot]
+        tt = np.maximum(t, 0)
+        legal = (t >= 0) & ~KING_ADJ[wk, tt] & (tt != wk)
+        capture = np.zeros(len(idx), dtype=bool)
+        for piece, p in zip(layout.pieces, ps):
+            captured = p == tt
+            capture |= captured
+            legal &= ~(~captured & piece_attacks(piece, p, tt, xray_occ))
+        any_legal |= legal
+        escapes |= legal & capture
+        quiet_moves += legal & ~capture
+    in_check = _in_check(layout, bk, ps, occ)
+    return _valid(layout, wk, bk, ps, False) & ~escapes & (any_legal | in_check), quiet_moves
+
+
+def _promotion_wins(layout, idx, deps):
+    # Brancas a jogar vencem já na promoção se a posição resultante (pretas a jogar) é vitória no KQK ou KRK
+    wk, bk, ps = layout.coords(idx)
+    pawn = ps[layout.pieces.index('P')]
+    target = np.minimum(pawn + 8, 63)
+    promo = (_RANK[pawn] == 6) & ~_is_set(_occupancy(wk, bk, ps), target)
+    wins = np.zeros(len(idx), dtype=bool)
+    for dep_name in DEPENDENCIES[layout.name]:
+        wins |= deps[dep_name][1][Layout(dep_name).index(wk, bk, [target])]
+    return promo & wins & _valid(layout, wk, bk, ps, True)
+
+
+def _white_predecessors(layout, idx):
+    # Posições com brancas a jogar que chegam às posições idx (pretas a jogar) desfazendo um lance branco
+    wk, bk, ps = layout.coords(idx)
+    occ = _occupancy(wk, bk, ps)
+    preds = []
+    for slot in range(KING_MOVES.shape[1]):
+        t = KING_MOVES[wk, slot]
+        tt = np.maximum(t, 0)
+        ok = (t >= 0) & ~KING_ADJ[tt, bk] & ~_is_set(occ, tt)
+        preds.append(layout.index(tt, bk, ps)[ok])
+    for i, piece in enumerate(layout.pieces):
+        src = ps[i]
+
+        def moved(target, ok):
+            return layout.index(wk, bk, ps[:i] + [target] + ps[i + 1:])[ok]
+
+        if piece == 'N':
+            for slot in range(KNIGHT_MOVES.shape[1]):
+                t = KNIGHT_MOVES[src, slot]
+                tt = np.maximum(t, 0)
+                preds.append(moved(tt, (t >= 0) & ~_is_set(occ, tt)))
+        elif piece == 'P':
+            one, two = np.maximum(src - 8, 0), np.maximum(src - 16, 0)
+            ok = (_RANK[src] >= 2) & ~_is_set(occ, one)
+            preds.append(moved(one, ok))
+            preds.append(moved(two, ok & (_RANK[src] == 3) & ~_is_set(occ, two)))
+        else:
+            rays = RAYS[piece]
+            for d in range(rays.shape[1]):
+                blocked = np.zeros(len(idx), dtype=bool)
+                for k in range(rays.shape[2]):
+                    t = rays[src, d, k]
+                    tt = np.maximum(t, 0)
+                    blocked |= (t < 0) | _is_set(occ, tt)
+                    if blocked.all(): break
+                    preds.append(moved(tt, ~blocked))
+    preds = np.unique(np.concatenate(preds))
+    wk, bk, ps = layout.coords(preds)
+    return preds[_valid(layout, wk, bk, ps, True)]
+
+
+def _black_predecessors(layout, idx):
+    # Posições com pretas a jogar que chegam às posições idx (brancas a jogar, válidas) com um lance de rei sem
+    # captura; a legalidade do lance já está garantida porque o rei preto não fica em xeque em idx
+    wk, bk, ps = layout.coords(idx)
+    occ = _occupancy(wk, bk, ps)
+    preds = []
+    for slot in range(KING_MOVES.shape[1]):
+        t = KING_MOVES[bk, slot]
+        tt = np.maximum(t, 0)
+        ok = (t >= 0) & ~KING_ADJ[wk, tt] & ~_is_set(occ, tt)
+        preds.append(layout.index(wk, tt, ps)[ok])
+    return np.concatenate(preds)
+
+
+def _batches(indices):
+    return (indices[start:start + CHUNK_SIZE] for start in range(0, len(indices), CHUNK_SIZE))
+
+
+def generate(name, deps=None, progress=None):
+    # Análise retrógrada a partir dos mates (e das promoções vencedoras no KPK): cada posição recém-vencida
+    # propaga para as antecessoras. Devolve (vitória com brancas a jogar, vitória com pretas a jogar).
+    layout = Layout(name)
+    win_w = np.zeros(layout.size, dtype=bool)
+    win_b = np.zeros(layout.size, dtype=bool)
+    remaining = np.empty(layout.size, dtype=np.uint8)  # jogadas das pretas ainda não refutadas
+    for idx in _batches(np.arange(layout.size)):
+        candidate, quiet_moves = _black_moves(layout, idx)
+        remaining[idx] = np.where(candidate, quiet_moves, 255)
+        win_b[idx] = candidate & (quiet_moves == 0)
+        if name in DEPENDENCIES: win_w[idx] = _promotion_wins(layout, idx, deps)
+
+    frontier_b, frontier_w = np.flatnonzero(win_b), np.flatnonzero(win_w)
+    iteration = 0
+    while len(frontier_b) or len(frontier_w):
+        new_w = [frontier_w]
+        for batch in _batches(frontier_b):
+            preds = _white_predecessors(layout, batch)
+            preds = preds[~win_w[preds]]
+            win_w[preds] = True
+            new_w.append(preds)
+        new_b = [np.empty(0, dtype=np.int64)]
+        for batch in _batches(np.concatenate(new_w)):
+            preds, refuted = np.unique(_black_predecessors(layout, batch), return_counts=True)
+            remaining[preds] -= refuted.astype(np.uint8)
+            done = preds[(remaining[preds] == 0) & ~win_b[preds]]
+            win_b[done] = True
+            new_b.append(done)
+        frontier_b, frontier_w = np.concatenate(new_b), np.empty(0, dtype=np.int64)
+        iteration += 1
+        if progress: progress(f"{name}: iteração {iteration}, {int(win_w.sum())} vitórias com brancas a jogar")
+    return win_w, win_b
+
+
+def generate_all(names, path=DEFAULT_BITBASE_PATH, progress=print):
+    tables = load_tables(path)
+    for name in sorted(names, key=lambda n: n in DEPENDENCIES):
+        if name in tables: continue
+        deps = {dep: tables[dep] for dep in DEPENDENCIES.get(name, ())}
+        for dep in DEPENDENCIES.get(name, ()):
+            if dep not in deps: deps[dep] = tables[dep] = generate(dep, progress=progress)
+        tables[name] = generate(name, deps, progress)
+    save_tables(tables, path)
+    return tables
+
+
+def save_tables(tables, path=DEFAULT_BITBASE_PATH):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    np.savez(path, **{f'{name}_{side}': np.packbits(win) for name, wins in tables.items()
+                      for side, win in zip('wb', wins)})
+
+
+def load_tables(path=DEFAULT_BITBASE_PATH):
+    if not os.path.exists(path): return {}
+    with np.load(path) as data:
+        return {name: tuple(np.unpackbits(data[f'{name}_{side}'], count=Layout(name).size).astype(bool)
+                            for side in 'wb') for name in ENDGAMES if f'{name}_w' in data}
+
+
+def _center_distance(sq):
+    f, r = chess.square_file(sq), chess.square_rank(sq)
+    return max(3 - f, f - 4) + max(3 - r, r - 4)
+
+
+class Bitbases:
+    """Consulta às bitbases: True = vitória do lado forte, False = empate, None = final não coberto."""
+
+    def __init__(self, tables):
+        # Mantém os bits compactados em bytes: consultar um bit custa uma indexação e um deslocamento
+        self.tables = {name: tuple(np.packbits(win).tobytes() for win in wins) for name, wins in tables.items()}
+        self.signatures = {''.join(sorted(pieces)): name for name, pieces in ENDGAMES.items() if name in tables}
+        self.layouts = {name: Layout(name) for name in tables}
+
+    def _locate(self, board: chess.Board):
+        if chess.popcount(board.occupied) > 4 or board.castling_rights: return None
+        for strong in chess.COLORS:
+            if chess.popcount(board.occupied_co[not strong]) != 1: continue
+            pieces = []
+            for piece_type in (chess.PAWN, chess.KNIGHT, chess.BISHOP, chess.ROOK, chess.QUEEN):
+                for sq in chess.scan_forward(board.pieces_mask(piece_type, strong)):
+                    pieces.append((chess.piece_symbol(piece_type).upper(), sq))
+            name = self.signatures.get(''.join(sorted(symbol for symbol, _ in pieces)))
+            if name is None: return None
+            flip = 0 if strong == chess.WHITE else 56
+            order = {symbol: sq for symbol, sq in pieces}
+            squares = [order[symbol] ^ flip for symbol in ENDGAMES[name]]
+            return name, strong, board.king(strong) ^ flip, board.king(not strong) ^ flip, squares
+        return None
+
+    def probe(self, board: chess.Board):
+        located = self._locate(board)
+        if located is None: return None
+        name, strong, wk, bk, squares = located
+        idx = self.layouts[name].index(wk, bk, squares)
+        packed = self.tables[name][0 if board.turn == strong else 1]
+        return bool(packed[idx >> 3] >> (7 - (idx & 7)) & 1)
+
+    def win_score(self, board: chess.Board):
+        # Vitória conhecida + incentivo para progredir: rei fraco para a borda (ou para o canto da cor do bispo
+        # no KBNK), reis próximos e peão avançado
+        name, strong, wk, bk, squares = self._locate(board)
+        score = BITBASE_WIN_SCORE + sum(MATERIAL[piece] for piece in ENDGAMES[name])
+        score += 4 * (14 - chess.square_manhattan_distance(wk, bk))
+        if name == 'KBNK':
+            bishop = squares[0]
+            corners = [chess.A1, chess.H8] if (bishop // 8 + bishop % 8) % 2 == 0 else [chess.A8, chess.H1]
+            score += 20 * (14 - min(chess.square_manhattan_distance(bk, corner) for corner in corners))
+            score += 5 * _center_distance(bk)
+        else:
+            score += 10 * _center_distance(bk)
+        if name == 'KPK':
+            score += 20 * chess.square_rank(squares[0])
+        return score if strong == chess.WHITE else -score
+
+
+_opened = {}  # caminho -> Bitbases (ou None): uma cópia por processo, compartilhada entre as instâncias da engine
+
+
+def open_bitbases(path=DEFAULT_BITBASE_PATH, generate_missing=False):
+    # O cache é só por caminho: quem pede sem gerar recebe as mesmas tabelas já abertas por quem gerou
+    if path not in _opened:
+        tables = load_tables(path)
+        _opened[path] = Bitbases(tables) if tables else None
+    bitbases = _opened[path]
+    if generate_missing and (bitbases is None or any(name not in bitbases.tables for name in SMALL_ENDGAMES)):
+        try:
+            _opened[path] = Bitbases(generate_all(SMALL_ENDGAMES, path, progress=None))
+        except OSError:
+            pass  # sem onde gravar o cache: segue com o que já existia
+    return _opened[path]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera bitbases de finais (KPK, KQK, KRK, KBNK) por análise retrógrada.")
+    parser.add_argument('endgames', nargs='*', help=f"finais a gerar entre {', '.join(ENDGAMES)} (padrão: todos)")
+    parser.add_argument('-o', '--output', default=DEFAULT_BITBASE_PATH, help="arquivo de cache .npz")
+    args = parser.parse_args()
+    args.endgames = [name.upper() for name in args.endgames] or list(ENDGAMES)
+    unknown = [name for name in args.endgames if name not in ENDGAMES]
+    if unknown: parser.error(f"finais desconhecidos: {', '.join(unknown)}")
+
+    start = time.perf_counter()
+    tables = generate_all(args.endgames, args.output)
+    for name, (win_w, win_b) in tables.items():
+        print(f"{name}: {int(win_w.sum())} vitórias (brancas a jogar), {int(win_b.sum())} (pretas a jogar)")
+    print(f"Bitbases gravadas em {args.output} em {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+# meu_xadrez/chess_game/book.py (LIVRO DE ABERTURAS NO FORMATO POLYGLOT)
+import functools
+import os
+import random
+
+import chess
+import chess.polyglot
+
+DEFAULT_BOOK_PATH = os.environ.get('MEU_XADREZ_BOOK') or os.path.join(os.path.dirname(__file__), '..', 'assets',
+                                                                       'book.bin')
+DEFAULT_BOOK_DEPTH = 16  # meios-lances em que o livro é consultado
+# Quantas das jogadas mais frequentes do livro cada Elo considera (None = todas)
+BOOK_BREADTH_BY_ELO = {100: None, 400: 6, 800: 4, 1200: 3, 1600: 2}
+
+
+def book_breadth_for_elo(elo):
+    breadth = None
+    for current_elo, value in sorted(BOOK_BREADTH_BY_ELO.items()):
+        if elo >= current_elo:
+            breadth = value
+        else:
+            break
+    return breadth
+
+
+class OpeningBook:
+    """Livro Polyglot (.bin) lido por mmap; a busca da posição é binária pela chave Zobrist."""
+
+    def __init__(self, path):
+        self.path = path
+        self.reader = chess.polyglot.open_reader(path)
+
+    def entries(self, board: chess.Board):
+        return sorted(self.reader.find_all(board), key=lambda e: e.weight, reverse=True)
+
+    def probe(self, board: chess.Board, rng=random, breadth=None, max_ply=DEFAULT_BOOK_DEPTH):
+        # Sorteio ponderado pelo peso entre as `breadth` jogadas mais jogadas
+        if board.ply() >= max_ply: return None
+        entries = self.entries(board)[:breadth]
+        if not entries: return None
+        return rng.choices(entries, weights=[e.weight for e in entries])[0].move
+
+    def close(self):
+        self.reader.close()
+
+
+@functools.lru_cache(maxsize=None)
+def open_book(path):
+    # Um único mmap por arquivo, compartilhado entre as instâncias da engine
+    return OpeningBook(path) if os.path.exists(path) else None
@@ -0,0 +1,152 @@
+# meu_xadrez/chess_game/book_builder.py (GERA UM LIVRO POLYGLOT A PARTIR DE ARQUIVOS PGN)
+import argparse
+import heapq
+import io
+import itertools
+import multiprocessing
+import os
+import shutil
+import struct
+import tempfile
+import time
+
+import chess
+import chess.pgn
+import chess.polyglot
+from chess_game.book import DEFAULT_BOOK_DEPTH
+
+ENTRY_STRUCT = struct.Struct('>QHHI')  # formato Polyglot: chave, jogada, peso, learn
+RUN_STRUCT = struct.Struct('>QHII')  # registro intermediário: chave, jogada, partidas, pontos (vitória=2, empate=1)
+DEFAULT_CHUNK_BYTES = 32 * 1024 * 1024
+DEFAULT_MAX_ENTRIES = 2_000_000  # entradas em memória por processo antes de gravar um bloco ordenado em disco
+RESULT_POINTS = {'1-0': (2, 0), '0-1': (0, 2), '1/2-1/2': (1, 1)}
+
+
+def polyglot_move(board: chess.Board, move: chess.Move):
+    # No Polyglot o roque é codificado como "rei captura a própria torre"
+    to_square = move.to_square
+    if board.is_castling(move):
+        to_file = 7 if board.is_kingside_castling(move) else 0
+        to_square = chess.square(to_file, chess.square_rank(move.from_square))
+    promotion = move.promotion - 1 if move.promotion else 0
+    return to_square | move.from_square << 6 | promotion << 12
+
+
+def split_pgn(path, chunk_bytes=DEFAULT_CHUNK_BYTES):
+    # Divide o arquivo em faixas de bytes que começam sempre no cabeçalho [Event de uma partida
+    size = os.path.getsize(path)
+    starts = [0]
+    with open(path, 'rb') as f:
+        while starts[-1] + chunk_bytes < size:
+            f.seek(starts[-1] + chunk_bytes)
+            f.readline()
+            while (line := f.readline()) and not line.startswith(b'[Event '):
+                pass
+            if not line: break
+            starts.append(f.tell() - len(line))
+    return [(path, start, end) for start, end in zip(starts, starts[1:] + [size])]
+
+
+def spill(counts, tmp_dir):
+    fd, run_path = tempfile.mkstemp(suffix='.run', dir=tmp_dir)
+    with os.fdopen(fd, 'wb') as f:
+        f.write(b''.join(RUN_STRUCT.pack(key, move, games, points) for (key, move), (games, points) in
+                         sorted(counts.items())))
+    counts.clear()
+    return run_path
+
+
+def process_chunk(task):
+    path, start, end, plies, max_entries, tmp_dir = task
+    with open(path, 'rb') as f:
+        f.seek(start)
+        text = f.read(end - start).decode('utf-8', errors='replace')
+
+    pgn, counts, runs, games = io.StringIO(text), {}, [], 0
+    while (game := chess.pgn.read_game(pgn)) is not None:
+        points = RESULT_POINTS.get(game.headers.get('Result'))
+        if points is None or game.errors: continue
+        games += 1
+        board = game.board()
+        for move in itertools.islice(game.mainline_moves(), plies):
+            entry = counts.setdefault((chess.polyglot.zobrist_hash(board), polyglot_move(board, move)), [0, 0])
+            entry[0] += 1
+            entry[1] += points[0 if board.turn == chess.WHITE else 1]
+            board.push(move)
+        if len(counts) >= max_entries: runs.append(spill(counts, tmp_dir))
+    if counts: runs.append(spill(counts, tmp_dir))
+    return games, runs
+
+
+def read_run(run_path):
+    with open(run_path, 'rb') as f:
+        while chunk := f.read(RUN_STRUCT.size * 4096):
+            yield from RUN_STRUCT.iter_unpack(chunk)
+
+
+def merge_runs(run_paths):
+    # Junta os blocos ordenados (k-way merge) somando registros da mesma (chave, jogada)
+    merged = heapq.merge(*(read_run(p) for p in run_paths))
+    for (key, move), records in itertools.groupby(merged, key=lambda r: (r[0], r[1])):
+        games = points = 0
+        for _, _, g, p in records:
+            games += g
+            points += p
+        yield key, move, games, points
+
+
+def write_book(records, output, min_games=1):
+    written = 0
+    with open(output, 'wb') as out:
+        for key, group in itertools.groupby(records, key=lambda r: r[0]):
+            moves = [(points, move) for _, move, games, points in group if games >= min_games and points > 0]
+            if not moves: continue
+            top = max(points for points, _ in moves)
+            scale = 65535 / top if top > 65535 else 1
+            for points, move in sorted(moves, reverse=True):
+                out.write(ENTRY_STRUCT.pack(key, move, max(1, int(points * scale)), 0))
+                written += 1
+    return written
+
+
+def build_book(pgn_paths, output, plies=DEFAULT_BOOK_DEPTH, workers=None, min_games=1,
+               max_entries=DEFAULT_MAX_ENTRIES, chunk_bytes=DEFAULT_CHUNK_BYTES, progress=print):
+    start = time.perf_counter()
+    tmp_dir = tempfile.mkdtemp(prefix='meu_xadrez_book_')
+    try:
+        tasks = [(path, s, e, plies, max_entries, tmp_dir) for pgn in pgn_paths
+                 for path, s, e in split_pgn(pgn, chunk_bytes)]
+        games, runs = 0, []
+        with multiprocessing.Pool(workers) as pool:
+            for chunk_games, chunk_runs in pool.imap_unordered(process_chunk, tasks):
+                games += chunk_games
+                runs += chunk_runs
+                elapsed = time.perf_counter() - start
+                if progress: progress(f"{games} partidas ({games / elapsed:.0f} partidas/s)")
+        parse_time = time.perf_counter() - start
+        entries = write_book(merge_runs(runs), output, min_games)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    total = time.perf_counter() - start
+    return {'games': games, 'entries': entries, 'parse_s': parse_time, 'total_s': total,
+            'games_per_s': games / parse_time if parse_time > 0 else 0.0}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera um livro de aberturas Polyglot (.bin) a partir de PGNs.")
+    parser.add_argument('pgns', nargs='+', help="arquivos PGN")
+    parser.add_argument('-o', '--output', required=True, help="arquivo .bin de saída")
+    parser.add_argument('--plies', type=int, default=DEFAULT_BOOK_DEPTH, help="meios-lances por partida")
+    parser.add_argument('--workers', type=int, help="processos (padrão: núcleos da máquina)")
+    parser.add_argument('--min-games', type=int, default=1, help="mínimo de partidas para manter uma jogada")
+    parser.add_argument('--max-entries', type=int, default=DEFAULT_MAX_ENTRIES,
+                        help="entradas em memória por processo antes de gravar em disco")
+    args = parser.parse_args()
+
+    stats = build_book(args.pgns, args.output, args.plies, args.workers, args.min_games, args.max_entries)
+    print(f"{stats['games']} partidas, {stats['entries']} entradas gravadas em {args.output} "
+          f"({stats['games_per_s']:.0f} partidas/s, total {stats['total_s']:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+# meu_xadrez/chess_game/cli.py (ANÁLISE DE POSIÇÕES PELA LINHA DE COMANDO, SEM INTERFACE GRÁFICA)
+import argparse
+import json
+import sys
+
+import chess
+from chess_game.engine import ChessEngine, mate_moves
+from chess_game.pgn_pipeline import map_bounded
+
+DEFAULT_DEPTH = 3
+
+_worker_engine = None
+_worker_limits = {}
+
+
+def score_fields(score):
+    # Mate aparece como número de lances até o mate (positivo: brancas dão mate)
+    mate = mate_moves(score)
+    return {'score': None if mate is not None else score, 'mate': mate}
+
+
+def analyze_fen(engine, fen, depth=None, movetime=None, stats=False):
+    fen = fen.strip()
+    try:
+        board = chess.Board(fen)
+    except ValueError as e:
+        return {'fen': fen, 'error': str(e)}
+    if not board.is_valid():
+        return {'fen': fen, 'error': 'posição inválida'}
+
+    result = engine.search(board, depth=depth, movetime=movetime)
+    san_pv, pv_board = [], board.copy(stack=False)
+    for move in result.pv:
+        san_pv.append(pv_board.san(move))
+        pv_board.push(move)
+    return {'fen': fen, 'bestmove': result.move.uci() if result.move else None, 'san': san_pv[0] if san_pv else None,
+            **score_fields(result.score), 'pv': [m.uci() for m in result.pv], 'pv_san': san_pv,
+            'depth': result.depth, 'nodes': result.nodes, 'time_ms': round(result.time * 1000, 1),
+            'nps': int(result.nodes / result.time) if result.time > 0 else 0,
+            **({'stats': result.stats.to_dict()} if stats else {})}
+
+
+def _init_worker(seed, depth, movetime, stats=False):
+    global _worker_engine, _worker_limits
+    _worker_engine = ChessEngine(seed=seed)
+    _worker_engine.load_eval_params()  # mesmos parâmetros ajustados da interface, do UCI e da análise em lote
+    _worker_limits = {'depth': depth, 'movetime': movetime, 'stats': stats}
+
+
+def _analyze_in_worker(fen):
+    return analyze_fen(_worker_engine, fen, **_worker_limits)
+
+
+def iter_fens(fens, files):
+    yield from fens
+    for path in files:
+        handle = sys.stdin if path == '-' else open(path, encoding='utf-8')
+        try:
+            for line in handle:
+                if line.strip() and not line.startswith('#'): yield line
+        finally:
+            if handle is not sys.stdin: handle.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analisa posições (FEN) com a ChessEngine e imprime JSON por linha.")
+    parser.add_argument('fens', nargs='*', help="posições em FEN")
+    parser.add_argument('-f', '--file', action='append', default=[],
+                        help="arquivo com uma FEN por linha ('-' lê da entrada padrão); pode repetir")
+    parser.add_argument('--depth', type=int, help=f"profundidade máxima (padrão {DEFAULT_DEPTH} sem --movetime)")
+    parser.add_argument('--movetime', type=int, help="tempo por posição em milissegundos")
+    parser.add_argument('--workers', type=int, default=1, help="processos em paralelo")
+    parser.add_argument('--seed', type=int, default=0, help="semente da engine (resultados reproduzíveis)")
+    parser.add_argument('--stats', action='store_true', help="inclui as estatísticas da busca (TT, cortes, avaliação)")
+    args = parser.parse_args(argv)
+    if not args.fens and not args.file:
+        parser.error("informe FENs ou --file")
+
+    depth = args.depth or (None if args.movetime else DEFAULT_DEPTH)
+    movetime = args.movetime / 1000 if args.movetime else None
+    fens = iter_fens(args.fens, args.file)
+
+    # Entrada lida sob demanda: um fluxo de FENs pela entrada padrão não fica inteiro na memória
+    for result in map_bounded(_analyze_in_worker, fens, args.workers, _init_worker,
+                              (args.seed, depth, movetime, args.stats)):
+        print(json.dumps(result, ensure_ascii=False), flush=True)
+
+
+if __name__ == "__main__":
+    main()
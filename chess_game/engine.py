@@ -1,12 +1,43 @@
 # meu_xadrez/chess_game/engine.py (VERSÃO FINAL COM ANÁLISE ESTRATÉGICA)
 import chess
+import functools
+import json
+import os
 import random
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from chess_game.book import DEFAULT_BOOK_DEPTH, DEFAULT_BOOK_PATH, book_breadth_for_elo, open_book
+from chess_game.tablebase import DEFAULT_PIECE_LIMIT, DEFAULT_PROBE_DEPTH, DEFAULT_TABLEBASE_PATH, WDL_NAMES, \
+    open_tablebase, wdl_to_score
 
 PIECE_VALUES = {
     chess.PAWN: 100, chess.KNIGHT: 320, chess.BISHOP: 330,
     chess.ROOK: 500, chess.QUEEN: 900, chess.KING: 20000
 }
 
+MAX_SEARCH_DEPTH = 64
+# Notas inteiras em centipawns. Mate a p meios-lances da raiz vale ±(MATE_SCORE - p); acima de MATE_BOUND só há mate
+# (tablebase e bitbases ficam abaixo). INFINITE_SCORE é a janela cheia da busca.
+MATE_SCORE = 100_000
+MATE_BOUND = MATE_SCORE - 1000
+INFINITE_SCORE = MATE_SCORE + 1
+CUTOFF_INDEX_BUCKETS = 8  # cortes beta contados pelo índice da jogada; o último agrupa os demais
+# Com esta variável cada busca acrescenta uma linha JSON (estatísticas) ao arquivo indicado
+DEFAULT_SEARCH_TRACE_PATH = os.environ.get('MEU_XADREZ_SEARCH_TRACE')
+DEFAULT_TT_SIZE = 1_000_000  # entradas da tabela de transposição
+TT_EXACT, TT_LOWER, TT_UPPER = 0, 1, 2
+# Classificação dos lances pela perda (centipawns) em relação ao melhor lance
+BLUNDER_THRESHOLD, MISTAKE_THRESHOLD, INACCURACY_THRESHOLD = 200, 80, 30
+ANALYSIS_MAX_DEPTH = 4
+ANALYSIS_NODE_LIMIT = 20_000  # teto de latência da análise de um lance (~2s)
+# Parâmetros da avaliação ajustados (tuner.py); sem o arquivo valem as constantes abaixo
+DEFAULT_EVAL_PARAMS_PATH = os.environ.get('MEU_XADREZ_EVAL_PARAMS') or os.path.join(os.path.dirname(__file__), '..',
+                                                                                    'assets', 'eval_params.json')
+# Rede da avaliação NNUE (nnue.py); usada só nas engines que chamarem load_nnue()
+DEFAULT_NNUE_PATH = os.environ.get('MEU_XADREZ_NNUE') or os.path.join(os.path.dirname(__file__), '..', 'assets',
+                                                                      'nnue.npz')
+
 PAWN_TABLE = [[0, 0, 0, 0, 0, 0, 0, 0], [50, 50, 50, 50, 50, 50, 50, 50], [10, 10, 20, 30, 30, 20, 10, 10],
               [5, 5, 10, 25, 25, 10, 5, 5], [0, 0, 0, 20, 20, 0, 0, 0], [5, -5, -10, 0, 0, -10, -5, 5],
               [5, 10, 10, -20, -20, 10, 10, 5], [0, 0, 0, 0, 0, 0, 0, 0]]
@@ -34,20 +65,419 @@ KING_TABLE_END_GAME = [[-50, -40, -30, -20, -20, -30, -40, -50], [-30, -20, -10,
 PIECE_TABLES = {chess.PAWN: PAWN_TABLE, chess.KNIGHT: KNIGHT_TABLE, chess.BISHOP: BISHOP_TABLE, chess.ROOK: ROOK_TABLE,
                 chess.QUEEN: QUEEN_TABLE}
 
+BISHOP_PAIR_BONUS, CENTER_ATTACK_BONUS, DOUBLED_PAWN_PENALTY = 50, 5, 20
+
+
+@dataclass
+class EvalParams:
+    piece_values: dict  # tipo de peça -> centipawns
+    tables: dict  # tipo de peça -> tabela 8x8 do ponto de vista das brancas (linha 0 = 8ª fileira); rei no meio-jogo
+    king_endgame_table: list
+    bishop_pair: int = BISHOP_PAIR_BONUS
+    center_attack: int = CENTER_ATTACK_BONUS
+    doubled_pawn: int = DOUBLED_PAWN_PENALTY
+    # Valores por (peça, cor, final) já indexados por casa; montados sob demanda ou em warm_up()
+    position_values: dict = field(default=None, repr=False, compare=False)
+    # Material + tabela com sinal, achatados em [cor][peça][casa], um por fase (meio-jogo, final): usados pelo kernel
+    square_values: tuple = field(default=None, repr=False, compare=False)
+
+    def to_dict(self):
+        return {'piece_values': {chess.piece_symbol(t).upper(): v for t, v in self.piece_values.items()},
+                'tables': {chess.piece_symbol(t).upper(): table for t, table in self.tables.items()},
+                'king_endgame_table': self.king_endgame_table, 'bishop_pair': self.bishop_pair,
+                'center_attack': self.center_attack, 'doubled_pawn': self.doubled_pawn}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls({chess.Piece.from_symbol(s).piece_type: v for s, v in data['piece_values'].items()},
+                   {chess.Piece.from_symbol(s).piece_type: table for s, table in data['tables'].items()},
+                   data['king_endgame_table'], data['bishop_pair'], data['center_attack'], data['doubled_pawn'])
 
-def get_piece_position_value(piece_type, square, color, is_endgame):
-    table = KING_TABLE_END_GAME if is_endgame and piece_type == chess.KING else PIECE_TABLES.get(piece_type)
-    if piece_type == chess.KING and not is_endgame: table = KING_TABLE_MIDDLE_GAME
+
+DEFAULT_EVAL_PARAMS = EvalParams(PIECE_VALUES, {**PIECE_TABLES, chess.KING: KING_TABLE_MIDDLE_GAME},
+                                 KING_TABLE_END_GAME)
+
+
+def _table_position_value(params, piece_type, square, color, is_endgame):
+    table = params.king_endgame_table if is_endgame and piece_type == chess.KING else params.tables.get(piece_type)
     if table:
         rank, file = chess.square_rank(square), chess.square_file(square)
         return table[7 - rank][file] if color == chess.WHITE else table[rank][file]
     return 0
 
 
+def build_position_tables(params=DEFAULT_EVAL_PARAMS):
+    if params.position_values is None:
+        params.position_values = {(piece_type, color, is_endgame): [
+            _table_position_value(params, piece_type, square, color, is_endgame) for square in chess.SQUARES]
+            for piece_type in chess.PIECE_TYPES for color in chess.COLORS for is_endgame in (False, True)}
+    return params.position_values
+
+
+def build_square_values(params=DEFAULT_EVAL_PARAMS):
+    # Índice (cor * 7 + tipo) * 64 + casa; brancas positivas, pretas negativas
+    if params.square_values is None:
+        values = build_position_tables(params)
+        params.square_values = tuple([
+            (1 if color == chess.WHITE else -1) * (params.piece_values.get(piece_type, 0) +
+                                                  values[piece_type, color, is_endgame][square])
+            if piece_type else 0 for color in (chess.BLACK, chess.WHITE) for piece_type in range(7)
+            for square in chess.SQUARES] for is_endgame in (False, True))
+    return params.square_values
+
+
+@functools.lru_cache(maxsize=None)
+def open_eval_params(path):
+    # Parâmetros gravados pelo tuner; None se o arquivo não existir
+    if not os.path.exists(path): return None
+    with open(path, encoding='utf-8') as f:
+        return EvalParams.from_dict(json.load(f))
+
+
+CENTER_SQUARES = (chess.D4, chess.E4, chess.D5, chess.E5)
+BB_CENTER = chess.SquareSet(CENTER_SQUARES).mask
+
+
+def _center_sources(attacks):
+    # Máscaras das casas de onde a peça ataca ao menos 1, 2, 3 casas centrais: a soma dos popcounts de
+    # peças & máscara é o total de ataques ao centro contado por atacante, como len(board.attackers()) casa a casa
+    hits = [(attacks[square] & BB_CENTER).bit_count() for square in chess.SQUARES]
+    return [sum(chess.BB_SQUARES[square] for square in chess.SQUARES if hits[square] >= count) for count in (1, 2, 3)]
+
+
+# Por cor, um nível por linha: (peões, cavalos, rei); cada casa tem uma peça só, então o OR das três partes não
+# junta ataques de peças diferentes e basta um bit_count() por nível
+CENTER_SOURCES = {color: tuple(zip(_center_sources(chess.BB_PAWN_ATTACKS[color]),
+                                   _center_sources(chess.BB_KNIGHT_ATTACKS), _center_sources(chess.BB_KING_ATTACKS)))
+                  for color in chess.COLORS}
+# Raios das casas centrais (diagonais, fileira, coluna) nas tabelas de ataques deslizantes do python-chess
+CENTER_RAYS = tuple((chess.BB_DIAG_ATTACKS[square], chess.BB_DIAG_MASKS[square], chess.BB_RANK_ATTACKS[square],
+                     chess.BB_RANK_MASKS[square], chess.BB_FILE_ATTACKS[square], chess.BB_FILE_MASKS[square])
+                    for square in CENTER_SQUARES)
+
+
+def center_control(board: chess.Board):
+    # Ataques às casas centrais (brancas, pretas), contados por atacante, só com ANDs e int.bit_count()
+    occupied, pawns, knights, kings = board.occupied, board.pawns, board.knights, board.kings
+    black_pieces, white_pieces = board.occupied_co
+    white = black = 0
+    for pawn_mask, knight_mask, king_mask in CENTER_SOURCES[chess.WHITE]:
+        white += (white_pieces & ((pawns & pawn_mask) | (knights & knight_mask) | (kings & king_mask))).bit_count()
+    for pawn_mask, knight_mask, king_mask in CENTER_SOURCES[chess.BLACK]:
+        black += (black_pieces & ((pawns & pawn_mask) | (knights & knight_mask) | (kings & king_mask))).bit_count()
+    diagonal, straight = board.bishops | board.queens, board.rooks | board.queens
+    for diag_attacks, diag_mask, rank_attacks, rank_mask, file_attacks, file_mask in CENTER_RAYS:
+        attackers = (diag_attacks[diag_mask & occupied] & diagonal) | \
+            ((rank_attacks[rank_mask & occupied] | file_attacks[file_mask & occupied]) & straight)
+        if attackers:
+            white += (attackers & white_pieces).bit_count()
+            black += (attackers & black_pieces).bit_count()
+    return white, black
+
+
+# Termos da avaliação: cada um recebe o piece_map() já calculado e os parâmetros da engine e devolve centipawns do
+# ponto de vista das brancas
+def _eval_material(board, pieces, is_endgame, params):
+    score = 0
+    for piece in pieces.values():
+        value = params.piece_values.get(piece.piece_type, 0)
+        score += value if piece.color == chess.WHITE else -value
+    return score
+
+
+def _eval_piece_squares(board, pieces, is_endgame, params):
+    values = params.position_values or build_position_tables(params)
+    score = 0
+    for square, piece in pieces.items():
+        value = values[piece.piece_type, piece.color, is_endgame][square]
+        score += value if piece.color == chess.WHITE else -value
+    return score
+
+
+def _eval_bishop_pair(board, pieces, is_endgame, params):
+    score = 0
+    if (board.bishops & board.occupied_co[chess.WHITE]).bit_count() >= 2: score += params.bishop_pair
+    if (board.bishops & board.occupied_co[chess.BLACK]).bit_count() >= 2: score -= params.bishop_pair
+    return score
+
+
+def _eval_center(board, pieces, is_endgame, params):
+    white, black = center_control(board)
+    return (white - black) * params.center_attack
+
+
+def doubled_pawns(pawns):
+    # Peões além do primeiro em cada coluna: total de peões menos colunas ocupadas (colunas dobradas na 1ª fileira)
+    files = pawns | pawns >> 32
+    files |= files >> 16
+    files |= files >> 8
+    return pawns.bit_count() - (files & 0xFF).bit_count()
+
+
+def _eval_doubled_pawns(board, pieces, is_endgame, params):
+    return params.doubled_pawn * (doubled_pawns(board.pawns & board.occupied_co[chess.BLACK]) -
+                                  doubled_pawns(board.pawns & board.occupied_co[chess.WHITE]))
+
+
+EVAL_TERMS = [('material', _eval_material), ('pst', _eval_piece_squares), ('bishop_pair', _eval_bishop_pair),
+              ('center', _eval_center), ('doubled_pawns', _eval_doubled_pawns)]
+EVAL_TERM_LABELS = {'material': "o material", 'pst': "a posição das peças", 'bishop_pair': "o par de bispos",
+                    'center': "o controle do centro", 'doubled_pawns': "a estrutura de peões"}
+
+
+def evaluate_kernel(board: chess.Board, params=DEFAULT_EVAL_PARAMS):
+    # A soma de EVAL_TERMS lendo os bitboards direto: sem piece_map(), Piece nem SquareSet; as casas saem dos bits
+    # menos significativos e os valores das tabelas achatadas de build_square_values()
+    values = (params.square_values or build_square_values(params))[board.occupied.bit_count() < 10]
+    black_pieces, white_pieces = board.occupied_co
+    score = 0
+    for offset, pieces in ((64, board.pawns), (128, board.knights), (192, board.bishops), (256, board.rooks),
+                           (320, board.queens), (384, board.kings)):
+        own, base = pieces & white_pieces, offset + 448
+        while own:
+            bit = own & -own
+            score += values[base + bit.bit_length() - 1]
+            own ^= bit
+        own = pieces & black_pieces
+        while own:
+            bit = own & -own
+            score += values[offset + bit.bit_length() - 1]
+            own ^= bit
+    bishops, pawns = board.bishops, board.pawns
+    if (bishops & white_pieces).bit_count() >= 2: score += params.bishop_pair
+    if (bishops & black_pieces).bit_count() >= 2: score -= params.bishop_pair
+    white_center, black_center = center_control(board)
+    score += (white_center - black_center) * params.center_attack
+    return score + params.doubled_pawn * (doubled_pawns(pawns & black_pieces) - doubled_pawns(pawns & white_pieces))
+
+
+def terminal_score(board: chess.Board):
+    # Mate, afogamento ou material insuficiente; None se a partida continua. Uma só geração de jogadas (parando na
+    # primeira) responde mate e afogamento; o mate vale ±MATE_SCORE (a busca desconta a distância)
+    if not any(board.generate_legal_moves()):
+        if board.is_check(): return -MATE_SCORE if board.turn == chess.WHITE else MATE_SCORE
+        return 0
+    if board.is_insufficient_material(): return 0
+    return None
+
+
+def is_mate_score(score):
+    return abs(score) >= MATE_BOUND
+
+
+def mate_moves(score):
+    # Lances até o mate (positivo: brancas dão mate) de uma nota do ponto de vista das brancas; None se não é mate
+    if not is_mate_score(score): return None
+    moves = (MATE_SCORE - abs(score) + 1) // 2
+    return moves if score > 0 else -moves
+
+
+def format_score(score):
+    # "+0.35", "M3" (brancas dão mate em 3) ou "-M3"
+    if is_mate_score(score): return f"{'-' if score < 0 else ''}M{abs(mate_moves(score))}"
+    return f"{score / 100:+.2f}"
+
+
+def score_to_tt(score, ply):
+    # Mate guardado na TT como distância a partir do nó, para valer em qualquer ply em que a posição reapareça
+    if score >= MATE_BOUND: return score + ply
+    if score <= -MATE_BOUND: return score - ply
+    return score
+
+
+def score_from_tt(score, ply):
+    if score >= MATE_BOUND: return score - ply
+    if score <= -MATE_BOUND: return score + ply
+    return score
+
+
+class SearchAborted(Exception):
+    pass
+
+
+@dataclass
+class PVLine:
+    move: chess.Move
+    score: float
+    pv: list
+
+
+@dataclass
+class SearchStats:
+    fen: str = ''
+    nodes: int = 0
+    qnodes: int = 0  # nós de quiescência (a busca ainda não tem quiescência: as folhas são avaliadas direto)
+    tt_probes: int = 0
+    tt_hits: int = 0
+    tt_cutoffs: int = 0  # nós resolvidos só pela TT
+    beta_cutoffs: list = field(default_factory=lambda: [0] * CUTOFF_INDEX_BUCKETS)
+    seldepth: int = 0
+    eval_calls: int = 0
+    eval_time: float = 0.0  # segundos dentro de evaluate_board
+    iterations: list = field(default_factory=list)  # por profundidade concluída: {'depth', 'nodes', 'time'}
+    time: float = 0.0
+
+    @property
+    def ebf(self):
+        # Fator de ramificação efetivo: nós da última iteração completa sobre os da anterior
+        if len(self.iterations) < 2 or not self.iterations[-2]['nodes']: return None
+        return self.iterations[-1]['nodes'] / self.iterations[-2]['nodes']
+
+    def to_dict(self):
+        return {**asdict(self), 'ebf': self.ebf}
+
+
+@dataclass
+class SearchResult:
+    move: chess.Move | None
+    score: int  # centipawns do ponto de vista das brancas (mate: ±(MATE_SCORE - meios-lances))
+    depth: int
+    nodes: int
+    time: float  # segundos
+    pv: list = field(default_factory=list)
+    lines: list = field(default_factory=list)  # PVLine por variante (multipv), a melhor primeiro; depois exact_moves
+    stats: SearchStats = None
+
+
+@dataclass
+class StrengthLevel:
+    nodes: int  # orçamento de nós por lance
+    movetime: float  # teto de tempo por lance (segundos)
+    noise: int  # ruído máximo (centipawns) somado à avaliação das folhas
+    multipv: int  # linhas candidatas na raiz
+    margin: int  # perda máxima (centipawns) em relação à melhor linha para entrar no sorteio
+
+
+# Força por Elo: latência limitada e previsível por lance (a ~10k nós/s) em vez de profundidade fixa
+STRENGTH_BY_ELO = {
+    100: StrengthLevel(nodes=150, movetime=0.1, noise=200, multipv=5, margin=400),
+    400: StrengthLevel(nodes=600, movetime=0.25, noise=100, multipv=4, margin=200),
+    800: StrengthLevel(nodes=2500, movetime=0.5, noise=50, multipv=3, margin=100),
+    1200: StrengthLevel(nodes=8000, movetime=1.0, noise=20, multipv=2, margin=40),
+    1600: StrengthLevel(nodes=25000, movetime=2.5, noise=0, multipv=1, margin=0),
+}
+
+
+def strength_for_elo(elo):
+    levels = sorted(STRENGTH_BY_ELO.items())
+    strength = levels[0][1]
+    for current_elo, level in levels:
+        if elo >= current_elo:
+            strength = level
+        else:
+            break
+    return strength
+
+
+def classify_move(score_drop, is_best, score_change=0):
+    # score_drop: perda do lance jogado para o melhor, de buscas (centipawns, ponto de vista de quem jogou).
+    # score_change: variação da avaliação estática com o lance jogado. O melhor lance que ainda piora a avaliação
+    # é "Melhor Defesa"; fora dele, piorar mais que INACCURACY_THRESHOLD rebaixa o "Good Move" para "Inaccuracy"
+    if is_best: return "Best Move" if score_change >= 0 else "Melhor Defesa"
+    if score_drop >= BLUNDER_THRESHOLD: return "Blunder"
+    if score_drop >= MISTAKE_THRESHOLD: return "Mistake"
+    if score_drop >= INACCURACY_THRESHOLD or score_change < -INACCURACY_THRESHOLD: return "Inaccuracy"
+    return "Good Move"
+
+
+def mate_explanation(board: chess.Board, best_move, best_score, player_score):
+    # Texto da perda quando há mate na melhor linha ou na do jogador (notas do ponto de vista de quem jogou)
+    best_mate, player_mate = mate_moves(best_score), mate_moves(player_score)
+    best_san = f" com {board.san(best_move)}" if best_move else ""
+    if best_mate and best_mate > 0 and not (player_mate and player_mate > 0):
+        allowed = f" e ainda permite mate em {-player_mate}" if player_mate else ""
+        return f"Havia mate em {best_mate}{best_san}; esta jogada deixou o mate escapar{allowed}. "
+    if best_mate and player_mate and player_mate > best_mate > 0:
+        return f"Havia mate em {best_mate}{best_san}; esta jogada só dá mate em {player_mate}. "
+    if player_mate and player_mate < 0:
+        defense = f" (a melhor defesa resistia até o mate em {-best_mate})" if best_mate else ""
+        return f"Esta jogada permite mate em {-player_mate}{defense}. "
+    return None
+
+
+def order_moves(board: chess.Board, tt_move=None):
+    # Ordem de busca: jogada da TT, depois capturas, depois o resto
+    moves = sorted(board.legal_moves, key=board.is_capture, reverse=True)
+    if tt_move in moves:
+        moves.remove(tt_move)
+        moves.insert(0, tt_move)
+    return moves
+
+
 class ChessEngine:
-    def __init__(self, depth=2):
+    def __init__(self, depth=2, seed=None, tt_size=DEFAULT_TT_SIZE):
         self.depth = depth
+        self.rng = random.Random(seed)
         self.elo_depth_map = {100: 1, 400: 2, 800: 3, 1200: 4, 1600: 5}
+        self.tt = {}
+        self.tt_size = tt_size
+        self.nodes = 0
+        self.deadline = None
+        self.node_limit = None
+        self.stop_event = threading.Event()
+        # Prazo absoluto pedido de outra thread (ponderhit); como o stop_event, vale mesmo se chegar antes de a busca
+        # começar, porque search() só o limpa ao terminar
+        self.stop_at = None
+        self.book = None
+        self.book_depth = DEFAULT_BOOK_DEPTH
+        self.book_breadth = None
+        self.tablebase = None
+        self.bitbases = None
+        self.strength = None  # StrengthLevel do Elo escolhido; None = busca sem limite de força
+        self.time_limits = True  # desligado em gravações/replays para que só o orçamento de nós conte
+        self.noise, self.noise_salt = 0, 0  # ruído ativo só durante search_limited()
+        self.stats, self.root_depth = SearchStats(), 0  # estatísticas da busca atual (ou da última)
+        self.last_result = None  # SearchResult da última busca concluída (nota mostrada na interface)
+        self.stats_listener = None  # chamado com o SearchResult (e suas estatísticas) ao fim de cada busca
+        self.status_listener = None  # recebe as mensagens de estado (texto); sem ouvinte a engine não escreve nada
+        self.trace_path = DEFAULT_SEARCH_TRACE_PATH
+        self.eval_profiler = None  # EvalProfiler: avaliação instrumentada, tempo e chamadas por etapa (ou por termo)
+        self.eval_params = DEFAULT_EVAL_PARAMS
+        self.nnue = None  # NNUEEvaluator: avaliação pela rede no lugar dos termos clássicos
+
+    def load_book(self, path=DEFAULT_BOOK_PATH):
+        # Livro opcional: sem o arquivo a engine simplesmente busca desde o primeiro lance
+        self.book = open_book(path)
+        return self.book is not None
+
+    def load_tablebase(self, path=DEFAULT_TABLEBASE_PATH, piece_limit=DEFAULT_PIECE_LIMIT,
+                       probe_depth=DEFAULT_PROBE_DEPTH):
+        # Syzygy opcional: WDL dentro da busca, DTZ na raiz e classificação exata em analyze_move
+        self.tablebase = open_tablebase(path, piece_limit, probe_depth)
+        return self.tablebase is not None
+
+    def load_bitbases(self, path=None, generate_missing=False):
+        # Bitbases KPK/KQK/KRK/KBNK geradas localmente: importadas sob demanda para não pesar no import da engine
+        try:
+            from chess_game.bitbase import DEFAULT_BITBASE_PATH, open_bitbases
+        except ImportError:
+            self.bitbases = None  # sem numpy a engine segue sem bitbases, como sem livro ou tablebase
+            return False
+        self.bitbases = open_bitbases(path or DEFAULT_BITBASE_PATH, generate_missing)
+        return self.bitbases is not None
+
+    def load_eval_params(self, path=DEFAULT_EVAL_PARAMS_PATH):
+        # Parâmetros ajustados pelo tuner; sem o arquivo a engine fica com as constantes do código
+        params = open_eval_params(path)
+        if params: self.eval_params = params
+        return params is not None
+
+    def load_nnue(self, path=None):
+        # Troca a avaliação desta engine pela rede (importada sob demanda: numpy só para quem usa); sem o arquivo
+        # a engine continua com a avaliação clássica
+        from chess_game.nnue import NNUEEvaluator, open_network
+        network = open_network(path or DEFAULT_NNUE_PATH)
+        self.nnue = NNUEEvaluator(network) if network else None
+        return self.nnue is not None
+
+    def warm_up(self):
+        # Pré-computa tabelas e caches da engine; chamado em segundo plano enquanto o menu está aberto
+        self.load_eval_params()
+        build_square_values(self.eval_params)
+        self.load_book()
+        self.load_tablebase()
+        self.load_bitbases(generate_missing=True)
+        self.evaluate_board(chess.Board())
 
     def set_difficulty_elo(self, elo):
         selected_depth = 1
@@ -56,83 +486,327 @@ class ChessEngine:
                 selected_depth = depth_val
             else:
                 break
-        self.depth = selected_depth
-        print(f"Dificuldade da IA definida para Elo {elo}, Profundidade: {self.depth}")
-
-    def evaluate_board(self, board: chess.Board):
-        if board.is_checkmate(): return -float('inf') if board.turn == chess.WHITE else float('inf')
-        if board.is_stalemate() or board.is_insufficient_material(): return 0
-
-        score = 0;
-        is_endgame = len(board.piece_map()) < 10
-
-        for square, piece in board.piece_map().items():
-            value = PIECE_VALUES.get(piece.piece_type, 0)
-            value += get_piece_position_value(piece.piece_type, square, piece.color, is_endgame)
-            score += value if piece.color == chess.WHITE else -value
-
-        if len(board.pieces(chess.BISHOP, chess.WHITE)) >= 2: score += 50
-        if len(board.pieces(chess.BISHOP, chess.BLACK)) >= 2: score -= 50
-
-        for square in [chess.D4, chess.E4, chess.D5, chess.E5]:
-            score += len(board.attackers(chess.WHITE, square)) * 5
-            score -= len(board.attackers(chess.BLACK, square)) * 5
-
-        for file_index in range(8):
-            white_pawns = len(board.pieces(chess.PAWN, chess.WHITE).intersection(chess.BB_FILES[file_index]))
-            black_pawns = len(board.pieces(chess.PAWN, chess.BLACK).intersection(chess.BB_FILES[file_index]))
-            if white_pawns > 1: score -= 20 * (white_pawns - 1)
-            if black_pawns > 1: score += 20 * (black_pawns - 1)
+        self.depth = selected_depth  # usada na análise dos lances do jogador
+        self.strength = strength_for_elo(elo)
+        self.book_breadth = book_breadth_for_elo(elo)
+        if self.status_listener:
+            self.status_listener(f"Dificuldade da IA definida para Elo {elo}: até {self.strength.nodes} nós / "
+                                 f"{self.strength.movetime:.2f}s por lance")
+
+    def evaluate_board(self, board: chess.Board, incremental=False):
+        # incremental: board é o nó atual da busca, cujo acumulador da rede já está no topo da pilha
+        if self.eval_profiler: return self.evaluate_profiled(board, incremental)
+        if (score := terminal_score(board)) is not None: return score
+        if self.nnue: return self.nnue.evaluate(board, incremental)
+        return evaluate_kernel(board, self.eval_params)
+
+    def evaluate_profiled(self, board: chess.Board, incremental=False):
+        # Cronometra as etapas no eval_profiler: fim de jogo e kernel (ou rede), como na avaliação normal; com
+        # eval_profiler.terms, roda os termos de EVAL_TERMS um a um (mesma nota, caminho mais lento que o kernel)
+        profiler, clock = self.eval_profiler, time.perf_counter
+        start = clock()
+        score = terminal_score(board)
+        profiler.record('terminal', clock() - start)
+        if score is not None: return score
+        if self.nnue:
+            start = clock()
+            score = self.nnue.evaluate(board, incremental)
+            profiler.record('nnue', clock() - start)
+            return score
+        if not profiler.terms:
+            start = clock()
+            score = evaluate_kernel(board, self.eval_params)
+            profiler.record('kernel', clock() - start)
+            return score
+        start = clock()
+        pieces = board.piece_map()
+        is_endgame = len(pieces) < 10
+        profiler.record('piece_map', clock() - start)
+        score = 0
+        for name, term in EVAL_TERMS:
+            start = clock()
+            score += term(board, pieces, is_endgame, self.eval_params)
+            profiler.record(name, clock() - start)
         return score
 
+    def evaluation_breakdown(self, board: chess.Board):
+        # Contribuição de cada termo (centipawns, ponto de vista das brancas) e o total; para a interface e explicações
+        pieces = board.piece_map()
+        is_endgame = len(pieces) < 10
+        breakdown = {name: term(board, pieces, is_endgame, self.eval_params) for name, term in EVAL_TERMS}
+        terminal = terminal_score(board)
+        breakdown['total'] = sum(breakdown.values()) if terminal is None else terminal
+        return breakdown
+
+    def check_limits(self):
+        if self.node_limit and self.nodes >= self.node_limit: raise SearchAborted
+        if self.nodes & 1023 == 0:
+            now = time.perf_counter()
+            if self.stop_event.is_set() or (self.deadline and now >= self.deadline) or \
+                    (self.stop_at and now >= self.stop_at):
+                raise SearchAborted
+
+    def push_move(self, board: chess.Board, move: chess.Move):
+        # Faz a jogada na busca mantendo os acumuladores da rede em dia (make/unmake incremental)
+        if self.nnue: self.nnue.push(board, move)
+        board.push(move)
+
+    def pop_move(self, board: chess.Board):
+        if self.nnue: self.nnue.pop()
+        board.pop()
+
+    def eval_noise(self, key):
+        # Ruído fixo por posição dentro de uma busca (coerente com a TT). O en passant fica fora do hash porque
+        # hash(None) muda entre processos e quebraria a reprodução das partidas gravadas.
+        return hash((self.noise_salt,) + key[:10]) % (2 * self.noise + 1) - self.noise
+
+    def store_tt(self, key, depth, value, flag, move, ply=0):
+        if len(self.tt) >= self.tt_size: self.tt.clear()
+        self.tt[key] = (depth, score_to_tt(value, ply), flag, move)
+
     def minimax(self, board: chess.Board, depth, alpha, beta, maximizing_player):
-        if depth == 0 or board.is_game_over(): return self.evaluate_board(board)
-        legal_moves = sorted(list(board.legal_moves), key=board.is_capture, reverse=True)
+        self.nodes += 1
+        self.check_limits()
+        stats = self.stats
+        ply = self.root_depth - depth
+        if ply > stats.seldepth: stats.seldepth = ply
+        # Poda pela distância do mate: daqui ninguém faz melhor que mate neste ply
+        if -(MATE_SCORE - ply) >= beta: return -(MATE_SCORE - ply)
+        if MATE_SCORE - ply <= alpha: return MATE_SCORE - ply
+        alpha, beta = max(alpha, -(MATE_SCORE - ply)), min(beta, MATE_SCORE - ply)
+        key = board._transposition_key()
+        tt_move = None
+        stats.tt_probes += 1
+        if entry := self.tt.get(key):
+            stats.tt_hits += 1
+            tt_depth, tt_value, tt_flag, tt_move = entry
+            tt_value = score_from_tt(tt_value, ply)
+            if tt_depth >= depth:
+                if tt_flag == TT_LOWER: alpha = max(alpha, tt_value)
+                elif tt_flag == TT_UPPER: beta = min(beta, tt_value)
+                if tt_flag == TT_EXACT or beta <= alpha:
+                    stats.tt_cutoffs += 1
+                    return tt_value
+
+        if self.tablebase and depth >= self.tablebase.probe_depth and self.tablebase.can_probe(board):
+            wdl = self.tablebase.probe_wdl(board)
+            if wdl is not None: return wdl_to_score(wdl, board.turn)
+
+        if self.bitbases and (verdict := self.bitbases.probe(board)) is not None:
+            # Empate teórico corta a busca; na vitória a busca continua (para achar o mate) e as folhas recebem a
+            # nota de vitória conhecida com o incentivo de progresso
+            if not verdict: return 0
+            if depth == 0 and not board.is_checkmate(): return self.bitbases.win_score(board)
+
+        if depth == 0 or board.is_game_over():
+            eval_start = time.perf_counter()
+            score = self.evaluate_board(board, incremental=True)
+            stats.eval_calls += 1
+            stats.eval_time += time.perf_counter() - eval_start
+            if is_mate_score(score): return score - ply if score > 0 else score + ply
+            if self.noise: score += self.eval_noise(key)
+            return score
+        legal_moves = order_moves(board, tt_move)
+
+        alpha_orig, beta_orig, best_move = alpha, beta, None
         if maximizing_player:
-            max_eval = -float('inf')
-            for move in legal_moves:
-                board.push(move);
-                eval = self.minimax(board, depth - 1, alpha, beta, False);
-                board.pop()
-                max_eval = max(max_eval, eval);
+            best_eval = -INFINITE_SCORE
+            for index, move in enumerate(legal_moves):
+                self.push_move(board, move)
+                eval = self.minimax(board, depth - 1, alpha, beta, False)
+                self.pop_move(board)
+                if best_move is None or eval > best_eval: best_eval, best_move = eval, move
                 alpha = max(alpha, eval)
-                if beta <= alpha: break
-            return max_eval
+                if beta <= alpha:
+                    stats.beta_cutoffs[min(index, CUTOFF_INDEX_BUCKETS - 1)] += 1
+                    break
         else:
-            min_eval = float('inf')
-            for move in legal_moves:
-                board.push(move);
-                eval = self.minimax(board, depth - 1, alpha, beta, True);
-                board.pop()
-                min_eval = min(min_eval, eval);
+            best_eval = INFINITE_SCORE
+            for index, move in enumerate(legal_moves):
+                self.push_move(board, move)
+                eval = self.minimax(board, depth - 1, alpha, beta, True)
+                self.pop_move(board)
+                if best_move is None or eval < best_eval: best_eval, best_move = eval, move
                 beta = min(beta, eval)
-                if beta <= alpha: break
-            return min_eval
+                if beta <= alpha:
+                    stats.beta_cutoffs[min(index, CUTOFF_INDEX_BUCKETS - 1)] += 1
+                    break
+
+        flag = TT_UPPER if best_eval <= alpha_orig else TT_LOWER if best_eval >= beta_orig else TT_EXACT
+        self.store_tt(key, depth, best_eval, flag, best_move, ply)
+        return best_eval
+
+    def search_root(self, board: chess.Board, depth, legal_moves, multipv=1, exact_moves=()):
+        # Devolve (nota, jogada) de todas as jogadas, melhores primeiro. As `multipv` primeiras têm nota exata:
+        # a janela de cada jogada começa na pior das melhores já encontradas, as demais ficam só com um limite.
+        # Jogadas em exact_moves são buscadas com janela cheia e também ficam com nota exata.
+        maximizing = board.turn == chess.WHITE
+        sign = 1 if maximizing else -1
+        top, rest = [], []
+        for move in legal_moves:
+            threshold = top[-1][0] if len(top) >= multipv else -sign * INFINITE_SCORE
+            alpha, beta = (threshold, INFINITE_SCORE) if maximizing else (-INFINITE_SCORE, threshold)
+            if move in exact_moves: alpha, beta = -INFINITE_SCORE, INFINITE_SCORE
+            self.push_move(board, move)
+            eval = self.minimax(board, depth - 1, alpha, beta, not maximizing)
+            self.pop_move(board)
+            if sign * eval > sign * threshold:
+                idx = next((i for i, (v, _) in enumerate(top) if sign * eval > sign * v), len(top))
+                top.insert(idx, (eval, move))
+                if len(top) > multipv: rest.append(top.pop())
+            else:
+                rest.append((eval, move))
+        # Se todas as jogadas perdem (mate inevitável), a primeira ainda é devolvida como melhor
+        scored = top + sorted(rest, key=lambda item: -sign * item[0])
+        self.store_tt(board._transposition_key(), depth, scored[0][0], TT_EXACT, scored[0][1])
+        return scored, len(top) or 1
+
+    def extract_pv(self, board: chess.Board, first_move, max_length):
+        pv, board = [first_move], board.copy(stack=False)
+        board.push(first_move)
+        while len(pv) < max_length:
+            entry = self.tt.get(board._transposition_key())
+            if not entry or entry[3] is None or not board.is_legal(entry[3]): break
+            pv.append(entry[3])
+            board.push(entry[3])
+        return pv
+
+    def search(self, board: chess.Board, depth=None, movetime=None, nodes=None, info_callback=None, multipv=1,
+               exact_moves=()):
+        # Aprofundamento iterativo; movetime em segundos. Sem limites explícitos usa self.depth.
+        # stop_event só é limpo ao final, para que um pedido de parada feito antes do início não se perca.
+        start = time.perf_counter()
+        board = board.copy(stack=False)
+        self.stats, self.nodes = SearchStats(board.fen()), 0
+        legal_moves = list(board.legal_moves)
+        if not legal_moves:
+            return self.finish_search(SearchResult(None, self.evaluate_board(board), 0, 0, 0), start)
+
+        if ranked := self.probe_root_tablebase(board):
+            # Vitória ou derrota: a jogada vem direto da DTZ. Empate: a busca escolhe entre as que empatam.
+            best_wdl = ranked[0][0]
+            if abs(best_wdl) == 2:
+                line = PVLine(ranked[0][2], wdl_to_score(best_wdl, board.turn), [ranked[0][2]])
+                result = SearchResult(line.move, line.score, 0, 0, 0, line.pv, [line])
+                if info_callback: info_callback(result)
+                return self.finish_search(result, start)
+            legal_moves = [move for wdl, _, move in ranked if wdl == best_wdl]
+
+        max_depth = depth or (MAX_SEARCH_DEPTH if movetime or nodes else self.depth)
+        self.node_limit = nodes
+        self.deadline = start + movetime if movetime else None
+        self.rng.shuffle(legal_moves)
+
+        result = None
+        if self.nnue: self.nnue.reset(board)
+        try:
+            for current_depth in range(1, max_depth + 1):
+                iteration_start, iteration_nodes, self.root_depth = time.perf_counter(), self.nodes, current_depth
+                scored, exact = self.search_root(board, current_depth, legal_moves, multipv, exact_moves)
+                self.stats.iterations.append({'depth': current_depth, 'nodes': self.nodes - iteration_nodes,
+                                              'time': time.perf_counter() - iteration_start})
+                legal_moves = [move for _, move in scored]
+                lines = [PVLine(move, score, self.extract_pv(board, move, current_depth))
+                         for score, move in scored[:exact]]
+                lines += [PVLine(move, score, self.extract_pv(board, move, current_depth))
+                          for score, move in scored[exact:] if move in exact_moves]
+                result = SearchResult(lines[0].move, lines[0].score, current_depth, self.nodes,
+                                      time.perf_counter() - start, lines[0].pv, lines)
+                if info_callback: info_callback(result)
+                if is_mate_score(result.score): break  # o primeiro mate encontrado já é o mais curto
+        except SearchAborted:
+            # A parada sai do meio da árvore: desfaz as jogadas que ficaram no tabuleiro (e nos acumuladores da rede)
+            while board.move_stack: self.pop_move(board)
+        finally:
+            self.deadline = self.node_limit = self.stop_at = None
+            self.stop_event.clear()
+
+        if result is None:
+            fallback = PVLine(legal_moves[0], self.evaluate_board(board), [legal_moves[0]])
+            result = SearchResult(fallback.move, fallback.score, 0, 0, 0, fallback.pv, [fallback])
+        return self.finish_search(result, start)
+
+    def finish_search(self, result, start):
+        # Fecha as estatísticas, anexa ao resultado e avisa o ouvinte e o trace
+        stats = result.stats = self.stats
+        stats.nodes, stats.time = self.nodes, time.perf_counter() - start
+        result.nodes, result.time = stats.nodes, stats.time
+        self.last_result = result
+        if self.stats_listener: self.stats_listener(result)
+        if self.trace_path: self.write_trace(result)
+        return result
+
+    def write_trace(self, result):
+        # Uma linha JSON por busca; mate vira score null e 'mate' com os lances até o mate
+        mate = mate_moves(result.score)
+        record = {'move': result.move.uci() if result.move else None, 'score': None if mate is not None else
+                  result.score, 'mate': mate, 'depth': result.depth,
+                  **result.stats.to_dict()}
+        with open(self.trace_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record) + '\n')
+
+    def probe_book(self, board: chess.Board):
+        if not self.book: return None
+        return self.book.probe(board, self.rng, self.book_breadth, self.book_depth)
+
+    def probe_root_tablebase(self, board: chess.Board):
+        if self.tablebase and self.tablebase.can_probe(board): return self.tablebase.rank_root_moves(board)
+        return None
+
+    def search_limited(self, board: chess.Board, movetime=None, info_callback=None):
+        # Joga com a força do Elo: orçamento de nós (com teto de tempo), ruído na avaliação e sorteio entre as
+        # melhores linhas do multi-PV
+        level = self.strength
+        movetime = min(movetime or level.movetime, level.movetime) if self.time_limits else None
+        self.noise, self.noise_salt = level.noise, self.rng.getrandbits(32)
+        # Com ruído a busca usa uma TT própria: notas ruidosas não podem contaminar a análise feita na mesma engine
+        shared_tt = self.tt
+        if self.noise: self.tt = {}
+        try:
+            result = self.search(board, depth=MAX_SEARCH_DEPTH, movetime=movetime, nodes=level.nodes,
+                                 info_callback=info_callback, multipv=level.multipv)
+        finally:
+            self.noise, self.tt = 0, shared_tt
+        if line := self.sample_line(result.lines, board.turn, level.margin):
+            result.move, result.score, result.pv = line.move, line.score, line.pv
+        return result
+
+    def sample_line(self, lines, turn, margin):
+        # Sorteio ponderado pela perda em relação à melhor linha; com mate (a favor ou contra) joga a melhor
+        if len(lines) <= 1: return lines[0] if lines else None
+        sign = 1 if turn == chess.WHITE else -1
+        best = sign * lines[0].score
+        if is_mate_score(best): return lines[0]
+        candidates = [(line, best - sign * line.score) for line in lines]
+        candidates = [(line, loss) for line, loss in candidates if loss <= margin]
+        return self.rng.choices([line for line, _ in candidates],
+                                weights=[margin - loss + 1 for _, loss in candidates])[0]
+
+    def find_best_moves(self, board: chess.Board, n=3, depth=None, movetime=None, nodes=None, info_callback=None):
+        # As n melhores jogadas (PVLine com nota e variante), melhor primeiro, numa única busca multi-PV que
+        # compartilha a TT; sem ruído nem sorteio. Sem limites explícitos usa o orçamento do Elo (ou self.depth).
+        if depth is None and movetime is None and nodes is None and self.strength:
+            nodes, movetime = self.strength.nodes, self.strength.movetime if self.time_limits else None
+        return self.search(board, depth, movetime, nodes, info_callback, multipv=n).lines
 
     def find_best_move(self, board: chess.Board):
-        best_move, maximizing = None, board.turn == chess.WHITE
-        best_eval = -float('inf') if maximizing else float('inf')
+        if book_move := self.probe_book(board): return book_move
+        if self.strength: return self.search_limited(board).move
         legal_moves = list(board.legal_moves)
-        if self.depth <= 1 and legal_moves: return random.choice(legal_moves)
-        random.shuffle(legal_moves)
-        for move in legal_moves:
-            board.push(move);
-            eval = self.minimax(board, self.depth - 1, -float('inf'), float('inf'), not maximizing);
-            board.pop()
-            if maximizing:
-                if eval > best_eval: best_eval, best_move = eval, move
-            elif not maximizing:
-                if eval < best_eval: best_eval, best_move = eval, move
-        return best_move
+        if self.depth <= 1 and legal_moves: return self.rng.choice(legal_moves)
+        return self.search(board).move
 
     def get_position_evaluation(self, board: chess.Board):
         return self.evaluate_board(board)
 
     def get_move_explanation(self, board_before_move: chess.Board, move_type: str, best_move: chess.Move,
-                             score_drop: float):
+                             score_drop: int, best_score=None, player_score=None):
+        # best_score/player_score: notas de busca do ponto de vista de quem jogou; com mate a perda vira "mate em N"
         if move_type == "Best Move": return "Excelente! Este é o lance mais forte, criando a maior vantagem."
         if move_type == "Good Move": return "Boa jogada! Você mantém a pressão e melhora sua posição."
         if move_type == "Melhor Defesa": return "Boa defesa. Era o melhor lance para minimizar as perdas numa posição difícil."
+        if best_score is not None:
+            if mate := mate_explanation(board_before_move, best_move, best_score, player_score): return mate
 
         explanation = ""
         if best_move:
@@ -152,49 +826,80 @@ class ChessEngine:
 
         if not explanation:
             explanation = f"Esta jogada resultou em uma perda posicional de {score_drop / 100:.2f} pontos. "
+            if best_move and (term := self.best_move_gain(board_before_move, best_move)):
+                explanation += f"{board_before_move.san(best_move)} melhorava sobretudo {EVAL_TERM_LABELS[term]}. "
 
         return explanation
 
+    def best_move_gain(self, board_before_move: chess.Board, best_move: chess.Move):
+        # Termo da avaliação que mais melhora (para quem joga) com a melhor jogada; None se nenhum melhora
+        before = self.evaluation_breakdown(board_before_move)
+        board_after = board_before_move.copy(stack=False)
+        board_after.push(best_move)
+        after = self.evaluation_breakdown(board_after)
+        sign = 1 if board_before_move.turn == chess.WHITE else -1
+        gains = {name: sign * (after[name] - before[name]) for name, _ in EVAL_TERMS}
+        term = max(gains, key=gains.get)
+        return term if gains[term] > 0 else None
+
+    def analyze_tablebase_move(self, board_before_move: chess.Board, player_move: chess.Move):
+        # Classificação exata pelo resultado teórico (WDL) antes e depois da jogada
+        ranked = self.probe_root_tablebase(board_before_move)
+        if not ranked: return None
+        wdl_by_move = {move: wdl for wdl, _, move in ranked}
+        best_wdl, best_move = ranked[0][0], ranked[0][2]
+        player_wdl = wdl_by_move[player_move]
+        score_drop = abs(wdl_to_score(best_wdl, chess.WHITE) - wdl_to_score(player_wdl, chess.WHITE))
+        if player_wdl == best_wdl:
+            move_type = "Best Move" if player_move == best_move else "Good Move"
+            if move_type == "Best Move" and best_wdl < 0: move_type = "Melhor Defesa"
+            explanation = f"Tablebase: a posição continua sendo {WDL_NAMES[best_wdl]}."
+        else:
+            move_type = "Blunder" if best_wdl - player_wdl >= 2 else "Mistake"
+            explanation = (f"Tablebase: a posição era {WDL_NAMES[best_wdl]} e virou {WDL_NAMES[player_wdl]}. "
+                           f"A jogada correta era {board_before_move.san(best_move)}.")
+        return move_type, best_move, score_drop, explanation
+
+    def tablebase_scores(self, board: chess.Board, move: chess.Move):
+        # (melhor jogada, nota da melhor, nota da jogada) pelo WDL, do ponto de vista de quem joga; None sem tablebase.
+        # A busca não serve aqui: na raiz ela só devolve a linha da DTZ ou descarta as jogadas que perdem o empate
+        ranked = self.probe_root_tablebase(board)
+        if not ranked: return None
+        wdl_by_move = {ranked_move: wdl for wdl, _, ranked_move in ranked}
+        return ranked[0][2], wdl_to_score(ranked[0][0], chess.WHITE), wdl_to_score(wdl_by_move[move], chess.WHITE)
+
+    def score_move(self, board: chess.Board, move: chess.Move, depth=None, nodes=None):
+        # (melhor jogada, nota da melhor, nota da jogada, variante da jogada) numa só busca; notas do ponto de vista
+        # de quem joga
+        sign = 1 if board.turn == chess.WHITE else -1
+        result = self.search(board, depth=depth, nodes=nodes, exact_moves=(move,))
+        line = next((line for line in result.lines if line.move == move), None)
+        best_score = sign * result.score
+        return result.move, best_score, sign * line.score if line else best_score, line.pv if line else [move]
+
+    def static_change(self, board: chess.Board, move: chess.Move):
+        # Variação da avaliação estática com o lance, do ponto de vista de quem joga
+        sign = 1 if board.turn == chess.WHITE else -1
+        before = self.evaluate_board(board)
+        board.push(move)
+        after = self.evaluate_board(board)
+        board.pop()
+        return sign * (after - before)
+
     def analyze_move(self, board_before_move: chess.Board, player_move: chess.Move):
-        analysis_depth = min(self.depth + 1, 4);
-        engine = ChessEngine(depth=analysis_depth)
+        # Uma só busca na própria engine (TT aquecida entre os lances): melhor lance e lance do jogador com notas
+        # exatas de busca
         if player_move not in board_before_move.legal_moves:
             return "Erro", None, 0, "Movimento ilegal detectado."
-
-        player_color = board_before_move.turn
-
-        eval_before = engine.evaluate_board(board_before_move.copy())
-        best_move = engine.find_best_move(board_before_move.copy())
-
-        board_after_best = board_before_move.copy()
-        if best_move: board_after_best.push(best_move)
-        eval_after_best = engine.evaluate_board(board_after_best)
-
-        board_after_player = board_before_move.copy();
-        board_after_player.push(player_move)
-        eval_after_player = engine.evaluate_board(board_after_player)
-
-        if player_color == chess.BLACK:
-            eval_before, eval_after_best, eval_after_player = -eval_before, -eval_after_best, -eval_after_player
-
-        score_drop_vs_best = eval_after_best - eval_after_player
-        score_change_vs_previous = eval_after_player - eval_before
-
-        BLUNDER_THRESHOLD, MISTAKE_THRESHOLD, INACCURACY_THRESHOLD = 200, 80, 30
-
-        move_type = "Good Move"
-        if score_drop_vs_best >= BLUNDER_THRESHOLD:
-            move_type = "Blunder"
-        elif score_drop_vs_best >= MISTAKE_THRESHOLD:
-            move_type = "Mistake"
-        elif score_drop_vs_best >= INACCURACY_THRESHOLD:
-            move_type = "Inaccuracy"
-
-        if move_type == "Good Move" and score_change_vs_previous < -30:
-            move_type = "Inaccuracy"
-
-        if best_move and player_move.uci() == best_move.uci():
-            move_type = "Best Move" if score_change_vs_previous >= 0 else "Melhor Defesa"
-
-        explanation = self.get_move_explanation(board_before_move, move_type, best_move, score_drop_vs_best)
-        return move_type, best_move, score_drop_vs_best, explanation
\ No newline at end of file
+        if tablebase_analysis := self.analyze_tablebase_move(board_before_move, player_move):
+            return tablebase_analysis
+
+        best_move, best_score, player_score, _ = self.score_move(
+            board_before_move, player_move, min(self.depth + 1, ANALYSIS_MAX_DEPTH), ANALYSIS_NODE_LIMIT)
+        score_drop = 0 if player_score == best_score else best_score - player_score
+
+        score_change = self.static_change(board_before_move, player_move)
+        move_type = classify_move(score_drop, player_move == best_move, score_change)
+        explanation = self.get_move_explanation(board_before_move, move_type, best_move, score_drop, best_score,
+                                                player_score)
+        return move_type, best_move, score_drop, explanation
@@ -0,0 +1,202 @@
+# meu_xadrez/chess_game/game_analysis.py (ANÁLISE DE PARTIDAS INTEIRAS: ACPL, PRECISÃO E PGN ANOTADO)
+import argparse
+import io
+import math
+import multiprocessing
+import time
+from dataclasses import dataclass, field
+
+import chess
+import chess.pgn
+from chess_game.engine import ANALYSIS_NODE_LIMIT, ChessEngine, classify_move, mate_moves
+
+DEFAULT_DEPTH = 3
+MATE_CP = 1000  # notas de mate entram como ±1000 no ACPL e na precisão
+MIN_SEGMENT_PLIES = 4  # meios-lances seguidos por tarefa: a TT do processo aproveita o lance anterior
+MOVE_TYPES = ("Blunder", "Mistake", "Inaccuracy")
+NAGS = {"Blunder": chess.pgn.NAG_BLUNDER, "Mistake": chess.pgn.NAG_MISTAKE, "Inaccuracy": chess.pgn.NAG_DUBIOUS_MOVE}
+
+_worker_engine = None
+_worker_limits = {}
+
+
+@dataclass
+class PlyAnalysis:
+    ply: int
+    move: chess.Move
+    san: str
+    color: chess.Color
+    move_type: str
+    best_move: chess.Move
+    best_san: str
+    best_score: int  # nota com o melhor lance, do ponto de vista de quem jogou
+    score: int  # nota com o lance jogado, do ponto de vista de quem jogou
+
+    @property
+    def cp_loss(self):
+        return max(0, _clamp(self.best_score) - _clamp(self.score))
+
+    @property
+    def white_score(self):
+        return self.score if self.color == chess.WHITE else -self.score
+
+
+@dataclass
+class GameReport:
+    plies: list
+    pgn: str  # partida com NAGs e comentários [%eval]
+    acpl: dict = field(default_factory=dict)  # por cor: 'white'/'black'
+    accuracy: dict = field(default_factory=dict)
+    counts: dict = field(default_factory=dict)  # por cor: {'Blunder': n, 'Mistake': n, 'Inaccuracy': n}
+    time: float = 0.0
+
+
+def _clamp(score):
+    return max(-MATE_CP, min(MATE_CP, score))
+
+
+def win_percent(cp):
+    # Chance de vitória estimada a partir dos centipawns (mesma curva usada pelo Lichess)
+    return 50 + 50 * (2 / (1 + math.exp(-0.00368208 * _clamp(cp))) - 1)
+
+
+def move_accuracy(best_score, score):
+    drop = max(0.0, win_percent(best_score) - win_percent(score))
+    return max(0.0, min(100.0, 103.1668 * math.exp(-0.04354 * drop) - 3.1669))
+
+
+def _init_worker(seed, depth, nodes):
+    global _worker_engine, _worker_limits
+    _worker_engine = ChessEngine(seed=seed)
+    _worker_engine.load_eval_params()
+    _worker_engine.load_tablebase()
+    _worker_engine.load_bitbases()
+    _worker_limits = {'depth': depth, 'nodes': nodes}
+
+
+def analyze_plies(engine, fen, first_ply, ucis, depth=None, nodes=None):
+    # Meios-lances consecutivos com a mesma engine: a busca de cada um reaproveita a TT do anterior
+    board, plies = chess.Board(fen), []
+    for offset, uci in enumerate(ucis):
+        move = chess.Move.from_uci(uci)
+        if tablebase := engine.analyze_tablebase_move(board, move):
+            # Notas pelo WDL: a perda em centipawns (ACPL, precisão) concorda com a classificação da tablebase
+            move_type = tablebase[0]
+            best_move, best_score, score = engine.tablebase_scores(board, move)
+        else:
+            best_move, best_score, score, _ = engine.score_move(board, move, depth, nodes)
+            score_drop = 0 if score == best_score else best_score - score
+            move_type = classify_move(score_drop, move == best_move, engine.static_change(board, move))
+        plies.append(PlyAnalysis(first_ply + offset, move, board.san(move), board.turn, move_type, best_move,
+                                 board.san(best_move), best_score, score))
+        board.push(move)
+    return plies
+
+
+def _analyze_segment(task):
+    fen, first_ply, ucis = task
+    return analyze_plies(_worker_engine, fen, first_ply, ucis, **_worker_limits)
+
+
+def summarize(plies):
+    # (ACPL, precisão, contagem de erros) por cor
+    acpl, accuracy, counts = {}, {}, {}
+    for color, name in ((chess.WHITE, 'white'), (chess.BLACK, 'black')):
+        own = [p for p in plies if p.color == color]
+        acpl[name] = sum(p.cp_loss for p in own) / len(own) if own else 0.0
+        accuracy[name] = sum(move_accuracy(p.best_score, p.score) for p in own) / len(own) if own else 100.0
+        counts[name] = {move_type: sum(p.move_type == move_type for p in own) for move_type in MOVE_TYPES}
+    return acpl, accuracy, counts
+
+
+def read_game(game):
+    # Aceita chess.pgn.Game, texto PGN ou lista de jogadas (UCI/SAN/chess.Move) a partir da posição inicial
+    if isinstance(game, chess.pgn.Game): return game
+    if isinstance(game, str):
+        parsed = chess.pgn.read_game(io.StringIO(game))
+        if parsed is None: raise ValueError("PGN sem partidas")
+        return parsed
+    parsed, board = chess.pgn.Game(), chess.Board()
+    node = parsed
+    for move in game:
+        if not isinstance(move, chess.Move):
+            try:
+                move = board.parse_uci(move)
+            except ValueError:
+                move = board.parse_san(move)
+        board.push(move)
+        node = node.add_variation(move)
+    return parsed
+
+
+def annotate(game: chess.pgn.Game, plies):
+    annotated = chess.pgn.Game()
+    annotated.headers.update(game.headers)
+    annotated.setup(game.board())
+    node = annotated
+    for ply in plies:
+        node = node.add_variation(ply.move)
+        if (mate := mate_moves(ply.white_score)) is not None:
+            comment = f"[%eval #{mate}]"
+        else:
+            comment = f"[%eval {ply.white_score / 100:.2f}]"
+        if ply.move_type in NAGS:
+            node.nags.add(NAGS[ply.move_type])
+            comment += f" {ply.move_type}. Melhor era {ply.best_san}."
+        node.comment = comment
+    return str(annotated)
+
+
+def analyze_game(game, depth=DEFAULT_DEPTH, workers=None, seed=0, nodes=ANALYSIS_NODE_LIMIT):
+    start = time.perf_counter()
+    game = read_game(game)
+    board = game.board()
+    tasks, moves = [], list(game.mainline_moves())
+    workers = workers or multiprocessing.cpu_count()
+    segment = max(MIN_SEGMENT_PLIES, math.ceil(len(moves) / (workers * 2)))
+    for first in range(0, len(moves), segment):
+        tasks.append((board.fen(), first, [m.uci() for m in moves[first:first + segment]]))
+        for move in moves[first:first + segment]:
+            board.push(move)
+
+    if workers <= 1 or len(tasks) <= 1:
+        _init_worker(seed, depth, nodes)
+        segments = list(map(_analyze_segment, tasks))
+    else:
+        with multiprocessing.Pool(min(workers, len(tasks)), initializer=_init_worker,
+                                  initargs=(seed, depth, nodes)) as pool:
+            segments = pool.map(_analyze_segment, tasks)
+
+    plies = [ply for segment_plies in segments for ply in segment_plies]
+    report = GameReport(plies, annotate(game, plies), *summarize(plies))
+    report.time = time.perf_counter() - start
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analisa uma partida (PGN): ACPL, precisão e PGN anotado.")
+    parser.add_argument('pgn', help="arquivo PGN (a primeira partida é analisada)")
+    parser.add_argument('-o', '--output', help="grava o PGN anotado neste arquivo (padrão: imprime)")
+    parser.add_argument('--depth', type=int, default=DEFAULT_DEPTH, help="profundidade por meio-lance")
+    parser.add_argument('--workers', type=int, help="processos (padrão: núcleos da máquina)")
+    parser.add_argument('--seed', type=int, default=0, help="semente da engine")
+    args = parser.parse_args()
+
+    with open(args.pgn, encoding='utf-8') as f:
+        game = chess.pgn.read_game(f)
+    if game is None: parser.error("PGN sem partidas")
+    report = analyze_game(game, args.depth, args.workers, args.seed)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(report.pgn + '\n')
+    else:
+        print(report.pgn + '\n')
+    for name, label in (('white', "Brancas"), ('black', "Pretas")):
+        counts = report.counts[name]
+        print(f"{label}: ACPL {report.acpl[name]:.0f}, precisão {report.accuracy[name]:.1f}%, "
+              f"{counts['Blunder']} blunders, {counts['Mistake']} erros, {counts['Inaccuracy']} imprecisões")
+    print(f"{len(report.plies)} meios-lances analisados em {report.time:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,13 @@
 # meu_xadrez/chess_game/main.py (VERSÃO FINAL E COMPLETA)
 import pygame
 import chess
+import functools
+import json
 import os
+import threading
 import time
-from chess_game.engine import ChessEngine
+from chess_game.engine import ChessEngine, format_score
+from chess_game.profiler import FrameProfiler
 
 # --- Constantes de Cores e Tamanhos ---
 BOARD_WIDTH, PANEL_WIDTH = 800, 400
@@ -20,41 +24,108 @@ HIGHLIGHT_COLOR, DISABLED_COLOR = (110, 110, 110), (60, 60, 60)
 BLUNDER_COLOR, MISTAKE_COLOR, INACCURACY_COLOR = (255, 80, 80), (255, 160, 50), (255, 255, 80)
 GOOD_MOVE_COLOR, BEST_MOVE_COLOR, SUGGESTION_ARROW_COLOR = (120, 220, 120), (100, 180, 255), (0, 100, 255, 200)
 PROMOTION_BG_COLOR = (80, 80, 80, 200)
+PROFILER_BG_COLOR = (0, 0, 0, 180)
+PROFILER_HOTKEY = pygame.K_F3
+
+ASSETS_DIR = os.path.join(os.path.dirname(__file__), '..', 'assets')
+FONT_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.meu_xadrez', 'font_cache.json')
 
 PIECE_IMAGES = {}
 
 
-def load_piece_images():
-    script_dir = os.path.dirname(__file__)
+def read_piece_images():
+    # Só decodifica os PNGs; pode rodar fora da thread principal
     pieces = ['bR', 'bN', 'bB', 'bQ', 'bK', 'bP', 'wR', 'wN', 'wB', 'wQ', 'wK', 'wP']
+    images = {}
     for piece in pieces:
-        path = os.path.join(script_dir, '..', 'assets', 'images', f'{piece}.png')
+        path = os.path.join(ASSETS_DIR, 'images', f'{piece}.png')
         try:
-            image = pygame.image.load(path).convert_alpha()
-            PIECE_IMAGES[piece] = pygame.transform.scale(image, (SQUARE_SIZE, SQUARE_SIZE))
+            images[piece] = pygame.image.load(path)
         except pygame.error as e:
             print(f"Erro ao carregar imagem: {path} - {e}")
             pygame.quit()
             exit()
+    return images
+
+
+def load_piece_images(raw_images=None):
+    if PIECE_IMAGES: return
+    for piece, image in (raw_images or read_piece_images()).items():
+        PIECE_IMAGES[piece] = pygame.transform.scale(image.convert_alpha(), (SQUARE_SIZE, SQUARE_SIZE))
+
+
+@functools.lru_cache(maxsize=None)
+def resolve_font_path(name):
+    # Ordem: fonte em assets/fonts, cache em disco, e só então a enumeração (lenta) das fontes do sistema
+    bundled = os.path.join(ASSETS_DIR, 'fonts', f'{name.lower()}.ttf')
+    if os.path.exists(bundled): return bundled
+    try:
+        with open(FONT_CACHE_PATH, encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        cache = {}
+    if name in cache and (cache[name] is None or os.path.exists(cache[name])): return cache[name]
+    cache[name] = pygame.font.match_font(name)
+    try:
+        os.makedirs(os.path.dirname(FONT_CACHE_PATH), exist_ok=True)
+        with open(FONT_CACHE_PATH, 'w', encoding='utf-8') as f:
+            json.dump(cache, f)
+    except OSError:
+        pass
+    return cache[name]
+
+
+def load_font(name, size):
+    # Caminho None usa a fonte padrão que acompanha o pygame
+    return pygame.font.Font(resolve_font_path(name), size)
 
 
 class ChessGame:
-    def __init__(self):
+    def __init__(self, seed=None):
+        self.init_start = time.perf_counter()
+        self.first_frame_ms = None
         pygame.init()
         self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
         pygame.display.set_caption("Xadrez com Análise")
         self.clock = pygame.time.Clock()
-        load_piece_images()
-        pygame.font.init()
-        self.font = pygame.font.SysFont('Arial', 24)
-        self.big_font = pygame.font.SysFont('Arial', 48)
-        self.small_font = pygame.font.SysFont('Arial', 18)
-        self.history_font = pygame.font.SysFont('Consolas', 20)
+        self.fps_limit = FPS
+        self.ai_delay_ms = 200
+        self.engine_seed = seed
+        self.engine_time_limits = True  # gravação/replay: só o orçamento de nós, para lances reproduzíveis
+        self.event_source = pygame.event.get
+        self.mouse_pos = (0, 0)
+        self.profiler = FrameProfiler()
+        self.show_profiler = False
         self.reset_game_variables()
+        self.raw_piece_images = None
+        self.warm_up_thread = threading.Thread(target=self.warm_up, daemon=True)
+        self.warm_up_thread.start()
+
+    def warm_up(self):
+        # Roda enquanto o menu está aberto: decodifica as imagens e aquece tabelas da engine
+        self.raw_piece_images = read_piece_images()
+        self.ai_engine.warm_up()
+
+    @functools.cached_property
+    def font(self):
+        return load_font('Arial', 24)
+
+    @functools.cached_property
+    def big_font(self):
+        return load_font('Arial', 48)
+
+    @functools.cached_property
+    def small_font(self):
+        return load_font('Arial', 18)
+
+    @functools.cached_property
+    def history_font(self):
+        return load_font('Consolas', 20)
 
     def reset_game_variables(self):
         self.board = None
-        self.ai_engine = ChessEngine()
+        self.ai_engine = ChessEngine(seed=self.engine_seed)
+        self.ai_engine.status_listener = print  # console do jogo, como as outras mensagens da interface
         self.player_is_white = True
         self.game_over = False
         self.selected_square = None
@@ -150,7 +221,7 @@ class ChessGame:
                     if PIECE_IMAGES.get(key) and not (self.dragging_piece and (r, c) == self.selected_square_on_board):
                         self.screen.blit(PIECE_IMAGES[key], (c * SQUARE_SIZE, r * SQUARE_SIZE))
         if self.dragging_piece and self.selected_piece_image:
-            mx, my = pygame.mouse.get_pos()
+            mx, my = self.mouse_pos
             self.screen.blit(self.selected_piece_image, (mx - self.drag_offset[0], my - self.drag_offset[1]))
 
     def draw_side_panel(self):
@@ -159,14 +230,19 @@ class ChessGame:
         pygame.draw.line(self.screen, HIGHLIGHT_COLOR, (BOARD_WIDTH + 20, 55), (WIDTH - 20, 55))
         if self.board:
             ev = self.ai_engine.get_position_evaluation(self.board) * (1 if self.board.turn == chess.WHITE else -1)
-            self.screen.blit(self.small_font.render(f"Avaliação: {ev / 100:+.2f}", True, TEXT_COLOR),
+            self.screen.blit(self.small_font.render(f"Avaliação: {format_score(ev)}", True, TEXT_COLOR),
                              (BOARD_WIDTH + 20, 70))
+            if result := self.ai_engine.last_result:
+                # Nota da última busca (das brancas): mostra o mate como M3 / -M3
+                text = f"Busca: {format_score(result.score)} (prof. {result.depth})"
+                self.screen.blit(self.small_font.render(text, True, TEXT_COLOR), (BOARD_WIDTH + 200, 70))
 
         self.draw_wrapped_text(self.analysis_message, self.analysis_message_color,
                                pygame.Rect(BOARD_WIDTH + 20, 150, PANEL_WIDTH - 40, 160))
         self.screen.blit(self.font.render("Histórico", True, TEXT_COLOR), (BOARD_WIDTH + 20, 320))
         pygame.draw.line(self.screen, HIGHLIGHT_COLOR, (BOARD_WIDTH + 20, 355), (WIDTH - 20, 355))
-        self.draw_move_history()
+        with self.profiler.phase('draw_move_history'):
+            self.draw_move_history()
 
         self.undo_button_rect = pygame.Rect(BOARD_WIDTH + 20, 105, 140, 35)
         can_undo = self.board and len(self.board.move_stack) > 0
@@ -248,9 +324,11 @@ class ChessGame:
 
         if piece and piece.color == self.board.turn:
             if self.game_state == "ANALYSIS":
-                best_move = self.ai_engine.find_best_move(self.board.copy())
-                if best_move:
-                    self.best_move_arrow = (best_move.from_square, best_move.to_square)
+                # Sugestão com a força total do nível: sem o ruído e o sorteio usados nas jogadas da IA
+                with self.profiler.engine_call('find_best_moves'):
+                    lines = self.ai_engine.find_best_moves(self.board, 1)
+                if lines:
+                    self.best_move_arrow = (lines[0].move.from_square, lines[0].move.to_square)
 
             key = f"{'b' if piece.color == chess.BLACK else 'w'}{piece.symbol().upper()}"
             if img := PIECE_IMAGES.get(key):
@@ -294,14 +372,15 @@ class ChessGame:
         self.selected_square = None
 
     def make_player_move(self, move):
-        board_before = self.board.copy()
+        board_before = self.board.copy(stack=False)
         try:
             san = self.board.san(move)
         except:
             return
 
         if self.game_state in ["PLAYING_ANALYZE", "ANALYSIS"]:
-            m_type, b_move, s_drop, expl = self.ai_engine.analyze_move(board_before, move)
+            with self.profiler.engine_call('analyze_move'):
+                m_type, b_move, s_drop, expl = self.ai_engine.analyze_move(board_before, move)
             self.analysis_message = f"Sua jogada ({san}): {m_type}! {expl}"
             self.analysis_message_color = self.get_color_for_move_type(m_type)
 
@@ -321,8 +400,9 @@ class ChessGame:
 
     def make_ai_move(self):
         print("IA pensando...")
-        pygame.time.wait(200)
-        ai_move = self.ai_engine.find_best_move(self.board)
+        if self.ai_delay_ms: pygame.time.wait(self.ai_delay_ms)
+        with self.profiler.engine_call('find_best_move'):
+            ai_move = self.ai_engine.find_best_move(self.board)
         if ai_move:
             self.board.push(ai_move)
             print(f"Movimento da IA: {ai_move.uci()}")
@@ -343,11 +423,19 @@ class ChessGame:
             self.analysis_message_color, self.best_move_arrow = TEXT_COLOR, None
 
     def start_game(self, mode):
+        self.warm_up_thread.join()
+        load_piece_images(self.raw_piece_images)
         self.reset_game_variables()
         self.game_state = mode
         self.board = chess.Board()
         self.analysis_message = "Boa sorte!"
         self.ai_engine.set_difficulty_elo(self.selected_elo)
+        self.ai_engine.time_limits = self.engine_time_limits
+        # Recursos já abertos em warm_up() (caches compartilhados): só associa à engine da nova partida
+        self.ai_engine.load_eval_params()
+        self.ai_engine.load_book()
+        self.ai_engine.load_tablebase()
+        self.ai_engine.load_bitbases()
         if mode == "ANALYSIS":
             self.analysis_message = "Análise Livre: Clique na sua peça para ver a sugestão."
         if not self.player_is_white and mode in ["PLAYING_VS_AI", "PLAYING_ANALYZE", "ANALYSIS"]:
@@ -419,6 +507,7 @@ class ChessGame:
         if self.game_state in ["PLAYING_VS_AI", "PLAYING_ANALYZE", "ANALYSIS"]: num_pops = 2
         if len(self.board.move_stack) >= num_pops:
             for _ in range(num_pops): self.board.pop()
+        self.ai_engine.last_result = None  # a nota era de uma posição que saiu do tabuleiro
         self.analysis_message, self.analysis_message_color, self.best_move_arrow = "Jogada desfeita.", TEXT_COLOR, None
         self.game_over = False
 
@@ -455,8 +544,12 @@ class ChessGame:
                 self.screen.blit(img, (target_col * SQUARE_SIZE, start_y + i * SQUARE_SIZE))
 
     def handle_events(self):
-        for event in pygame.event.get():
+        for event in self.event_source():
             if event.type == pygame.QUIT: return False
+            if hasattr(event, 'pos'): self.mouse_pos = event.pos
+            if event.type == pygame.KEYDOWN and event.key == PROFILER_HOTKEY:
+                self.show_profiler = not self.show_profiler
+                continue
             if self.game_state == "PROMOTION_SELECTION":
                 if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1: self.handle_promotion_selection_click(
                     event)
@@ -477,20 +570,34 @@ class ChessGame:
                 self.handle_mouse_up_playing(event)
         return True
 
+    def draw_profiler_overlay(self):
+        lines = self.profiler.overlay_lines()
+        line_h = self.small_font.get_height()
+        s = pygame.Surface((420, line_h * len(lines) + 10), pygame.SRCALPHA)
+        s.fill(PROFILER_BG_COLOR)
+        for i, line in enumerate(lines):
+            s.blit(self.small_font.render(line, True, TEXT_COLOR), (5, 5 + i * line_h))
+        self.screen.blit(s, (10, 10))
+
     def run(self):
         running = True
         while running:
-            running = self.handle_events()
+            self.profiler.begin_frame()
+            with self.profiler.phase('handle_events'):
+                running = self.handle_events()
             if not running: break
             self.screen.fill(PANEL_COLOR)
             if self.game_state == "MENU":
                 self.draw_menu()
             else:
-                self.draw_board()
+                with self.profiler.phase('draw_board'):
+                    self.draw_board()
                 self.draw_move_hints()
-                self.draw_pieces()
+                with self.profiler.phase('draw_pieces'):
+                    self.draw_pieces()
                 self.draw_check_and_arrows()
-                self.draw_side_panel()
+                with self.profiler.phase('draw_side_panel'):
+                    self.draw_side_panel()
                 if self.game_state == "PROMOTION_SELECTION":
                     self.draw_promotion_selection()
                 menu_r = pygame.Rect(WIDTH - 160, 10, 140, 40)
@@ -498,6 +605,11 @@ class ChessGame:
                 self.screen.blit(self.small_font.render("Menu Principal", True, TEXT_COLOR),
                                  self.small_font.render("Menu Principal", True, TEXT_COLOR).get_rect(
                                      center=menu_r.center))
+            if self.show_profiler:
+                self.draw_profiler_overlay()
             pygame.display.flip()
-            self.clock.tick(FPS)
+            if self.first_frame_ms is None:
+                self.first_frame_ms = (time.perf_counter() - self.init_start) * 1000
+            self.profiler.end_frame()
+            self.clock.tick(self.fps_limit)
         pygame.quit()
\ No newline at end of file
@@ -0,0 +1,372 @@
+# meu_xadrez/chess_game/match.py (PARTIDAS ENTRE CONFIGURAÇÕES DA ENGINE: ELO, SPRT E NÓS/S)
+import argparse
+import functools
+import importlib
+import importlib.util
+import inspect
+import math
+import multiprocessing
+import os
+import random
+import sys
+import time
+from dataclasses import dataclass, field, fields
+
+import chess
+import chess.pgn
+from chess_game.engine import DEFAULT_TT_SIZE, ChessEngine
+
+DEFAULT_NODES = 2000  # controle padrão: nós por lance
+MAX_PLIES = 400  # partida longa demais é empate
+ADJUDICATE_CP, ADJUDICATE_PLIES = 1000, 8  # vitória adjudicada: nota acima disso por tantos meios-lances seguidos
+SPRT_ELO0, SPRT_ELO1, SPRT_ALPHA, SPRT_BETA = 0.0, 10.0, 0.05, 0.05
+# Aberturas curtas e equilibradas; cada uma é jogada duas vezes, com as cores trocadas
+OPENINGS = [
+    "e4 e5 Nf3 Nc6 Bb5 a6", "e4 e5 Nf3 Nc6 Bc4 Bc5", "e4 e5 Nf3 Nf6 Nxe5 d6", "e4 e5 Nf3 Nc6 d4 exd4",
+    "e4 c5 Nf3 d6 d4 cxd4", "e4 c5 Nf3 Nc6 d4 cxd4", "e4 c5 Nf3 e6 d4 cxd4", "e4 c5 Nc3 Nc6 g3 g6",
+    "e4 e6 d4 d5 Nc3 Nf6", "e4 c6 d4 d5 e5 Bf5", "e4 d5 exd5 Qxd5 Nc3 Qa5", "e4 Nf6 e5 Nd5 d4 d6",
+    "e4 d6 d4 Nf6 Nc3 g6", "d4 d5 c4 e6 Nc3 Nf6", "d4 d5 c4 c6 Nf3 Nf6", "d4 d5 c4 dxc4 Nf3 Nf6",
+    "d4 Nf6 c4 g6 Nc3 Bg7", "d4 Nf6 c4 e6 Nc3 Bb4", "d4 Nf6 c4 e6 Nf3 b6", "d4 d5 Bf4 Nf6 e3 c5",
+    "d4 f5 g3 Nf6 Bg2 g6", "c4 e5 Nc3 Nf6 Nf3 Nc6", "c4 c5 Nc3 Nc6 g3 g6", "Nf3 d5 g3 Nf6 Bg2 c6",
+]
+
+_worker_configs = ()
+_worker_seed, _worker_engines = 0, {}
+
+
+@dataclass(frozen=True)
+class EngineConfig:
+    name: str = "engine"
+    module: str = None  # outro engine.py (caminho ou módulo) com uma classe ChessEngine; None = a engine atual
+    nodes: int = None
+    movetime: float = None  # segundos por lance
+    depth: int = None
+    elo: int = None  # joga com a força limitada do Elo (search_limited)
+    tt_size: int = DEFAULT_TT_SIZE
+    params: str = None  # arquivo de parâmetros da avaliação (tuner.py); None = constantes do código
+    nnue: str = None  # rede da avaliação NNUE (nnue.py); None = avaliação clássica
+    book: bool = False  # a suíte de aberturas já dá a variedade; o livro é opcional
+    tablebase: bool = True
+    bitbases: bool = True
+
+
+def _flag(value):
+    if value.lower() in ('1', 'true', 'sim', 'on'): return True
+    if value.lower() in ('0', 'false', 'nao', 'não', 'off'): return False
+    raise ValueError(f"valor booleano inválido: {value}")
+
+
+def parse_engine(spec):
+    # "name=novo,nodes=4000,module=/tmp/engine_antigo.py" -> EngineConfig
+    types = {f.name: f.type for f in fields(EngineConfig)}
+    parsers = {bool: _flag}
+    options = {}
+    for item in filter(None, spec.split(',')):
+        key, _, value = item.partition('=')
+        key = key.strip().replace('-', '_')
+        if key not in types: raise ValueError(f"opção de engine desconhecida: {key}")
+        options[key] = parsers.get(types[key], types[key])(value.strip())
+    if 'name' not in options and options.get('module'):
+        options['name'] = os.path.splitext(os.path.basename(options['module']))[0]
+    return EngineConfig(**options)
+
+
+@functools.lru_cache(maxsize=None)
+def engine_class(module):
+    if module is None: return ChessEngine
+    if not module.endswith('.py'): return importlib.import_module(module).ChessEngine
+    spec = importlib.util.spec_from_file_location(f"_match_engine_{abs(hash(module))}", module)
+    loaded = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(loaded)
+    return loaded.ChessEngine
+
+
+def _supported(function, **kwargs):
+    # Só os argumentos que esta versão da engine aceita (engine.py de commits antigos tem assinaturas menores)
+    parameters = inspect.signature(function).parameters
+    return {key: value for key, value in kwargs.items() if key in parameters}
+
+
+def _require(engine, config, method):
+    if not hasattr(engine, method): raise ValueError(f"{config.name}: esta versão da engine não tem {method}()")
+    return getattr(engine, method)
+
+
+def build_engine(config: EngineConfig, seed):
+    # Recursos opcionais só entram se a versão da engine os tiver; pedir explicitamente parâmetros ou rede a uma
+    # versão sem suporte é erro
+    cls = engine_class(config.module)
+    engine = cls(**_supported(cls, seed=seed, tt_size=config.tt_size))
+    if config.params and not _require(engine, config, 'load_eval_params')(config.params):
+        raise FileNotFoundError(f"parâmetros não encontrados: {config.params}")
+    if config.nnue and not _require(engine, config, 'load_nnue')(config.nnue):
+        raise FileNotFoundError(f"rede NNUE não encontrada: {config.nnue}")
+    if config.book and hasattr(engine, 'load_book'): engine.load_book()
+    if config.tablebase and hasattr(engine, 'load_tablebase'): engine.load_tablebase()
+    if config.bitbases and hasattr(engine, 'load_bitbases'): engine.load_bitbases()
+    if config.elo:
+        engine.set_difficulty_elo(config.elo)
+        engine.time_limits = config.movetime is not None  # sem movetime só o orçamento de nós conta
+    return engine
+
+
+def load_openings(path=None):
+    # Lista de (FEN inicial, [uci]); arquivo com uma FEN/EPD ou uma sequência de lances (SAN/UCI) por linha, ou PGN
+    if path and path.endswith('.pgn'):
+        openings = []
+        with open(path, encoding='utf-8') as f:
+            while (game := chess.pgn.read_game(f)) is not None:
+                openings.append((game.board().fen(), [move.uci() for move in game.mainline_moves()]))
+        return openings
+    if path:
+        with open(path, encoding='utf-8') as f:
+            lines = [line.strip() for line in f if line.strip() and not line.startswith('#')]
+    else:
+        lines = OPENINGS
+    openings = []
+    for line in lines:
+        if '/' in line:
+            openings.append((chess.Board(' '.join(line.split()[:4]) + ' 0 1').fen(), []))
+            continue
+        board = chess.Board()
+        for token in line.split():
+            if token[0].isdigit() and token.endswith('.'): continue
+            board.push(_parse_token(board, token))
+        openings.append((chess.STARTING_FEN, [move.uci() for move in board.move_stack]))
+    return openings
+
+
+def _parse_token(board, token):
+    try:
+        return board.parse_uci(token)
+    except ValueError:
+        return board.parse_san(token)
+
+
+def _init_worker(configs, seed):
+    global _worker_configs, _worker_seed, _worker_engines
+    _worker_configs, _worker_seed, _worker_engines = configs, seed, {}
+
+
+def _engine_move(engine, config, board):
+    if config.book and hasattr(engine, 'probe_book') and (move := engine.probe_book(board)): return move, None, 0, 0.0
+    start = time.perf_counter()
+    if not hasattr(engine, 'search'):
+        # Engine anterior a search(): só joga por profundidade (depth, o Elo ou a padrão da classe), sem nota nem nós
+        if config.depth: engine.depth = config.depth
+        return engine.find_best_move(board), None, 0, time.perf_counter() - start
+    if config.elo and hasattr(engine, 'search_limited'):
+        result = engine.search_limited(board, config.movetime)
+    else:
+        result = engine.search(board, config.depth, config.movetime, config.nodes)
+    return result.move, result.score, result.nodes, time.perf_counter() - start
+
+
+def play_game(task):
+    # Uma partida a partir da abertura; devolve o resultado do ponto de vista da primeira configuração (A)
+    index, fen, opening, a_is_white = task
+    configs = _worker_configs
+    engines = []
+    for slot, config in enumerate(configs):
+        if slot not in _worker_engines: _worker_engines[slot] = build_engine(config, _worker_seed)
+        engine = _worker_engines[slot]
+        # Cada partida parte do zero: o resultado não depende do processo que a jogou
+        if hasattr(engine, 'tt'): engine.tt.clear()
+        (engine.rng if hasattr(engine, 'rng') else random).seed(_worker_seed * 1_000_003 + index // 2)
+        engines.append(engine)
+    white, black = (0, 1) if a_is_white else (1, 0)
+    slots = {chess.WHITE: white, chess.BLACK: black}
+
+    board = chess.Board(fen)
+    for uci in opening:
+        board.push_uci(uci)
+    nodes, seconds = [0, 0], [0.0, 0.0]
+    streak, reason, result = 0, None, None
+    while True:
+        if outcome := board.outcome(claim_draw=True):
+            result, reason = outcome.result(), outcome.termination.name.lower()
+            break
+        if board.ply() >= MAX_PLIES:
+            result, reason = "1/2-1/2", "max_plies"
+            break
+        slot = slots[board.turn]
+        move, score, move_nodes, elapsed = _engine_move(engines[slot], configs[slot], board)
+        nodes[slot] += move_nodes
+        seconds[slot] += elapsed
+        board.push(move)
+        # Adjudicação: nota (do ponto de vista das brancas) decidida por vários meios-lances seguidos
+        sign = 0 if score is None or abs(score) < ADJUDICATE_CP else (1 if score > 0 else -1)
+        streak = streak + sign if sign and streak * sign >= 0 else sign
+        if abs(streak) >= ADJUDICATE_PLIES:
+            result, reason = ("1-0" if streak > 0 else "0-1"), "adjudication"
+            break
+
+    white_points = {"1-0": 1.0, "0-1": 0.0}.get(result, 0.5)
+    game = chess.pgn.Game.from_board(board)
+    game.headers.update({'Event': "meu_xadrez match", 'Round': str(index + 1), 'White': configs[white].name,
+                         'Black': configs[black].name, 'Result': result, 'Termination': reason})
+    if fen != chess.STARTING_FEN: game.headers['FEN'] = fen
+    return {'index': index, 'score': white_points if a_is_white else 1 - white_points, 'result': result,
+            'reason': reason, 'plies': board.ply(), 'nodes': nodes, 'time': seconds, 'pgn': str(game)}
+
+
+def expected_score(elo):
+    return 1 / (1 + 10 ** (-elo / 400))
+
+
+def score_to_elo(score):
+    score = min(max(score, 1e-6), 1 - 1e-6)
+    return -400 * math.log10(1 / score - 1)
+
+
+def _score_variance(wins, draws, losses):
+    # Pontuação média e variância por partida; a variância leva meia partida de cada resultado a priori, senão um
+    # placar sem empates ou sem derrotas daria variância zero (intervalo vazio, LLR indefinido)
+    games = wins + draws + losses
+    score = (wins + draws / 2) / games
+    prior = (wins + 0.5, draws + 0.5, losses + 0.5)
+    variance = (prior[0] * (1 - score) ** 2 + prior[1] * (0.5 - score) ** 2 + prior[2] * score ** 2) / (games + 1.5)
+    return score, variance
+
+
+def elo_interval(wins, draws, losses, z=1.96):
+    # (Elo, mínimo, máximo) com intervalo de ~95% pela variância trinomial por partida
+    games = wins + draws + losses
+    if games == 0: return 0.0, -math.inf, math.inf
+    score, variance = _score_variance(wins, draws, losses)
+    margin = z * math.sqrt(variance / games)
+    return score_to_elo(score), score_to_elo(score - margin), score_to_elo(score + margin)
+
+
+def sprt_llr(wins, draws, losses, elo0=SPRT_ELO0, elo1=SPRT_ELO1):
+    # Log-verossimilhança H1 (elo1) contra H0 (elo0), aproximação normal do GSPRT
+    games = wins + draws + losses
+    if games == 0: return 0.0
+    score, variance = _score_variance(wins, draws, losses)
+    s0, s1 = expected_score(elo0), expected_score(elo1)
+    return games * (s1 - s0) * (2 * score - s0 - s1) / (2 * variance)
+
+
+def sprt_bounds(alpha=SPRT_ALPHA, beta=SPRT_BETA):
+    return math.log(beta / (1 - alpha)), math.log((1 - beta) / alpha)
+
+
+@dataclass
+class MatchReport:
+    names: tuple
+    wins: int = 0  # do ponto de vista da primeira configuração
+    draws: int = 0
+    losses: int = 0
+    nodes: list = field(default_factory=lambda: [0, 0])
+    time: list = field(default_factory=lambda: [0.0, 0.0])
+    llr: float = 0.0
+    sprt: str = None  # 'H1' (aceita: elo >= elo1), 'H0' (rejeita) ou None (inconclusivo / sem SPRT)
+    elapsed: float = 0.0
+
+    @property
+    def games(self):
+        return self.wins + self.draws + self.losses
+
+    def nps(self, slot):
+        return self.nodes[slot] / self.time[slot] if self.time[slot] > 0 else 0.0
+
+    def add(self, game):
+        if game['score'] == 1.0: self.wins += 1
+        elif game['score'] == 0.0: self.losses += 1
+        else: self.draws += 1
+        for slot in (0, 1):
+            self.nodes[slot] += game['nodes'][slot]
+            self.time[slot] += game['time'][slot]
+
+    def summary(self):
+        elo, low, high = elo_interval(self.wins, self.draws, self.losses)
+        return (f"{self.names[0]} x {self.names[1]}: +{self.wins} ={self.draws} -{self.losses} ({self.games} partidas) | "
+                f"Elo {elo:+.1f} [{low:+.1f}, {high:+.1f}] | LLR {self.llr:.2f}")
+
+
+def run_match(configs, games=len(OPENINGS) * 2, workers=None, seed=0, openings=None, sprt=None, pgn_out=None,
+              progress=print):
+    # sprt = (elo0, elo1, alpha, beta) ou None; com SPRT o match para assim que uma hipótese é aceita
+    start = time.perf_counter()
+    openings = openings or load_openings()
+    tasks = [(index, *openings[(index // 2) % len(openings)], index % 2 == 0) for index in range(games)]
+    report = MatchReport(tuple(config.name for config in configs))
+    bounds = sprt_bounds(*sprt[2:]) if sprt else None
+    workers = workers or multiprocessing.cpu_count()
+
+    if workers <= 1:
+        _init_worker(tuple(configs), seed)
+        pool, results = None, map(play_game, tasks)
+    else:
+        pool = multiprocessing.Pool(min(workers, games), initializer=_init_worker, initargs=(tuple(configs), seed))
+        results = pool.imap_unordered(play_game, tasks)
+    try:
+        for game in results:
+            report.add(game)
+            if pgn_out: pgn_out.write(game['pgn'] + '\n\n')
+            if sprt:
+                report.llr = sprt_llr(report.wins, report.draws, report.losses, *sprt[:2])
+                if report.llr <= bounds[0]: report.sprt = 'H0'
+                elif report.llr >= bounds[1]: report.sprt = 'H1'
+            if progress: progress(f"[{report.games}/{games}] {game['result']} ({game['reason']}) | {report.summary()}")
+            if report.sprt: break
+    finally:
+        if pool:
+            pool.terminate()
+            pool.join()
+    report.elapsed = time.perf_counter() - start
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Partidas entre duas configurações da engine, sem interface gráfica.")
+    parser.add_argument('engine_a', help="configuração A, ex.: 'name=novo,nodes=4000' ou 'module=/tmp/engine_antigo.py'")
+    parser.add_argument('engine_b', help="configuração B (base de comparação)")
+    parser.add_argument('--games', type=int, default=len(OPENINGS) * 2, help="número de partidas (pares de cores)")
+    parser.add_argument('--nodes', type=int, help=f"nós por lance para quem não define (padrão: {DEFAULT_NODES})")
+    parser.add_argument('--movetime', type=float, help="segundos por lance para quem não define")
+    parser.add_argument('--openings', help="arquivo de aberturas (FEN/lances por linha, ou .pgn)")
+    parser.add_argument('--workers', type=int, help="processos (padrão: núcleos da máquina)")
+    parser.add_argument('--seed', type=int, default=0, help="semente das engines")
+    parser.add_argument('--sprt', nargs='*', type=float, metavar='X',
+                        help=f"SPRT: elo0 elo1 [alpha beta] (padrão: {SPRT_ELO0:g} {SPRT_ELO1:g} "
+                             f"{SPRT_ALPHA} {SPRT_BETA})")
+    parser.add_argument('--pgn', help="grava as partidas neste arquivo PGN")
+    args = parser.parse_args()
+
+    configs = []
+    for spec in (args.engine_a, args.engine_b):
+        try:
+            config = parse_engine(spec)
+        except (ValueError, TypeError) as e:
+            parser.error(str(e))
+        if config.nodes is None and config.movetime is None and config.depth is None:
+            nodes = args.nodes if args.nodes or args.movetime else DEFAULT_NODES
+            config = EngineConfig(**{**config.__dict__, 'nodes': nodes, 'movetime': args.movetime})
+        configs.append(config)
+    if configs[0].name == configs[1].name:
+        configs[1] = EngineConfig(**{**configs[1].__dict__, 'name': configs[1].name + "-2"})
+    sprt = None
+    if args.sprt is not None:
+        sprt = tuple(args.sprt) + (SPRT_ELO0, SPRT_ELO1, SPRT_ALPHA, SPRT_BETA)[len(args.sprt):]
+
+    progress = lambda message: print(message, file=sys.stderr, flush=True)
+    pgn_out = open(args.pgn, 'w', encoding='utf-8') if args.pgn else None
+    try:
+        report = run_match(configs, args.games, args.workers, args.seed, load_openings(args.openings), sprt, pgn_out,
+                           progress)
+    finally:
+        if pgn_out: pgn_out.close()
+
+    print(report.summary())
+    for slot, name in enumerate(report.names):
+        print(f"{name}: {report.nodes[slot]} nós em {report.time[slot]:.1f}s ({report.nps(slot):.0f} nós/s)")
+    if sprt:
+        low, high = sprt_bounds(*sprt[2:])
+        verdict = {'H1': "aceita H1", 'H0': "aceita H0"}.get(report.sprt, "inconclusivo")
+        print(f"SPRT elo0={sprt[0]:g} elo1={sprt[1]:g}: LLR {report.llr:.2f} em [{low:.2f}, {high:.2f}] -> {verdict}")
+    print(f"{report.games} partidas em {report.elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+# meu_xadrez/chess_game/nnue.py (AVALIAÇÃO POR REDE NEURAL ATUALIZADA INCREMENTALMENTE, ESTILO NNUE, EM NUMPY)
+import argparse
+import functools
+import math
+import multiprocessing
+import os
+import sys
+import time
+
+import chess
+import numpy as np
+from chess_game.engine import DEFAULT_NNUE_PATH, ChessEngine, terminal_score
+from chess_game.pgn_pipeline import map_bounded
+from chess_game.tuner import DEFAULT_SKIP_PLIES, corpus_chunks, game_positions, parse_labelled_line
+
+# Entrada esparsa: (peça própria/adversária, tipo, casa) do ponto de vista de cada lado, 768 índices. Cada lado tem
+# seu acumulador (soma das linhas da primeira camada), atualizado a cada jogada; a saída vem de duas camadas densas
+# pequenas sobre [acumulador de quem joga, acumulador do adversário].
+N_FEATURES = 2 * 6 * 64
+MAX_ACTIVE = 32  # peças no tabuleiro: índices por perspectiva
+DEFAULT_HIDDEN, DEFAULT_HIDDEN2 = 64, 16
+ACC_SCALE = 256  # quantização da primeira camada: 1.0 vira 256 no int16 (reduzida se os pesos não couberem)
+ACC_LIMIT = 32000  # viés + 32 linhas precisam caber no int16 sem estourar
+CP_PER_LOGIT = 400 / math.log(10)  # saída da rede (logit da chance de vitória) em centipawns, a mesma curva do tuner
+DEFAULT_EPOCHS, DEFAULT_LR, DEFAULT_BATCH = 20, 1e-3, 1024
+DEFAULT_LAMBDA = 0.5  # peso do resultado da partida no alvo; o restante vem da avaliação clássica
+VALIDATION_FRACTION = 0.05
+
+
+def feature_index(color, piece_type, square, perspective):
+    if perspective == chess.BLACK: square = chess.square_mirror(square)
+    return (0 if color == perspective else 384) + (piece_type - 1) * 64 + square
+
+
+def board_features(board: chess.Board, perspective):
+    return [feature_index(piece.color, piece.piece_type, square, perspective)
+            for square, piece in board.piece_map().items()]
+
+
+class Network:
+    """Pesos da rede: primeira camada quantizada em int16, camadas densas em float32; compartilhados entre engines."""
+
+    def __init__(self, w0, b0, w1, b1, w2, b2):
+        # w0 (768, H), b0 (H,), w1 (H2, 2H), b1 (H2,), w2 (H2,), b2 escalar; em unidades de float
+        self.hidden = w0.shape[1]
+        self.scale = max(1, min(ACC_SCALE, int(ACC_LIMIT / (np.abs(b0).max() + MAX_ACTIVE * np.abs(w0).max()))))
+        w0q = np.rint(w0 * self.scale).astype(np.int16)
+        self.b0 = np.rint(b0 * self.scale).astype(np.int16)
+        # rows[cor, tipo, casa] = linhas das duas perspectivas: uma soma numpy por peça que entra ou sai
+        self.rows = np.zeros((2, 7, 64, 2, self.hidden), dtype=np.int16)
+        for color in chess.COLORS:
+            for piece_type in chess.PIECE_TYPES:
+                for square in chess.SQUARES:
+                    self.rows[int(color), piece_type, square] = w0q[[
+                        feature_index(color, piece_type, square, perspective) for perspective in chess.COLORS]]
+        self.w1 = (w1 / self.scale).astype(np.float32)  # já desfaz a escala do acumulador
+        self.b1, self.w2, self.b2 = b1.astype(np.float32), w2.astype(np.float32), float(b2)
+
+    @classmethod
+    def from_file(cls, path):
+        with np.load(path) as data:
+            return cls(*(data[name] for name in ('w0', 'b0', 'w1', 'b1', 'w2', 'b2')))
+
+    def accumulator(self, board: chess.Board):
+        pieces = board.piece_map()
+        acc = np.tile(self.b0, (2, 1))
+        if pieces:
+            colors, types = zip(*((int(piece.color), piece.piece_type) for piece in pieces.values()))
+            acc += self.rows[list(colors), list(types), list(pieces)].sum(axis=0, dtype=np.int16)
+        return acc
+
+    def forward(self, acc, turn):
+        # Logit da chance de vitória de quem joga
+        x = np.clip(acc if turn == chess.WHITE else acc[::-1], 0, self.scale).ravel()
+        h = self.w1 @ x + self.b1
+        np.clip(h, 0, 1, out=h)
+        return float(self.w2 @ h) + self.b2
+
+
+@functools.lru_cache(maxsize=None)
+def open_network(path):
+    # Rede treinada por este módulo; None se o arquivo não existir
+    if not os.path.exists(path): return None
+    return Network.from_file(path)
+
+
+class NNUEEvaluator:
+    """Acumuladores de uma engine: pilha acompanhando push/pop da busca sobre a rede compartilhada."""
+
+    def __init__(self, network: Network):
+        self.network, self.stack = network, []
+
+    def reset(self, board: chess.Board):
+        self.stack = [self.network.accumulator(board)]
+
+    def push(self, board: chess.Board, move: chess.Move):
+        # Chamado antes de board.push(move): só as linhas das peças que saem ou entram mudam
+        rows, color = self.network.rows, int(board.turn)
+        piece_type = board.piece_type_at(move.from_square)
+        acc = self.stack[-1] - rows[color, piece_type, move.from_square]
+        acc += rows[color, move.promotion or piece_type, move.to_square]
+        if board.is_castling(move):
+            rank = chess.square_rank(move.from_square)
+            kingside = chess.square_file(move.to_square) > chess.square_file(move.from_square)
+            acc -= rows[color, chess.ROOK, chess.square(7 if kingside else 0, rank)]
+            acc += rows[color, chess.ROOK, chess.square(5 if kingside else 3, rank)]
+        elif board.is_en_passant(move):
+            acc -= rows[1 - color, chess.PAWN, move.to_square ^ 8]
+        elif captured := board.piece_type_at(move.to_square):
+            acc -= rows[1 - color, captured, move.to_square]
+        self.stack.append(acc)
+
+    def pop(self):
+        self.stack.pop()
+
+    def evaluate(self, board: chess.Board, incremental=False):
+        # Centipawns do ponto de vista das brancas; incremental usa o acumulador da pilha (o nó atual da busca)
+        acc = self.stack[-1] if incremental else self.network.accumulator(board)
+        score = int(self.network.forward(acc, board.turn) * CP_PER_LOGIT)
+        return score if board.turn == chess.WHITE else -score
+
+
+# Treino: cada posição vira os índices das duas perspectivas (quem joga primeiro), completados com N_FEATURES (linha
+# sempre zero), o resultado e a nota clássica, ambos do ponto de vista de quem joga.
+_teacher = None
+
+
+def _init_extract_worker():
+    global _teacher
+    _teacher = ChessEngine()
+    _teacher.load_eval_params()
+
+
+def _padded(indices):
+    return indices + [N_FEATURES] * (MAX_ACTIVE - len(indices))
+
+
+def _extract_chunk(task):
+    kind, items, skip_plies = task
+    own, opp, results, teacher = [], [], [], []
+    if kind == 'pgn':
+        labelled = (item for text in items for item in game_positions(text, skip_plies))
+    else:
+        labelled = filter(None, map(parse_labelled_line, items))
+    for board, result in labelled:
+        if terminal_score(board) is not None: continue
+        sign = 1 if board.turn == chess.WHITE else -1
+        own.append(_padded(board_features(board, board.turn)))
+        opp.append(_padded(board_features(board, not board.turn)))
+        results.append(result if sign > 0 else 1 - result)
+        teacher.append(sign * _teacher.evaluate_board(board))
+    return (np.array(own, dtype=np.int16).reshape(-1, MAX_ACTIVE),
+            np.array(opp, dtype=np.int16).reshape(-1, MAX_ACTIVE), np.array(results, dtype=np.float32),
+            np.array(teacher, dtype=np.float32))
+
+
+def extract_training_data(path, workers=None, skip_plies=DEFAULT_SKIP_PLIES, progress=None):
+    workers = workers or multiprocessing.cpu_count()
+    parts = []
+    for part in map_bounded(_extract_chunk, corpus_chunks(path, skip_plies), workers, _init_extract_worker):
+        parts.append(part)
+        if progress: progress(f"{sum(len(p[2]) for p in parts)} posições extraídas")
+    if not parts: raise ValueError("corpus sem posições rotuladas")
+    return {name: np.concatenate([part[i] for part in parts]) for i, name in
+            enumerate(('own', 'opp', 'results', 'teacher'))}
+
+
+def load_training_data(path):
+    with np.load(path) as data:
+        return {name: data[name] for name in ('own', 'opp', 'results', 'teacher')}
+
+
+def init_weights(hidden=DEFAULT_HIDDEN, hidden2=DEFAULT_HIDDEN2, seed=0):
+    rng = np.random.default_rng(seed)
+    return {'w0': rng.normal(0, 0.05, (N_FEATURES + 1, hidden)).astype(np.float32),  # última linha: enchimento
+            'b0': np.full(hidden, 0.5, dtype=np.float32),
+            'w1': rng.normal(0, 1 / math.sqrt(2 * hidden), (hidden2, 2 * hidden)).astype(np.float32),
+            'b1': np.zeros(hidden2, dtype=np.float32),
+            'w2': rng.normal(0, 1 / math.sqrt(hidden2), hidden2).astype(np.float32),
+            'b2': np.zeros((), dtype=np.float32)}
+
+
+def _forward(weights, own, opp):
+    x = np.concatenate([weights['w0'][own].sum(axis=1), weights['w0'][opp].sum(axis=1)], axis=1)
+    x += np.tile(weights['b0'], 2)
+    x_act = np.clip(x, 0, 1)
+    h = x_act @ weights['w1'].T + weights['b1']
+    h_act = np.clip(h, 0, 1)
+    return x, x_act, h, h_act, h_act @ weights['w2'] + weights['b2']
+
+
+def predict(weights, own, opp, batch=8192):
+    # Logits em float32, na mesma conta da rede quantizada (sem arredondamento)
+    return np.concatenate([_forward(weights, own[i:i + batch], opp[i:i + batch])[-1]
+                           for i in range(0, len(own), batch)])
+
+
+def targets(data, lam=DEFAULT_LAMBDA):
+    return lam * data['results'] + (1 - lam) / (1 + np.exp(-data['teacher'] / CP_PER_LOGIT))
+
+
+def loss(weights, own, opp, target):
+    return float(np.mean((1 / (1 + np.exp(-predict(weights, own, opp))) - target) ** 2))
+
+
+def gradients(weights, own, opp, target):
+    # Retropropagação manual; a primeira camada acumula só nas linhas ativas (np.add.at)
+    x, x_act, h, h_act, z = _forward(weights, own, opp)
+    p = 1 / (1 + np.exp(-z))
+    dz = 2 * (p - target) * p * (1 - p) / len(z)
+    dh = np.outer(dz, weights['w2']) * ((h > 0) & (h < 1))
+    dx = (dh @ weights['w1']) * ((x > 0) & (x < 1))
+    hidden = weights['b0'].shape[0]
+    g_w0 = np.zeros_like(weights['w0'])
+    np.add.at(g_w0, own, np.broadcast_to(dx[:, None, :hidden], own.shape + (hidden,)))
+    np.add.at(g_w0, opp, np.broadcast_to(dx[:, None, hidden:], opp.shape + (hidden,)))
+    g_w0[N_FEATURES] = 0
+    return {'w0': g_w0, 'b0': dx[:, :hidden].sum(axis=0) + dx[:, hidden:].sum(axis=0), 'w1': dh.T @ x_act,
+            'b1': dh.sum(axis=0), 'w2': h_act.T @ dz, 'b2': dz.sum()}
+
+
+def train(data, weights, epochs=DEFAULT_EPOCHS, lr=DEFAULT_LR, batch=DEFAULT_BATCH, lam=DEFAULT_LAMBDA, seed=0,
+          progress=None):
+    # Adam em minilotes; separa uma fração fixa das posições para medir a perda fora do treino
+    rng = np.random.default_rng(seed)
+    own, opp = data['own'].astype(np.intp), data['opp'].astype(np.intp)
+    target = targets(data, lam).astype(np.float32)
+    order = rng.permutation(len(target))
+    split = max(1, int(len(order) * VALIDATION_FRACTION)) if len(order) > 20 else 0
+    valid, train_rows = order[:split], order[split:]
+    m = {name: np.zeros_like(w) for name, w in weights.items()}
+    v = {name: np.zeros_like(w) for name, w in weights.items()}
+    beta1, beta2, eps, step = 0.9, 0.999, 1e-8, 0
+    for epoch in range(1, epochs + 1):
+        rng.shuffle(train_rows)
+        for first in range(0, len(train_rows), batch):
+            rows = train_rows[first:first + batch]
+            step += 1
+            for name, g in gradients(weights, own[rows], opp[rows], target[rows]).items():
+                m[name] = beta1 * m[name] + (1 - beta1) * g
+                v[name] = beta2 * v[name] + (1 - beta2) * g * g
+                weights[name] = (weights[name] - lr * (m[name] / (1 - beta1 ** step)) /
+                                 (np.sqrt(v[name] / (1 - beta2 ** step)) + eps)).astype(np.float32)
+        if progress:
+            train_loss = loss(weights, own[train_rows], opp[train_rows], target[train_rows])
+            message = f"época {epoch}/{epochs}: perda {train_loss:.6f}"
+            if split: message += f", validação {loss(weights, own[valid], opp[valid], target[valid]):.6f}"
+            progress(message)
+    return weights
+
+
+def save_network(path, weights, **info):
+    np.savez(path, **{name: w[:N_FEATURES] if name == 'w0' else w for name, w in weights.items()}, **info)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Treina a rede da avaliação NNUE com as posições de um corpus "
+                                                 "local (resultado da partida + avaliação clássica como alvo).")
+    parser.add_argument('corpus', help="posições rotuladas (FEN + resultado por linha) ou partidas .pgn; "
+                                       "com --data pode ser o cache .npz")
+    parser.add_argument('-o', '--output', default=DEFAULT_NNUE_PATH, help="arquivo da rede (.npz)")
+    parser.add_argument('--epochs', type=int, default=DEFAULT_EPOCHS)
+    parser.add_argument('--lr', type=float, default=DEFAULT_LR, help="passo do Adam")
+    parser.add_argument('--batch', type=int, default=DEFAULT_BATCH, help="posições por minilote")
+    parser.add_argument('--hidden', type=int, default=DEFAULT_HIDDEN, help="tamanho do acumulador por lado")
+    parser.add_argument('--hidden2', type=int, default=DEFAULT_HIDDEN2, help="neurônios da camada densa")
+    parser.add_argument('--lambda', dest='lam', type=float, default=DEFAULT_LAMBDA,
+                        help="peso do resultado no alvo (0 = só a avaliação clássica, 1 = só o resultado)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, help="processos na extração (padrão: núcleos da máquina)")
+    parser.add_argument('--skip-plies', type=int, default=DEFAULT_SKIP_PLIES, help="meios-lances ignorados (PGN)")
+    parser.add_argument('--data', action='store_true', help="o corpus é um cache de posições (.npz)")
+    parser.add_argument('--save-data', metavar='ARQUIVO', help="grava o cache de posições (.npz)")
+    args = parser.parse_args()
+    progress = lambda message: print(message, file=sys.stderr, flush=True)
+
+    start = time.perf_counter()
+    data = load_training_data(args.corpus) if args.data else extract_training_data(args.corpus, args.workers,
+                                                                                  args.skip_plies)
+    if args.save_data: np.savez(args.save_data, **data)
+    progress(f"{len(data['results'])} posições em {time.perf_counter() - start:.1f}s")
+
+    start = time.perf_counter()
+    weights = train(data, init_weights(args.hidden, args.hidden2, args.seed), args.epochs, args.lr, args.batch,
+                    args.lam, args.seed, progress)
+    final = loss(weights, data['own'].astype(np.intp), data['opp'].astype(np.intp), targets(data, args.lam))
+    save_network(args.output, weights, loss=final, positions=len(data['results']))
+    print(f"perda {final:.6f} após {args.epochs} épocas em {time.perf_counter() - start:.1f}s -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+# meu_xadrez/chess_game/perft.py (PERFT: CORREÇÃO E VELOCIDADE DA GERAÇÃO DE JOGADAS)
+import argparse
+import multiprocessing
+import sys
+import time
+
+import chess
+from chess_game.engine import order_moves
+
+DEFAULT_MAX_LEAVES = 100_000  # na suíte, cada posição roda na maior profundidade com até tantas folhas
+# (nome, FEN, folhas conhecidas por profundidade a partir de 1); posições da chessprogramming wiki e testes clássicos
+# de en passant, roque e promoção
+PERFT_POSITIONS = [
+    ("inicial", chess.STARTING_FEN, [20, 400, 8902, 197281, 4865609, 119060324]),
+    ("kiwipete", "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+     [48, 2039, 97862, 4085603, 193690690]),
+    ("posição 3", "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1", [14, 191, 2812, 43238, 674624, 11030083]),
+    ("posição 4", "r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1",
+     [6, 264, 9467, 422333, 15833292]),
+    ("posição 4 espelhada", "r2q1rk1/pP1p2pp/Q4n2/bbp1p3/Np6/1B3NBn/pPPP1PPP/R3K2R b KQ - 0 1",
+     [6, 264, 9467, 422333, 15833292]),
+    ("posição 5", "rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8", [44, 1486, 62379, 2103487, 89941194]),
+    ("posição 6", "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10",
+     [46, 2079, 89890, 3894594, 164075551]),
+    ("en passant ilegal 1", "3k4/3p4/8/K1P4r/8/8/8/8 b - - 0 1", [18, 92, 1670, 10138, 185429, 1134888]),
+    ("en passant ilegal 2", "8/8/4k3/8/2p5/8/B2P2K1/8 w - - 0 1", [13, 102, 1266, 10276, 135655, 1015133]),
+    ("en passant dá xeque", "8/8/1k6/2b5/2pP4/8/5K2/8 b - d3 0 1", [15, 126, 1928, 13931, 206379, 1440467]),
+    ("roque curto dá xeque", "5k2/8/8/8/8/8/8/4K2R w K - 0 1", [15, 66, 1198, 6399, 120330, 661072]),
+    ("roque longo dá xeque", "3k4/8/8/8/8/8/8/R3K3 w Q - 0 1", [16, 71, 1286, 7418, 141077, 803711]),
+    ("direitos de roque", "r3k2r/1b4bq/8/8/8/8/7B/R3K2R w KQkq - 0 1", [26, 1141, 27826, 1274206]),
+    ("roque impedido", "r3k2r/8/3Q4/8/8/5q2/8/R3K2R b KQkq - 0 1", [44, 1494, 50509, 1720476]),
+    ("promoção sai do xeque", "2K2r2/4P3/8/8/8/8/8/3k4 w - - 0 1", [11, 133, 1442, 19174, 266199, 3821001]),
+    ("xeque descoberto", "8/8/1P2K3/8/2n5/1q6/8/5k2 b - - 0 1", [29, 165, 5160, 31961, 1004658]),
+    ("promoção dá xeque", "4k3/1P6/8/8/8/8/K7/8 w - - 0 1", [9, 40, 472, 2661, 38983, 217342]),
+    ("subpromoção dá xeque", "8/P1k5/K7/8/8/8/8/8 w - - 0 1", [6, 27, 273, 1329, 18135, 92683]),
+    ("autoafogamento", "K1k5/8/P7/8/8/8/8/8 w - - 0 1", [2, 6, 13, 63, 382, 2217]),
+    ("afogamento e mate", "8/k1P5/8/1K6/8/8/8/8 w - - 0 1", [10, 25, 268, 926, 10857, 43261, 567584]),
+    ("afogamento e mate 2", "8/8/2k5/5q2/5n2/8/5K2/8 b - - 0 1", [37, 183, 6559, 23527]),
+]
+
+
+def _perft_board(board: chess.Board, depth):
+    # Referência: python-chess puro, push/pop até as folhas
+    if depth == 0: return 1
+    nodes = 0
+    for move in board.legal_moves:
+        board.push(move)
+        nodes += _perft_board(board, depth - 1)
+        board.pop()
+    return nodes
+
+
+def _perft_bulk(board: chess.Board, depth):
+    # Contagem em bloco: no último nível só conta as jogadas, sem push/pop
+    if depth <= 1: return board.legal_moves.count() if depth == 1 else 1
+    nodes = 0
+    for move in board.legal_moves:
+        board.push(move)
+        nodes += _perft_bulk(board, depth - 1)
+        board.pop()
+    return nodes
+
+
+def _perft_engine(board: chess.Board, depth):
+    # O caminho da busca da ChessEngine: tabuleiro sem histórico, chave da TT em todo nó e jogadas em order_moves()
+    board._transposition_key()
+    if depth == 0: return 1
+    nodes = 0
+    for move in order_moves(board):
+        board.push(move)
+        nodes += _perft_engine(board, depth - 1)
+        board.pop()
+    return nodes
+
+
+BACKENDS = {
+    'python-chess': lambda board, depth: _perft_board(board.copy(), depth),
+    'bulk': lambda board, depth: _perft_bulk(board.copy(), depth),
+    'engine': lambda board, depth: _perft_engine(board.copy(stack=False), depth),
+}
+
+
+def perft(board: chess.Board, depth, backend='python-chess'):
+    return BACKENDS[backend](board, depth)
+
+
+def perft_divide(board: chess.Board, depth, backend='python-chess'):
+    # Folhas por jogada da raiz (ordenadas pela UCI), para comparar com outra engine e achar o lance divergente
+    divide = []
+    for move in board.legal_moves:
+        board.push(move)
+        divide.append((move.uci(), perft(board, depth - 1, backend) if depth > 1 else 1))
+        board.pop()
+    return sorted(divide)
+
+
+def _perft_task(task):
+    fen, uci, depth, backend = task
+    board = chess.Board(fen)
+    board.push_uci(uci)
+    return uci, perft(board, depth - 1, backend) if depth > 1 else 1
+
+
+def parallel_perft(board: chess.Board, depth, workers=None, backend='python-chess'):
+    # Divide as jogadas da raiz entre processos; devolve o mesmo divide de perft_divide()
+    workers = workers or multiprocessing.cpu_count()
+    tasks = [(board.fen(), move.uci(), depth, backend) for move in board.legal_moves]
+    if workers <= 1 or len(tasks) <= 1 or depth <= 1: return perft_divide(board, depth, backend)
+    with multiprocessing.Pool(min(workers, len(tasks))) as pool:
+        return sorted(pool.imap_unordered(_perft_task, tasks))
+
+
+def suite_depth(counts, max_leaves=DEFAULT_MAX_LEAVES):
+    # Maior profundidade cuja contagem conhecida cabe no orçamento de folhas (no mínimo 1)
+    return max((depth for depth, leaves in enumerate(counts, 1) if leaves <= max_leaves), default=1)
+
+
+def run_suite(backends=tuple(BACKENDS), max_leaves=DEFAULT_MAX_LEAVES, workers=1, progress=print):
+    # Confere todas as posições contra as contagens conhecidas; devolve (falhas, {backend: (folhas, segundos)})
+    failures, totals = [], {backend: [0, 0.0] for backend in backends}
+    for name, fen, counts in PERFT_POSITIONS:
+        depth = suite_depth(counts, max_leaves)
+        expected, board = counts[depth - 1], chess.Board(fen)
+        for backend in backends:
+            start = time.perf_counter()
+            leaves = sum(count for _, count in parallel_perft(board, depth, workers, backend))
+            elapsed = time.perf_counter() - start
+            totals[backend][0] += leaves
+            totals[backend][1] += elapsed
+            if leaves != expected: failures.append((name, backend, depth, expected, leaves))
+            if progress: progress(f"{name:<24} {backend:<12} prof. {depth}: {leaves:>9} "
+                                  f"{'OK' if leaves == expected else f'FALHOU (esperado {expected})':<8} "
+                                  f"{elapsed:6.2f}s {leaves / elapsed if elapsed > 0 else 0:>10.0f} folhas/s")
+    return failures, {backend: tuple(total) for backend, total in totals.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Perft: conta as folhas da árvore de jogadas legais para conferir "
+                                                 "e medir a geração de jogadas.")
+    parser.add_argument('--fen', help="posição (padrão: roda a suíte de posições com contagens conhecidas)")
+    parser.add_argument('--depth', type=int, default=4, help="profundidade para --fen")
+    parser.add_argument('--divide', action='store_true', help="mostra as folhas por jogada da raiz")
+    parser.add_argument('--backend', choices=[*BACKENDS, 'all'], default='all',
+                        help="implementação a medir ('all' compara todas)")
+    parser.add_argument('--workers', type=int, default=1, help="processos que dividem as jogadas da raiz")
+    parser.add_argument('--max-leaves', type=int, default=DEFAULT_MAX_LEAVES,
+                        help="na suíte, folhas máximas por posição")
+    args = parser.parse_args()
+    backends = tuple(BACKENDS) if args.backend == 'all' else (args.backend,)
+
+    if not args.fen:
+        failures, totals = run_suite(backends, args.max_leaves, args.workers)
+        print()
+        for backend, (leaves, elapsed) in totals.items():
+            print(f"{backend:<12} {leaves} folhas em {elapsed:.2f}s: {leaves / elapsed:.0f} folhas/s")
+        for name, backend, depth, expected, leaves in failures:
+            print(f"FALHOU: {name} ({backend}) prof. {depth}: {leaves} em vez de {expected}")
+        sys.exit(1 if failures else 0)
+
+    try:
+        board = chess.Board(args.fen)
+    except ValueError as e:
+        parser.error(str(e))
+    for backend in backends:
+        start = time.perf_counter()
+        divide = parallel_perft(board, args.depth, args.workers, backend)
+        elapsed = time.perf_counter() - start
+        if args.divide and backend == backends[0]:
+            for uci, count in divide:
+                print(f"{uci}: {count}")
+            print()
+        leaves = sum(count for _, count in divide)
+        print(f"{backend:<12} prof. {args.depth}: {leaves} folhas em {elapsed:.2f}s "
+              f"({leaves / elapsed if elapsed > 0 else 0:.0f} folhas/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+# meu_xadrez/chess_game/pgn_pipeline.py (ANÁLISE EM LOTE DE BASES PGN, COM SAÍDA JSONL E RETOMADA)
+import argparse
+import collections
+import io
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+import chess
+import chess.pgn
+from chess_game.engine import ChessEngine, mate_moves
+from chess_game.game_analysis import analyze_plies, summarize
+
+DEFAULT_NODES = 2000  # orçamento de nós por posição
+DEFAULT_CHECKPOINT_EVERY = 50  # partidas entre checkpoints
+INFLIGHT_PER_WORKER = 4  # partidas em andamento por processo: limita a memória independente do tamanho do arquivo
+HEADER_FIELDS = ('Event', 'Site', 'Date', 'White', 'Black', 'Result', 'WhiteElo', 'BlackElo', 'ECO')
+
+_worker_engine = None
+_worker_nodes, _worker_seed = DEFAULT_NODES, 0
+
+
+def iter_game_texts(path, offset=0):
+    # Gerador preguiçoso: (byte final, texto) de cada partida, separando no cabeçalho [Event
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        lines, position = [], offset
+        for line in f:
+            if line.startswith(b'[Event ') and any(not l.startswith(b'[') and l.strip() for l in lines):
+                yield position, b''.join(lines).decode('utf-8', errors='replace')
+                lines = []
+            lines.append(line)
+            position += len(line)
+        if any(l.strip() for l in lines):
+            yield position, b''.join(lines).decode('utf-8', errors='replace')
+
+
+def map_bounded(function, items, workers, initializer=None, initargs=()):
+    # Como pool.imap (resultados na ordem), mas com no máximo INFLIGHT_PER_WORKER itens por processo em andamento:
+    # o imap consome o gerador inteiro de uma vez e poria toda a entrada na memória
+    if workers <= 1:
+        if initializer: initializer(*initargs)
+        yield from map(function, items)
+        return
+    pool = multiprocessing.Pool(workers, initializer=initializer, initargs=initargs)
+    pending = collections.deque()
+    try:
+        for item in items:
+            pending.append(pool.apply_async(function, (item,)))
+            if len(pending) >= workers * INFLIGHT_PER_WORKER: yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+def _init_worker(seed, nodes):
+    global _worker_engine, _worker_nodes, _worker_seed
+    _worker_engine = ChessEngine(seed=seed)
+    _worker_engine.load_eval_params()
+    _worker_engine.load_tablebase()
+    _worker_engine.load_bitbases()
+    _worker_nodes, _worker_seed = nodes, seed
+
+
+def score_json(score):
+    mate = mate_moves(score)
+    return {'eval': None if mate is not None else score, 'mate': mate}
+
+
+def analyze_game_text(text, max_plies=None):
+    # Um registro JSON por partida; lances com nota do ponto de vista das brancas
+    game = chess.pgn.read_game(io.StringIO(text))
+    if game is None: return {'error': 'partida vazia'}
+    headers = {name: game.headers[name] for name in HEADER_FIELDS if name in game.headers}
+    if game.errors: return {'headers': headers, 'error': str(game.errors[0])}
+    ucis = [move.uci() for move in game.mainline_moves()][:max_plies]
+    # Cada partida parte da TT vazia e da mesma semente: o resultado não depende do processo nem da retomada
+    _worker_engine.tt.clear()
+    _worker_engine.rng.seed(_worker_seed)
+    plies = analyze_plies(_worker_engine, game.board().fen(), 0, ucis, nodes=_worker_nodes)
+    acpl, accuracy, counts = summarize(plies)
+    moves = [{'san': p.san, **score_json(p.white_score), 'best': p.best_san, 'type': p.move_type}
+             for p in plies]
+    return {'headers': headers, 'plies': len(plies), 'acpl': acpl, 'accuracy': accuracy, 'counts': counts,
+            'moves': moves}
+
+
+def load_checkpoint(path):
+    if not os.path.exists(path): return {'games': 0, 'positions': 0, 'offset': 0, 'output_bytes': 0}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_checkpoint(path, state):
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(state, f)
+    os.replace(tmp, path)  # troca atômica: um kill no meio não deixa checkpoint pela metade
+
+
+def run_pipeline(pgn_path, output, nodes=DEFAULT_NODES, workers=None, seed=0, checkpoint_every=DEFAULT_CHECKPOINT_EVERY,
+                 max_plies=None, fresh=False, progress=print):
+    # A saída sai na ordem do arquivo; o checkpoint guarda o byte do PGN e o tamanho do JSONL já confirmados,
+    # então a retomada descarta qualquer linha gravada depois dele
+    checkpoint_path = output + '.ckpt'
+    if fresh and os.path.exists(checkpoint_path): os.remove(checkpoint_path)
+    state = load_checkpoint(checkpoint_path)
+    with open(output, 'ab') as out:
+        out.truncate(state['output_bytes'])
+
+    workers = workers or multiprocessing.cpu_count()
+    start, games, positions = time.perf_counter(), 0, 0
+    pool = multiprocessing.Pool(workers, initializer=_init_worker, initargs=(seed, nodes))
+    pending = collections.deque()
+    try:
+        with open(output, 'a', encoding='utf-8') as out:
+            def write_oldest():
+                nonlocal games, positions
+                end_offset, async_result = pending.popleft()
+                record = {'game': state['games'], **async_result.get()}
+                out.write(json.dumps(record, ensure_ascii=False) + '\n')
+                games += 1
+                positions += record.get('plies', 0)
+                state['games'] += 1
+                state['positions'] += record.get('plies', 0)
+                state['offset'] = end_offset
+                if state['games'] % checkpoint_every == 0:
+                    out.flush()
+                    state['output_bytes'] = out.tell()
+                    save_checkpoint(checkpoint_path, state)
+                    elapsed = time.perf_counter() - start
+                    if progress: progress(f"{state['games']} partidas | {games / elapsed:.2f} partidas/s, "
+                                          f"{positions / elapsed:.1f} posições/s")
+
+            for end_offset, text in iter_game_texts(pgn_path, state['offset']):
+                pending.append((end_offset, pool.apply_async(analyze_game_text, (text, max_plies))))
+                if len(pending) >= workers * INFLIGHT_PER_WORKER: write_oldest()
+            while pending:
+                write_oldest()
+            out.flush()
+            state['output_bytes'] = out.tell()
+            save_checkpoint(checkpoint_path, state)
+    finally:
+        pool.terminate()
+        pool.join()
+
+    elapsed = time.perf_counter() - start
+    return {'games': games, 'positions': positions, 'total_games': state['games'], 'elapsed_s': elapsed,
+            'games_per_s': games / elapsed if elapsed > 0 else 0.0,
+            'positions_per_s': positions / elapsed if elapsed > 0 else 0.0}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analisa uma base PGN inteira e grava um registro JSON por partida.")
+    parser.add_argument('pgn', help="arquivo PGN (lido sob demanda, sem carregar o arquivo inteiro)")
+    parser.add_argument('-o', '--output', required=True, help="arquivo JSONL de saída (retomado se houver checkpoint)")
+    parser.add_argument('--nodes', type=int, default=DEFAULT_NODES, help="orçamento de nós por posição")
+    parser.add_argument('--workers', type=int, help="processos (padrão: núcleos da máquina)")
+    parser.add_argument('--seed', type=int, default=0, help="semente da engine")
+    parser.add_argument('--max-plies', type=int, help="analisa só os primeiros meios-lances de cada partida")
+    parser.add_argument('--checkpoint-every', type=int, default=DEFAULT_CHECKPOINT_EVERY,
+                        help="partidas entre checkpoints")
+    parser.add_argument('--fresh', action='store_true', help="ignora o checkpoint e recomeça do início")
+    args = parser.parse_args()
+
+    progress = lambda message: print(message, file=sys.stderr, flush=True)
+    stats = run_pipeline(args.pgn, args.output, args.nodes, args.workers, args.seed, args.checkpoint_every,
+                         args.max_plies, args.fresh, progress)
+    print(f"{stats['games']} partidas ({stats['total_games']} no total), {stats['positions']} posições em "
+          f"{stats['elapsed_s']:.1f}s: {stats['games_per_s']:.2f} partidas/s, "
+          f"{stats['positions_per_s']:.1f} posições/s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+# meu_xadrez/chess_game/profiler.py (MEDIÇÃO DE TEMPO POR FRAME E DA ENGINE)
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Fases do frame medidas individualmente (draw_move_history roda dentro de draw_side_panel)
+PHASES = ['handle_events', 'draw_board', 'draw_pieces', 'draw_side_panel', 'draw_move_history']
+
+
+def percentile(values, pct):
+    if not values: return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+class FrameProfiler:
+    """Janela deslizante com tempos de frame, de cada fase e da última chamada da engine (tudo em ms)."""
+
+    def __init__(self, window=240):
+        self.window = window
+        self.reset()
+
+    def reset(self):
+        self.frame_times = deque(maxlen=self.window)
+        self.frame_intervals = deque(maxlen=self.window)
+        self.phase_times = {phase: deque(maxlen=self.window) for phase in PHASES}
+        self.engine_calls = deque(maxlen=self.window)
+        self.last_engine_call = None
+        self._frame_start = None
+        self._last_frame_start = None
+        self._current_phases = {}
+
+    def begin_frame(self):
+        now = time.perf_counter()
+        if self._last_frame_start is not None:
+            self.frame_intervals.append((now - self._last_frame_start) * 1000)
+        self._frame_start = self._last_frame_start = now
+        self._current_phases = {}
+
+    def end_frame(self):
+        if self._frame_start is None: return
+        self.frame_times.append((time.perf_counter() - self._frame_start) * 1000)
+        for phase in PHASES:
+            self.phase_times[phase].append(self._current_phases.get(phase, 0.0))
+        self._frame_start = None
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            self._current_phases[name] = self._current_phases.get(name, 0.0) + elapsed
+
+    @contextmanager
+    def engine_call(self, label):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.last_engine_call = (label, (time.perf_counter() - start) * 1000)
+            self.engine_calls.append(self.last_engine_call)
+
+    def fps(self):
+        if not self.frame_intervals: return 0.0
+        mean = sum(self.frame_intervals) / len(self.frame_intervals)
+        return 1000 / mean if mean > 0 else 0.0
+
+    def stats(self):
+        frames = list(self.frame_times)
+        return {
+            'frames': len(frames),
+            'fps': self.fps(),
+            'frame_ms': {'mean': sum(frames) / len(frames) if frames else 0.0, 'p50': percentile(frames, 50),
+                         'p95': percentile(frames, 95), 'p99': percentile(frames, 99),
+                         'max': max(frames) if frames else 0.0},
+            'phases_ms': {phase: sum(times) / len(times) if times else 0.0 for phase, times in
+                          self.phase_times.items()},
+            'engine_ms': {'last': self.last_engine_call[1] if self.last_engine_call else None,
+                          'label': self.last_engine_call[0] if self.last_engine_call else None,
+                          'p95': percentile([ms for _, ms in self.engine_calls], 95)},
+        }
+
+    def overlay_lines(self):
+        s = self.stats()
+        lines = [f"FPS: {s['fps']:.1f}",
+                 f"Frame ms  p50 {s['frame_ms']['p50']:.2f}  p95 {s['frame_ms']['p95']:.2f}  p99 {s['frame_ms']['p99']:.2f}"]
+        lines += [f"  {phase}: {ms:.2f}" for phase, ms in s['phases_ms'].items()]
+        if s['engine_ms']['last'] is not None:
+            lines.append(f"Engine ({s['engine_ms']['label']}): {s['engine_ms']['last']:.0f} ms")
+        return lines
+
+
+class EvalProfiler:
+    """Chamadas e tempo acumulados por etapa da avaliação (ChessEngine.eval_profiler)."""
+
+    def __init__(self, terms=False):
+        # terms=False cronometra o kernel inteiro, que é o que a busca roda; terms=True troca pelo caminho lento
+        # termo a termo (EVAL_TERMS), que dá a parte de cada termo mas não o custo real da avaliação
+        self.terms = terms
+        self.reset()
+
+    def reset(self):
+        self.calls, self.time = {}, {}
+
+    def record(self, term, elapsed):
+        self.calls[term] = self.calls.get(term, 0) + 1
+        self.time[term] = self.time.get(term, 0.0) + elapsed
+
+    def stats(self):
+        # Termos do mais caro ao mais barato: chamadas, ms totais, µs por chamada e fração do tempo de avaliação
+        total = sum(self.time.values())
+        return {term: {'calls': self.calls[term], 'time_ms': elapsed * 1000,
+                       'us_per_call': elapsed * 1e6 / self.calls[term], 'share': elapsed / total if total else 0.0}
+                for term, elapsed in sorted(self.time.items(), key=lambda item: -item[1])}
+
+
+def format_eval_stats(stats):
+    return [f"{term:<14} {s['calls']:>9} chamadas {s['time_ms']:>10.1f} ms {s['us_per_call']:>8.2f} µs/chamada "
+            f"{s['share'] * 100:>5.1f}%" for term, s in stats.items()]
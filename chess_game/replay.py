@@ -0,0 +1,117 @@
+# meu_xadrez/chess_game/replay.py (GRAVAÇÃO E REPRODUÇÃO DE SESSÕES PARA BENCHMARK)
+import argparse
+import json
+import os
+import time
+
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+import pygame
+
+# Eventos gravados e os atributos necessários para reconstruí-los
+RECORDED_EVENTS = {
+    'QUIT': (),
+    'MOUSEBUTTONDOWN': ('pos', 'button'),
+    'MOUSEBUTTONUP': ('pos', 'button'),
+    'MOUSEMOTION': ('pos', 'rel', 'buttons'),
+    'MOUSEWHEEL': ('x', 'y'),
+    'KEYDOWN': ('key', 'mod'),
+    'KEYUP': ('key', 'mod'),
+}
+EVENT_NAMES = {getattr(pygame, name): name for name in RECORDED_EVENTS}
+SESSION_VERSION = 1
+
+
+class SessionRecorder:
+    """Fonte de eventos que repassa pygame.event.get() e grava os eventos de cada frame em JSONL."""
+
+    def __init__(self, path, seed):
+        self.file = open(path, 'w', encoding='utf-8')
+        self.file.write(json.dumps({'version': SESSION_VERSION, 'seed': seed}) + '\n')
+        self.frame = 0
+
+    def __call__(self):
+        events = pygame.event.get()
+        recorded = [self.serialize(e) for e in events if e.type in EVENT_NAMES]
+        if recorded:
+            self.file.write(json.dumps({'frame': self.frame, 'events': recorded}) + '\n')
+        self.frame += 1
+        return events
+
+    @staticmethod
+    def serialize(event):
+        name = EVENT_NAMES[event.type]
+        data = {'type': name}
+        for attr in RECORDED_EVENTS[name]:
+            value = getattr(event, attr)
+            data[attr] = list(value) if isinstance(value, tuple) else value
+        return data
+
+    def close(self):
+        self.file.write(json.dumps({'frame': self.frame, 'events': [{'type': 'QUIT'}]}) + '\n')
+        self.file.close()
+
+
+class SessionPlayer:
+    """Fonte de eventos que devolve, frame a frame, os eventos de uma sessão gravada."""
+
+    def __init__(self, path):
+        with open(path, encoding='utf-8') as f:
+            self.header = json.loads(f.readline())
+            if self.header.get('version') != SESSION_VERSION:
+                raise ValueError(f"Versão de sessão não suportada: {self.header.get('version')}")
+            self.frames = {}
+            for line in f:
+                entry = json.loads(line)
+                self.frames[entry['frame']] = [self.deserialize(e) for e in entry['events']]
+        self.last_frame = max(self.frames, default=0)
+        self.frame = 0
+
+    @staticmethod
+    def deserialize(data):
+        attrs = {k: tuple(v) if isinstance(v, list) else v for k, v in data.items() if k != 'type'}
+        return pygame.event.Event(getattr(pygame, data['type']), attrs)
+
+    def __call__(self):
+        pygame.event.pump()
+        if self.frame > self.last_frame:
+            return [pygame.event.Event(pygame.QUIT)]
+        events = self.frames.get(self.frame, [])
+        self.frame += 1
+        return events
+
+
+def replay_session(path):
+    os.environ['SDL_VIDEODRIVER'] = 'dummy'
+    from chess_game.main import ChessGame
+    from chess_game.profiler import FrameProfiler
+
+    player = SessionPlayer(path)
+    game = ChessGame(seed=player.header['seed'])
+    game.fps_limit, game.ai_delay_ms, game.engine_time_limits = 0, 0, False
+    game.event_source = player
+    game.profiler = FrameProfiler(window=player.last_frame + 2)
+    start = time.perf_counter()
+    game.run()
+    stats = game.profiler.stats()
+    stats['wall_s'] = time.perf_counter() - start
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reproduz uma sessão gravada sem janela e mede o tempo por frame.")
+    parser.add_argument('session', help="arquivo .jsonl gravado com main.py --record")
+    parser.add_argument('--json', action='store_true', help="imprime as estatísticas em JSON")
+    args = parser.parse_args()
+
+    stats = replay_session(args.session)
+    if args.json:
+        print(json.dumps(stats))
+        return
+    print(f"Frames: {stats['frames']}  Tempo total: {stats['wall_s']:.2f}s  FPS: {stats['fps']:.1f}")
+    print("Frame ms: " + "  ".join(f"{k} {v:.2f}" for k, v in stats['frame_ms'].items()))
+    for phase, ms in stats['phases_ms'].items():
+        print(f"  {phase}: {ms:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
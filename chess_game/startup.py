@@ -0,0 +1,96 @@
+# meu_xadrez/chess_game/startup.py (MEDIÇÃO DE TEMPO DE INICIALIZAÇÃO)
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+# Orçamento do custo próprio da engine, acima do python-chess (que sozinho leva 55-110 ms conforme a carga da
+# máquina e ficaria fora de qualquer limite apertado): hoje 11-19 ms, ~2x de folga para pegar regressões
+ENGINE_IMPORT_BUDGET_MS = 30
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_IMPORT_PROBE = """
+import sys, time
+t = time.perf_counter()
+import chess
+chess_ms = (time.perf_counter() - t) * 1000
+t = time.perf_counter()
+import chess_game.engine
+own_ms = (time.perf_counter() - t) * 1000
+print(chess_ms + own_ms, own_ms, 'pygame' in sys.modules)
+"""
+
+_FIRST_FRAME_PROBE = """
+import os, time
+t = time.perf_counter()
+os.environ['SDL_VIDEODRIVER'] = 'dummy'
+os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'
+import pygame
+from chess_game.main import ChessGame
+game = ChessGame()
+game.event_source = lambda: [pygame.event.Event(pygame.QUIT)] if game.first_frame_ms is not None else []
+game.run()
+print(game.first_frame_ms, (time.perf_counter() - t) * 1000)
+"""
+
+
+def measure_engine_import(runs=5):
+    # Cada medição roda num interpretador novo para não aproveitar módulos já importados
+    env = dict(os.environ, PYTHONPATH=PROJECT_ROOT, PYTHONDONTWRITEBYTECODE='1')
+    # median_ms inclui o python-chess; own_median_ms é só o que a engine acrescenta (o que o orçamento limita)
+    samples, own_samples, pygame_loaded = [], [], False
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, '-c', _IMPORT_PROBE], capture_output=True, text=True, env=env,
+                             check=True).stdout.split()
+        samples.append(float(out[0]))
+        own_samples.append(float(out[1]))
+        pygame_loaded = pygame_loaded or out[2] == 'True'
+    samples.sort()
+    own_samples.sort()
+    return {'median_ms': samples[len(samples) // 2], 'min_ms': samples[0], 'max_ms': samples[-1],
+            'own_median_ms': own_samples[len(own_samples) // 2], 'pygame_loaded': pygame_loaded}
+
+
+def measure_first_frame(runs=3):
+    # Tempo do início de ChessGame() até o primeiro flip do menu, e desde antes de importar pygame
+    env = dict(os.environ, PYTHONPATH=PROJECT_ROOT, PYTHONDONTWRITEBYTECODE='1')
+    init_samples, process_samples = [], []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, '-c', _FIRST_FRAME_PROBE], capture_output=True, text=True, env=env,
+                             check=True).stdout.split()
+        init_samples.append(float(out[-2]))
+        process_samples.append(float(out[-1]))
+    init_samples.sort()
+    process_samples.sort()
+    return {'first_frame_ms': init_samples[len(init_samples) // 2],
+            'first_frame_from_import_ms': process_samples[len(process_samples) // 2]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mede a importação a frio da engine e o tempo até o primeiro frame.")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--budget-ms', type=float, default=ENGINE_IMPORT_BUDGET_MS,
+                        help="limite da mediana do custo próprio da engine, sem o python-chess")
+    parser.add_argument('--first-frame', action='store_true', help="mede também o tempo até o primeiro frame do menu")
+    parser.add_argument('--json', action='store_true')
+    args = parser.parse_args()
+
+    result = measure_engine_import(args.runs)
+    if args.first_frame:
+        result.update(measure_first_frame(args.runs))
+    result['ok'] = not result['pygame_loaded'] and result['own_median_ms'] <= args.budget_ms
+    if args.json:
+        print(json.dumps(result))
+    else:
+        print(f"Importação de chess_game.engine: mediana {result['median_ms']:.1f} ms "
+              f"(min {result['min_ms']:.1f}, max {result['max_ms']:.1f}), dos quais {result['own_median_ms']:.1f} ms "
+              f"da engine (orçamento {args.budget_ms:.0f} ms), pygame carregado: {result['pygame_loaded']}")
+        if args.first_frame:
+            print(f"Primeiro frame: {result['first_frame_ms']:.1f} ms após ChessGame(), "
+                  f"{result['first_frame_from_import_ms']:.1f} ms desde a importação do pygame")
+    sys.exit(0 if result['ok'] else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# meu_xadrez/chess_game/tablebase.py (CONSULTA ÀS TABLEBASES SYZYGY)
+import functools
+import os
+
+import chess
+import chess.syzygy
+
+DEFAULT_TABLEBASE_PATH = os.environ.get('MEU_XADREZ_SYZYGY') or os.path.join(os.path.dirname(__file__), '..',
+                                                                              'assets', 'syzygy')
+DEFAULT_PIECE_LIMIT = 7
+DEFAULT_PROBE_DEPTH = 1  # profundidade restante mínima para consultar WDL dentro da busca
+DEFAULT_CACHE_SIZE = 200_000
+TB_WIN_SCORE = 30000  # abaixo de mate (MATE_BOUND na engine) e acima de qualquer avaliação de material
+WDL_NAMES = {2: "vitória", 1: "vitória anulada pela regra dos 50 lances", 0: "empate",
+             -1: "derrota salva pela regra dos 50 lances", -2: "derrota"}
+
+
+def wdl_to_score(wdl, turn):
+    # Vitórias/derrotas "amaldiçoadas" (±1) são empates pela regra dos 50 lances
+    score = TB_WIN_SCORE if wdl == 2 else -TB_WIN_SCORE if wdl == -2 else 0
+    return score if turn == chess.WHITE else -score
+
+
+class TablebaseProber:
+    def __init__(self, path, piece_limit=DEFAULT_PIECE_LIMIT, probe_depth=DEFAULT_PROBE_DEPTH,
+                 cache_size=DEFAULT_CACHE_SIZE):
+        self.tablebase = chess.syzygy.open_tablebase(path)
+        available = max((len(name) - 1 for name in self.tablebase.wdl), default=0)
+        self.piece_limit = min(piece_limit, available)
+        self.probe_depth = probe_depth
+        self.cache_size = cache_size
+        self.cache = {}
+        self.probes = self.hits = 0
+
+    def can_probe(self, board: chess.Board):
+        return chess.popcount(board.occupied) <= self.piece_limit and not board.castling_rights
+
+    def probe_wdl(self, board: chess.Board):
+        # WDL do ponto de vista de quem joga, ou None se a tabela não existir
+        key = board._transposition_key()
+        if key in self.cache:
+            self.hits += 1
+            return self.cache[key]
+        self.probes += 1
+        wdl = self.tablebase.get_wdl(board)
+        if len(self.cache) >= self.cache_size: self.cache.clear()
+        self.cache[key] = wdl
+        return wdl
+
+    def probe_dtz(self, board: chess.Board):
+        return self.tablebase.get_dtz(board)
+
+    def rank_root_moves(self, board: chess.Board):
+        # Lista (wdl, dtz, jogada) do ponto de vista de quem joga, melhor primeiro; None se faltar tabela.
+        # Vitória: menor distância até zerar o contador; derrota: maior. Jogadas de captura/peão zeram (dtz 1).
+        ranked = []
+        for move in board.legal_moves:
+            zeroing = board.is_zeroing(move)
+            board.push(move)
+            try:
+                if board.is_checkmate():
+                    wdl, dtz = 2, 0
+                else:
+                    child_wdl, child_dtz = self.probe_wdl(board), self.probe_dtz(board)
+                    if child_wdl is None or child_dtz is None: return None
+                    wdl, dtz = -child_wdl, 1 if zeroing else 1 + abs(child_dtz)
+            finally:
+                board.pop()
+            ranked.append((wdl, dtz, move))
+        ranked.sort(key=lambda item: (-item[0], item[1] if item[0] > 0 else -item[1] if item[0] < 0 else 0))
+        return ranked
+
+    def close(self):
+        self.tablebase.close()
+
+
+@functools.lru_cache(maxsize=None)
+def open_tablebase(path, piece_limit=DEFAULT_PIECE_LIMIT, probe_depth=DEFAULT_PROBE_DEPTH):
+    if not os.path.isdir(path): return None
+    prober = TablebaseProber(path, piece_limit, probe_depth)
+    return prober if prober.piece_limit > 0 else None
@@ -0,0 +1,276 @@
+# meu_xadrez/chess_game/tuner.py (AJUSTE TEXEL DOS PARÂMETROS DA AVALIAÇÃO, VETORIZADO COM NUMPY)
+import argparse
+import io
+import json
+import math
+import multiprocessing
+import re
+import sys
+import time
+
+import chess
+import chess.pgn
+import numpy as np
+from chess_game.engine import DEFAULT_EVAL_PARAMS, DEFAULT_EVAL_PARAMS_PATH, EvalParams, center_control, \
+    terminal_score
+from chess_game.pgn_pipeline import iter_game_texts, map_bounded
+
+# A avaliação (fora de mate/empate) é linear nos parâmetros: nota = características . pesos. Layout do vetor:
+# material P N B R Q | tabelas P N B R Q K(meio-jogo) K(final), 64 casas cada | par de bispos | centro | peões dobrados
+MATERIAL_TYPES = (chess.PAWN, chess.KNIGHT, chess.BISHOP, chess.ROOK, chess.QUEEN)
+TABLE_TYPES = (chess.PAWN, chess.KNIGHT, chess.BISHOP, chess.ROOK, chess.QUEEN, chess.KING)
+PST_BASE = len(MATERIAL_TYPES)
+KING_ENDGAME_BASE = PST_BASE + 64 * len(TABLE_TYPES)
+BISHOP_PAIR_INDEX = KING_ENDGAME_BASE + 64
+CENTER_INDEX, DOUBLED_INDEX = BISHOP_PAIR_INDEX + 1, BISHOP_PAIR_INDEX + 2
+N_PARAMS = DOUBLED_INDEX + 1
+
+RESULTS = {'1-0': 1.0, '0-1': 0.0, '1/2-1/2': 0.5}
+DEFAULT_SKIP_PLIES = 8  # posições de abertura (livro) não ensinam nada sobre a avaliação
+DEFAULT_EPOCHS, DEFAULT_LR = 300, 1.0
+CHUNK_SIZE = 2000  # itens (linhas ou partidas) por tarefa na extração
+BLOCK_POSITIONS = 500_000  # posições por bloco na época: limita a memória temporária com milhões de posições
+
+
+def params_to_vector(params: EvalParams):
+    w = np.zeros(N_PARAMS)
+    for index, piece_type in enumerate(MATERIAL_TYPES):
+        w[index] = params.piece_values[piece_type]
+    for index, piece_type in enumerate(TABLE_TYPES):
+        w[PST_BASE + 64 * index:PST_BASE + 64 * (index + 1)] = np.ravel(params.tables[piece_type])
+    w[KING_ENDGAME_BASE:KING_ENDGAME_BASE + 64] = np.ravel(params.king_endgame_table)
+    w[BISHOP_PAIR_INDEX], w[CENTER_INDEX], w[DOUBLED_INDEX] = params.bishop_pair, params.center_attack, \
+        params.doubled_pawn
+    return w
+
+
+def vector_to_params(w, base: EvalParams = DEFAULT_EVAL_PARAMS):
+    # Arredonda para centipawns inteiros; o valor do rei (que se cancela) vem dos parâmetros base
+    w = np.rint(w).astype(int)
+    piece_values = dict(base.piece_values)
+    piece_values.update({piece_type: int(w[index]) for index, piece_type in enumerate(MATERIAL_TYPES)})
+    tables = {piece_type: w[PST_BASE + 64 * index:PST_BASE + 64 * (index + 1)].reshape(8, 8).tolist()
+              for index, piece_type in enumerate(TABLE_TYPES)}
+    return EvalParams(piece_values, tables, w[KING_ENDGAME_BASE:KING_ENDGAME_BASE + 64].reshape(8, 8).tolist(),
+                      int(w[BISHOP_PAIR_INDEX]), int(w[CENTER_INDEX]), int(w[DOUBLED_INDEX]))
+
+
+def position_features(board: chess.Board):
+    # Características esparsas {índice: valor} com o mesmo recorte de evaluate_board; None em posição terminal
+    if terminal_score(board) is not None: return None
+    pieces = board.piece_map()
+    is_endgame = len(pieces) < 10
+    features = {}
+    for square, piece in pieces.items():
+        sign = 1 if piece.color == chess.WHITE else -1
+        if piece.piece_type != chess.KING:
+            index = MATERIAL_TYPES.index(piece.piece_type)
+            features[index] = features.get(index, 0) + sign
+        row = 7 - chess.square_rank(square) if piece.color == chess.WHITE else chess.square_rank(square)
+        base = KING_ENDGAME_BASE if is_endgame and piece.piece_type == chess.KING else \
+            PST_BASE + 64 * TABLE_TYPES.index(piece.piece_type)
+        index = base + row * 8 + chess.square_file(square)
+        features[index] = features.get(index, 0) + sign
+    features[BISHOP_PAIR_INDEX] = (len(board.pieces(chess.BISHOP, chess.WHITE)) >= 2) - \
+        (len(board.pieces(chess.BISHOP, chess.BLACK)) >= 2)
+    white_center, black_center = center_control(board)
+    features[CENTER_INDEX] = white_center - black_center
+    doubled = 0
+    for file_mask in chess.BB_FILES:
+        doubled -= max(0, chess.popcount(board.pawns & board.occupied_co[chess.WHITE] & file_mask) - 1)
+        doubled += max(0, chess.popcount(board.pawns & board.occupied_co[chess.BLACK] & file_mask) - 1)
+    features[DOUBLED_INDEX] = doubled
+    return {index: value for index, value in features.items() if value}
+
+
+def parse_labelled_line(line):
+    # "FEN [1.0]", "FEN c9 \"1-0\";" (EPD) ou "FEN 1/2-1/2": (board, resultado do ponto de vista das brancas)
+    line = line.strip()
+    if not line or line.startswith('#'): return None
+    if match := re.search(r'\[([01](?:\.\d+)?|0?\.5)\]', line):
+        result, fen = float(match.group(1)), line[:match.start()]
+    elif match := re.search(r'(1-0|0-1|1/2-1/2)', line):
+        result, fen = RESULTS[match.group(1)], line[:match.start()]
+    else:
+        return None
+    # Só os quatro primeiros campos importam para a avaliação; contadores e opcodes EPD são ignorados
+    return chess.Board(' '.join(fen.split()[:4]) + ' 0 1'), result
+
+
+def game_positions(text, skip_plies=DEFAULT_SKIP_PLIES):
+    # Posições de uma partida rotuladas com o resultado final; pula a abertura e posições em xeque
+    game = chess.pgn.read_game(io.StringIO(text))
+    if game is None or game.headers.get('Result') not in RESULTS: return
+    result, board = RESULTS[game.headers['Result']], game.board()
+    for move in game.mainline_moves():
+        board.push(move)
+        if board.ply() > skip_plies and not board.is_check(): yield board, result
+
+
+def _extract_chunk(task):
+    kind, items, skip_plies = task
+    counts, cols, vals, results = [], [], [], []
+    if kind == 'pgn':
+        labelled = (item for text in items for item in game_positions(text, skip_plies))
+    else:
+        labelled = filter(None, map(parse_labelled_line, items))
+    for board, result in labelled:
+        features = position_features(board)
+        if features is None: continue
+        counts.append(len(features))
+        cols.extend(features)
+        vals.extend(features.values())
+        results.append(result)
+    return (np.array(counts, dtype=np.uint8), np.array(cols, dtype=np.int16), np.array(vals, dtype=np.int8),
+            np.array(results, dtype=np.float32))
+
+
+def _read_items(path):
+    if path.endswith('.pgn'):
+        yield from (text for _, text in iter_game_texts(path))
+        return
+    with open(path, encoding='utf-8') as f:
+        yield from f
+
+
+def corpus_chunks(path, skip_plies):
+    kind, chunk = 'pgn' if path.endswith('.pgn') else 'epd', []
+    for item in _read_items(path):
+        chunk.append(item)
+        if len(chunk) >= CHUNK_SIZE:
+            yield kind, chunk, skip_plies
+            chunk = []
+    if chunk: yield kind, chunk, skip_plies
+
+
+def extract_features(path, workers=None, skip_plies=DEFAULT_SKIP_PLIES, progress=None):
+    # Lê o corpus uma vez e devolve a matriz esparsa (por posição: quantos índices, índices, valores) e os resultados
+    parts = []
+    for part in map_bounded(_extract_chunk, corpus_chunks(path, skip_plies), workers or multiprocessing.cpu_count()):
+        parts.append(part)
+        if progress: progress(f"{sum(len(p[3]) for p in parts)} posições extraídas")
+    if not parts: raise ValueError("corpus sem posições rotuladas")
+    return {name: np.concatenate([part[i] for part in parts]) for i, name in
+            enumerate(('counts', 'cols', 'vals', 'results'))}
+
+
+def load_features(path):
+    with np.load(path) as data:
+        return {name: data[name] for name in ('counts', 'cols', 'vals', 'results')}
+
+
+def save_features(path, features):
+    np.savez(path, **features)
+
+
+class SparseFeatures:
+    """Matriz esparsa (posições x parâmetros) com produto e gradiente por np.bincount, em blocos de posições."""
+
+    def __init__(self, features):
+        self.results = features['results'].astype(np.float64)
+        self.n = len(self.results)
+        ends = np.cumsum(features['counts'], dtype=np.int64)
+        self.blocks = []
+        for first in range(0, self.n, BLOCK_POSITIONS):
+            last = min(first + BLOCK_POSITIONS, self.n)
+            start, end = (ends[first - 1] if first else 0), ends[last - 1]
+            rows = np.repeat(np.arange(last - first, dtype=np.int32), features['counts'][first:last])
+            self.blocks.append((first, last, rows, features['cols'][start:end].astype(np.intp),
+                                features['vals'][start:end].astype(np.float64)))
+
+    def evaluate(self, w):
+        evals = np.empty(self.n)
+        for first, last, rows, cols, vals in self.blocks:
+            evals[first:last] = np.bincount(rows, weights=vals * w[cols], minlength=last - first)
+        return evals
+
+    def transpose_dot(self, d):
+        # Xᵀ d: acumula a derivada de cada posição nos parâmetros que ela ativa
+        g = np.zeros(N_PARAMS)
+        for first, last, rows, cols, vals in self.blocks:
+            g += np.bincount(cols, weights=vals * d[first:last][rows], minlength=N_PARAMS)
+        return g
+
+
+def win_probability(evals, k):
+    return 1 / (1 + np.power(10.0, -k * evals / 400))
+
+
+def texel_loss(evals, results, k):
+    return float(np.mean((results - win_probability(evals, k)) ** 2))
+
+
+def fit_k(evals, results, low=0.05, high=5.0, iterations=60):
+    # Escala da sigmoide que melhor explica os resultados com os pesos atuais (busca de seção áurea)
+    ratio = (math.sqrt(5) - 1) / 2
+    a, b = low, high
+    for _ in range(iterations):
+        c, d = b - ratio * (b - a), a + ratio * (b - a)
+        if texel_loss(evals, results, c) < texel_loss(evals, results, d): b = d
+        else: a = c
+    return (a + b) / 2
+
+
+def tune(features: SparseFeatures, w, k, epochs=DEFAULT_EPOCHS, lr=DEFAULT_LR, progress=None):
+    # Descida de gradiente em lote completo (Adam) sobre a perda quadrática da sigmoide
+    w = w.astype(np.float64).copy()
+    m, v = np.zeros_like(w), np.zeros_like(w)
+    beta1, beta2, eps = 0.9, 0.999, 1e-8
+    scale = k * math.log(10) / 400
+    for epoch in range(1, epochs + 1):
+        evals = features.evaluate(w)
+        p = win_probability(evals, k)
+        d = -2 * (features.results - p) * p * (1 - p) * scale / features.n
+        g = features.transpose_dot(d)
+        m = beta1 * m + (1 - beta1) * g
+        v = beta2 * v + (1 - beta2) * g * g
+        w -= lr * (m / (1 - beta1 ** epoch)) / (np.sqrt(v / (1 - beta2 ** epoch)) + eps)
+        if progress and (epoch % 25 == 0 or epoch == epochs):
+            progress(f"época {epoch}/{epochs}: perda {texel_loss(evals, features.results, k):.6f}")
+    return w
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ajuste Texel: otimiza material, tabelas posicionais e bônus da "
+                                                 "avaliação contra os resultados de um corpus de posições.")
+    parser.add_argument('corpus', help="posições rotuladas (FEN + [1.0]/\"1-0\"... por linha) ou partidas .pgn; "
+                                       "com --features pode ser o cache .npz")
+    parser.add_argument('-o', '--output', default=DEFAULT_EVAL_PARAMS_PATH,
+                        help="arquivo de parâmetros gerado (a engine carrega o padrão ao iniciar)")
+    parser.add_argument('--epochs', type=int, default=DEFAULT_EPOCHS)
+    parser.add_argument('--lr', type=float, default=DEFAULT_LR, help="passo do Adam (centipawns)")
+    parser.add_argument('--k', type=float, help="escala da sigmoide (padrão: ajustada aos parâmetros atuais)")
+    parser.add_argument('--workers', type=int, help="processos na extração (padrão: núcleos da máquina)")
+    parser.add_argument('--skip-plies', type=int, default=DEFAULT_SKIP_PLIES, help="meios-lances ignorados (PGN)")
+    parser.add_argument('--features', action='store_true', help="o corpus é um cache de características (.npz)")
+    parser.add_argument('--save-features', metavar='ARQUIVO', help="grava o cache de características (.npz)")
+    args = parser.parse_args()
+    progress = lambda message: print(message, file=sys.stderr, flush=True)
+
+    start = time.perf_counter()
+    raw = load_features(args.corpus) if args.features else extract_features(args.corpus, args.workers,
+                                                                               args.skip_plies)
+    if args.save_features: save_features(args.save_features, raw)
+    features = SparseFeatures(raw)
+    progress(f"{features.n} posições, {len(raw['cols'])} entradas em {time.perf_counter() - start:.1f}s")
+
+    w0 = params_to_vector(DEFAULT_EVAL_PARAMS)
+    evals = features.evaluate(w0)
+    k = args.k or fit_k(evals, features.results)
+    initial = texel_loss(evals, features.results, k)
+    progress(f"K = {k:.3f}, perda inicial {initial:.6f}")
+    start = time.perf_counter()
+    w = tune(features, w0, k, args.epochs, args.lr, progress)
+    params = vector_to_params(w)
+    final = texel_loss(features.evaluate(params_to_vector(params)), features.results, k)
+    progress(f"perda final {final:.6f} (parâmetros arredondados) em {time.perf_counter() - start:.1f}s")
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump({**params.to_dict(), 'k': k, 'loss': final, 'positions': features.n}, f, indent=1)
+    values = ', '.join(f"{chess.piece_symbol(t).upper()}={params.piece_values[t]}" for t in MATERIAL_TYPES)
+    print(f"{values}; par de bispos {params.bishop_pair}, centro {params.center_attack}, "
+          f"peão dobrado {params.doubled_pawn} -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+# meu_xadrez/chess_game/uci.py (PROTOCOLO UCI PARA A CHESSENGINE)
+import sys
+import queue
+import threading
+import time
+
+import chess
+from chess_game.book import DEFAULT_BOOK_PATH
+from chess_game.engine import DEFAULT_NNUE_PATH, ChessEngine, MAX_SEARCH_DEPTH, mate_moves
+
+ENGINE_NAME, ENGINE_AUTHOR = "Meu Xadrez", "Henrique-JM"
+TT_ENTRY_BYTES = 200  # estimativa do custo de uma entrada da tabela de transposição (dict + tupla)
+MOVE_OVERHEAD = 0.05  # segundos reservados para comunicação com a interface
+DEFAULT_MOVES_TO_GO = 30
+
+OPTIONS = {
+    'Hash': 'type spin default 64 min 1 max 4096',
+    'Threads': 'type spin default 1 min 1 max 1',
+    'MultiPV': 'type spin default 1 min 1 max 64',
+    'UCI_LimitStrength': 'type check default false',
+    'UCI_Elo': 'type spin default 1600 min 100 max 1600',
+    'OwnBook': 'type check default false',
+    'BookFile': f'type string default {DEFAULT_BOOK_PATH}',
+    'Use NNUE': 'type check default false',
+    'EvalFile': f'type string default {DEFAULT_NNUE_PATH}',
+}
+
+
+def uci_score(score, turn):
+    # UCI informa a nota do ponto de vista de quem joga; a engine usa o das brancas
+    score = score if turn == chess.WHITE else -score
+    mate = mate_moves(score)
+    return f"mate {mate}" if mate is not None else f"cp {score}"
+
+
+class UCIEngine:
+    def __init__(self, input_stream=sys.stdin, output_stream=sys.stdout):
+        self.input, self.output = input_stream, output_stream
+        self.engine = ChessEngine()
+        self.engine.status_listener = lambda message: self.send(f"info string {message}")  # stdout é o protocolo
+        self.engine.load_eval_params()
+        self.board = chess.Board()
+        self.commands = queue.Queue()
+        self.search_thread = None
+        self.release = threading.Event()  # libera o bestmove em go infinite / ponder
+        self.ponder_time = None
+        self.multipv = 1
+        self.threads = 1
+        self.limit_strength, self.elo = False, 1600
+        self.own_book, self.book_file = False, DEFAULT_BOOK_PATH
+        self.use_nnue, self.eval_file = False, DEFAULT_NNUE_PATH
+        self.set_hash(64)
+
+    def send(self, line):
+        self.output.write(line + '\n')
+        self.output.flush()
+
+    def read_input(self):
+        # Leitura em thread própria: a busca não bloqueia comandos como stop e isready
+        for line in self.input:
+            self.commands.put(line.strip())
+        self.commands.put(None)
+
+    def run(self):
+        threading.Thread(target=self.read_input, daemon=True).start()
+        while self.handle(self.commands.get()):
+            pass
+        self.stop_search()
+
+    def handle(self, line):
+        if line is None:
+            # Fim da entrada (ex.: comandos vindos de um arquivo): termina a busca limitada antes de sair
+            if self.search_thread and self.release.is_set(): self.search_thread.join()
+            return False
+        if not line: return True
+        command, _, args = line.partition(' ')
+        if command == 'quit':
+            return False
+        elif command == 'uci':
+            self.send(f"id name {ENGINE_NAME}")
+            self.send(f"id author {ENGINE_AUTHOR}")
+            for name, spec in OPTIONS.items():
+                self.send(f"option name {name} {spec}")
+            self.send("uciok")
+        elif command == 'isready':
+            self.send("readyok")
+        elif command == 'ucinewgame':
+            self.stop_search()
+            self.engine.tt.clear()
+            self.board = chess.Board()
+        elif command == 'setoption':
+            self.stop_search()  # Hash, NNUE e EvalFile trocam estado que a busca em andamento está usando
+            self.set_option(args)
+        elif command == 'position':
+            self.stop_search()
+            self.set_position(args.split())
+        elif command == 'go':
+            self.stop_search()
+            self.go(args.split())
+        elif command == 'stop':
+            self.stop_search()
+        elif command == 'ponderhit':
+            self.ponderhit()
+        elif command == 'bench':
+            self.stop_search()
+            self.bench(args.split())
+        return True
+
+    def bench(self, tokens):
+        # Extensão comum das engines UCI: "bench [profundidade]" imprime nós, tempo e nós/s do conjunto fixo
+        from chess_game.bench import DEFAULT_BENCH_DEPTH, format_bench, run_bench
+        depth = int(tokens[0]) if tokens and tokens[0].isdigit() else DEFAULT_BENCH_DEPTH
+        for line in format_bench(run_bench(depth)).splitlines():
+            self.send(line)
+
+    def set_hash(self, megabytes):
+        self.engine.tt_size = max(1024, megabytes * 1024 * 1024 // TT_ENTRY_BYTES)
+        self.engine.tt.clear()
+
+    def set_option(self, args):
+        words = args.split()
+        if 'name' not in words: return
+        value_idx = words.index('value') if 'value' in words else len(words)
+        name, value = ' '.join(words[words.index('name') + 1:value_idx]), ' '.join(words[value_idx + 1:])
+        try:
+            if name == 'Hash':
+                self.set_hash(int(value))
+            elif name == 'Threads':
+                self.threads = int(value)  # a busca é de uma thread só; aceito por compatibilidade
+            elif name == 'MultiPV':
+                self.multipv = max(1, int(value))
+            elif name == 'UCI_LimitStrength':
+                self.limit_strength = value.lower() == 'true'
+                if not self.limit_strength: self.engine.strength = None
+            elif name == 'UCI_Elo':
+                self.elo = int(value)
+            elif name == 'OwnBook':
+                self.own_book = value.lower() == 'true'
+                if self.own_book and not self.engine.load_book(self.book_file):
+                    self.send(f"info string livro não encontrado: {self.book_file}")
+            elif name == 'BookFile':
+                self.book_file = value
+                if self.own_book: self.engine.load_book(value)
+            elif name in ('Use NNUE', 'EvalFile'):
+                if name == 'Use NNUE': self.use_nnue = value.lower() == 'true'
+                else: self.eval_file = value
+                self.set_nnue()
+            else:
+                self.send(f"info string opção desconhecida: {name}")
+        except ValueError:
+            self.send(f"info string valor inválido para {name}: {value}")
+
+    def set_nnue(self):
+        if not self.use_nnue:
+            self.engine.nnue = None
+        elif not self.engine.load_nnue(self.eval_file):
+            self.send(f"info string rede NNUE não encontrada: {self.eval_file}; usando a avaliação clássica")
+
+    def set_position(self, tokens):
+        if not tokens: return
+        moves_idx = tokens.index('moves') if 'moves' in tokens else len(tokens)
+        try:
+            if tokens[0] == 'startpos':
+                board = chess.Board()
+            elif tokens[0] == 'fen':
+                board = chess.Board(' '.join(tokens[1:moves_idx]))
+            else:
+                return
+            for uci in tokens[moves_idx + 1:]:
+                board.push_uci(uci)
+        except ValueError as e:
+            self.send(f"info string posição inválida: {e}")
+            return
+        self.board = board
+
+    def parse_go(self, tokens):
+        params, flags = {}, set()
+        i = 0
+        while i < len(tokens):
+            token = tokens[i]
+            if token in ('infinite', 'ponder'):
+                flags.add(token)
+            elif token in ('depth', 'movetime', 'wtime', 'btime', 'winc', 'binc', 'movestogo', 'nodes'):
+                try:
+                    params[token] = int(tokens[i + 1])
+                    i += 1
+                except (IndexError, ValueError):
+                    # A GUI espera que a engine sobreviva a entrada ruim: avisa e ignora só este parâmetro
+                    value = tokens[i + 1] if i + 1 < len(tokens) else 'ausente'
+                    self.send(f"info string valor inválido para go {token}: {value}")
+            i += 1
+        return params, flags
+
+    def allocate_time(self, params):
+        if 'movetime' in params: return max(0.001, params['movetime'] / 1000 - MOVE_OVERHEAD / 2)
+        remaining = params.get('wtime' if self.board.turn == chess.WHITE else 'btime')
+        if remaining is None: return None
+        inc = params.get('winc' if self.board.turn == chess.WHITE else 'binc', 0) / 1000
+        remaining /= 1000
+        budget = remaining / params.get('movestogo', DEFAULT_MOVES_TO_GO) + inc * 0.75
+        return max(0.01, min(budget, remaining - MOVE_OVERHEAD, remaining * 0.5))
+
+    def go(self, tokens):
+        params, flags = self.parse_go(tokens)
+        if self.limit_strength:
+            self.engine.set_difficulty_elo(self.elo)
+        if self.own_book and 'infinite' not in flags and (book_move := self.engine.probe_book(self.board)):
+            self.send(f"bestmove {book_move.uci()}")
+            return
+        depth = params.get('depth')
+        movetime = self.allocate_time(params)
+        waits = 'infinite' in flags or 'ponder' in flags
+        self.ponder_time = movetime if 'ponder' in flags else None
+        if waits: movetime, depth = None, depth or MAX_SEARCH_DEPTH
+        self.release.clear()
+        if not waits: self.release.set()
+        # Força limitada: orçamento do Elo (o relógio só reduz o teto de tempo), salvo limites explícitos
+        limited = self.limit_strength and not waits and depth is None and 'nodes' not in params
+        if depth is None and movetime is None and 'nodes' not in params and not waits and not limited:
+            depth = self.engine.depth
+
+        board = self.board.copy()
+        self.search_thread = threading.Thread(
+            target=self.search, args=(board, depth, movetime, params.get('nodes'), limited), daemon=True)
+        self.search_thread.start()
+
+    def search(self, board, depth, movetime, nodes, limited=False):
+        info_callback = lambda r: self.send_info(board, r)
+        if limited:
+            result = self.engine.search_limited(board, movetime, info_callback)
+        else:
+            result = self.engine.search(board, depth=depth, movetime=movetime, nodes=nodes, multipv=self.multipv,
+                                        info_callback=info_callback)
+        # Em go infinite / ponder o bestmove só sai depois de stop ou ponderhit
+        self.release.wait()
+        if result.move is None:
+            self.send("bestmove 0000")
+            return
+        ponder = f" ponder {result.pv[1].uci()}" if len(result.pv) > 1 else ""
+        self.send(f"bestmove {result.move.uci()}{ponder}")
+
+    def send_info(self, board, result):
+        nps = int(result.nodes / result.time) if result.time > 0 else 0
+        for i, line in enumerate(result.lines, 1):
+            self.send(f"info depth {result.depth} multipv {i} score {uci_score(line.score, board.turn)} "
+                      f"nodes {result.nodes} nps {nps} time {int(result.time * 1000)} "
+                      f"pv {' '.join(m.uci() for m in line.pv)}")
+
+    def ponderhit(self):
+        # O lance previsto foi jogado: a busca em andamento passa a ter o tempo normal. Vai em stop_at, que search()
+        # não sobrescreve ao começar (o deadline sim), para valer mesmo se a thread ainda não entrou na busca
+        if self.ponder_time is not None:
+            self.engine.stop_at = time.perf_counter() + self.ponder_time
+        else:
+            self.engine.stop_event.set()
+        self.release.set()
+
+    def stop_search(self):
+        if self.search_thread and self.search_thread.is_alive():
+            self.engine.stop_event.set()
+            self.release.set()
+            self.search_thread.join()
+        self.search_thread = None
+        self.engine.stop_event.clear()
+        self.engine.stop_at = None  # ponderhit depois do fim da busca não pode valer para a próxima
+
+
+def main():
+    UCIEngine().run()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,21 @@
 # main.py (na raiz do projeto)
+import argparse
 import sys
 from chess_game.main import ChessGame
 
 if __name__ == "__main__":
-    game = ChessGame()
+    parser = argparse.ArgumentParser(description="Meu Jogo de Xadrez")
+    parser.add_argument('--record', metavar='ARQUIVO', help="grava os eventos da sessão para reprodução posterior")
+    parser.add_argument('--seed', type=int, help="semente da IA (a gravação usa 0 se não for informada)")
+    args = parser.parse_args()
+
+    seed = args.seed if args.seed is not None or not args.record else 0
+    game = ChessGame(seed=seed)
+    recorder = None
+    if args.record:
+        from chess_game.replay import SessionRecorder
+        recorder = game.event_source = SessionRecorder(args.record, seed)
+        game.engine_time_limits = False
     game.run()
-    sys.exit() # Garante que o programa saia corretamente
\ No newline at end of file
+    if recorder: recorder.close()
+    sys.exit() # Garante que o programa saia corretamente
@@ -0,0 +1,28 @@
+# meu_xadrez/tests/test_cli.py (TESTES DA ANÁLISE PELA LINHA DE COMANDO)
+import json
+import os
+import subprocess
+import sys
+
+from chess_game.engine import DEFAULT_EVAL_PARAMS
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EXTRA_PAWN_FEN = "rnbqkbnr/pppp1ppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+
+
+def run_cli(params_path, *extra):
+    # Processo novo: o caminho padrão dos parâmetros vem de MEU_XADREZ_EVAL_PARAMS na importação da engine
+    env = dict(os.environ, PYTHONPATH=PROJECT_ROOT, MEU_XADREZ_EVAL_PARAMS=str(params_path))
+    out = subprocess.run([sys.executable, '-m', 'chess_game.cli', EXTRA_PAWN_FEN, '--depth', '1', *extra],
+                         capture_output=True, text=True, env=env, check=True).stdout
+    return json.loads(out.splitlines()[0])
+
+
+def test_cli_uses_tuned_eval_params(tmp_path):
+    params = DEFAULT_EVAL_PARAMS.to_dict()
+    params['piece_values']['P'] += 400
+    tuned = tmp_path / 'eval_params.json'
+    tuned.write_text(json.dumps(params), encoding='utf-8')
+    default = run_cli(tmp_path / 'inexistente.json')
+    assert run_cli(tuned)['score'] - default['score'] == 400
+    assert run_cli(tuned, '--workers', '2')['score'] - default['score'] == 400
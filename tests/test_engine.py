@@ -0,0 +1,26 @@
+# meu_xadrez/tests/test_engine.py (TESTES DA CLASSIFICAÇÃO DE LANCES)
+import chess
+
+from chess_game.engine import ChessEngine, classify_move
+
+
+def test_best_move_that_worsens_the_position_is_best_defence():
+    assert classify_move(0, True, -50) == "Melhor Defesa"
+    assert classify_move(0, True, 0) == "Best Move"
+    assert classify_move(0, True, 40) == "Best Move"
+
+
+def test_good_move_is_demoted_when_the_static_eval_drops():
+    assert classify_move(10, False, -31) == "Inaccuracy"
+    assert classify_move(10, False, -30) == "Good Move"
+    assert classify_move(250, False, 100) == "Blunder"
+
+
+def test_analyze_move_labels_a_forced_worsening_move_as_best_defence():
+    # Xeque da torre com a coluna d fechada e f2 ocupado: Rf1 é o único lance e piora a tabela do rei
+    board = chess.Board("4k3/3rr3/8/8/8/8/5P2/4K3 w - - 0 1")
+    move = chess.Move.from_uci("e1f1")
+    engine = ChessEngine(seed=0)
+    assert engine.static_change(board, move) < 0
+    move_type, best_move, score_drop, _ = engine.analyze_move(board, move)
+    assert (move_type, best_move, score_drop) == ("Melhor Defesa", move, 0)
@@ -0,0 +1,46 @@
+# meu_xadrez/tests/test_game_analysis.py (TESTES DA ANÁLISE DE PARTIDAS)
+import chess
+
+from chess_game.engine import ChessEngine
+from chess_game.game_analysis import analyze_plies, summarize
+
+
+class MaterialProber:
+    """Tablebase de mentira para KRvK: sem a torre é empate; com ela, vence quem tem a torre."""
+
+    probe_depth = 0
+
+    def can_probe(self, board):
+        return chess.popcount(board.occupied) <= 3
+
+    def probe_wdl(self, board):
+        rooks = board.pieces(chess.ROOK, board.turn), board.pieces(chess.ROOK, not board.turn)
+        return 2 if rooks[0] else -2 if rooks[1] else 0
+
+    def rank_root_moves(self, board):
+        ranked = []
+        for move in board.legal_moves:
+            board.push(move)
+            ranked.append((-self.probe_wdl(board), 1, move))
+            board.pop()
+        return sorted(ranked, key=lambda item: -item[0])
+
+
+def test_tablebase_losing_move_has_cp_loss():
+    # Pretas a jogar podem tomar a torre solta (empate); Kb3 deixa a torre e perde
+    engine = ChessEngine(seed=0)
+    engine.tablebase = MaterialProber()
+    plies = analyze_plies(engine, "8/8/8/8/3R4/2k5/8/7K b - - 0 1", 0, ["c3b3"], depth=2)
+    ply = plies[0]
+    assert ply.move_type == "Blunder"
+    assert ply.best_move == chess.Move.from_uci("c3d4")
+    assert ply.cp_loss > 0
+    acpl, accuracy, counts = summarize(plies)
+    assert acpl['black'] > 0 and accuracy['black'] < 100 and counts['black']['Blunder'] == 1
+
+
+def test_tablebase_drawing_move_has_no_cp_loss():
+    engine = ChessEngine(seed=0)
+    engine.tablebase = MaterialProber()
+    ply = analyze_plies(engine, "8/8/8/8/3R4/2k5/8/7K b - - 0 1", 0, ["c3d4"], depth=2)[0]
+    assert ply.move_type == "Best Move" and ply.cp_loss == 0
@@ -0,0 +1,42 @@
+# meu_xadrez/tests/test_uci.py (TESTES DO PROTOCOLO UCI)
+import io
+import time
+
+import chess
+
+from chess_game.engine import MAX_SEARCH_DEPTH
+from chess_game.uci import UCIEngine
+
+
+def make_uci(commands=""):
+    output = io.StringIO()
+    return UCIEngine(io.StringIO(commands), output), output
+
+
+def test_ponderhit_before_search_starts_keeps_the_deadline():
+    # ponderhit chega antes de a thread entrar em search(): o prazo não pode se perder
+    uci, _ = make_uci()
+    uci.ponder_time = 0.05
+    uci.ponderhit()
+    start = time.perf_counter()
+    result = uci.engine.search(chess.Board(), depth=MAX_SEARCH_DEPTH)
+    assert time.perf_counter() - start < 2.0
+    assert result.move is not None and uci.engine.stop_at is None
+
+
+def test_malformed_go_is_reported_and_skipped():
+    uci, output = make_uci("go depth x\ngo movetime\nquit\n")
+    uci.run()
+    lines = output.getvalue().splitlines()
+    assert "info string valor inválido para go depth: x" in lines
+    assert "info string valor inválido para go movetime: ausente" in lines
+    assert sum(line.startswith("bestmove") for line in lines) == 2
+
+
+def test_setoption_stops_an_active_search():
+    uci, output = make_uci()
+    uci.handle("go infinite")
+    assert uci.search_thread.is_alive()
+    uci.handle("setoption name Hash value 1")
+    assert uci.search_thread is None
+    assert any(line.startswith("bestmove") for line in output.getvalue().splitlines())